@@ -0,0 +1 @@
+"""Benchmarks for the simple_agents pipeline against local stand-ins for Ollama and DuckDuckGo."""
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Substrings of each stage's system prompt, used to tell stages apart.
+STAGE_MARKERS = [
+    ("router", "smart routing agent"),
+    ("planner", "decides which tools to call"),
+    ("planner", "decides how to answer a user's question using a web search tool"),
+    ("summarizer", "greeting specialist agent"),
+    ("summarizer", "web search specialist agent"),
+    ("formatter", "combine and summarize the responses"),
+]
+
+
+def detect_stage(messages: list) -> str:
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    for stage, marker in STAGE_MARKERS:
+        if marker in system:
+            return stage
+    return "unknown"
+
+
+def tokenize(text: str) -> list:
+    """Split text into pseudo-tokens of about four characters."""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+class FakeOllamaServer:
+    """Local HTTP server speaking enough of Ollama's ``/api/chat`` protocol to drive the pipeline.
+
+    ``responder(stage, messages)`` returns the assistant content for a call.
+    Each call sleeps ``latency`` seconds (prompt processing) and then emits
+    tokens at ``tokens_per_second``. Every call is logged with its stage and
+    timestamps in ``calls``.
+    """
+
+    def __init__(self, responder, latency: float = 0.0, tokens_per_second: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.responder = responder
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.calls = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    def _record(self, call: dict):
+        with self._lock:
+            self.calls.append(call)
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Otherwise delayed ACKs add ~40ms per response
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": []})
+                else:
+                    self._send_json(200, {"status": "Ollama is running"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/chat":
+                    self._send_json(404, {"error": f"unsupported path {self.path}"})
+                    return
+
+                start = time.perf_counter()
+                messages = request.get("messages", [])
+                stage = detect_stage(messages)
+                content = fake.responder(stage, messages)
+                tokens = tokenize(content)
+                prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+                time.sleep(fake.latency)
+                prefill_done = time.perf_counter()
+
+                base = {"model": request.get("model", ""), "created_at": datetime.now(timezone.utc).isoformat()}
+                if request.get("stream", True):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for token in tokens:
+                        time.sleep(fake._token_delay())
+                        self._write_chunk({**base, "message": {"role": "assistant", "content": token}, "done": False})
+                    final = self._final(base, "", prompt_tokens, len(tokens), start, prefill_done)
+                    self._write_chunk(final)
+                    self.wfile.write(b"0\r\n\r\n")
+                else:
+                    time.sleep(fake._token_delay() * len(tokens))
+                    self._send_json(200, self._final(base, content, prompt_tokens, len(tokens), start, prefill_done))
+
+                fake._record({
+                    "stage": stage,
+                    "model": request.get("model"),
+                    "stream": bool(request.get("stream", True)),
+                    "options": request.get("options"),
+                    "start": start,
+                    "end": time.perf_counter(),
+                    "prompt_tokens": prompt_tokens,
+                    "eval_tokens": len(tokens),
+                })
+
+            def _write_chunk(self, body: dict):
+                data = (json.dumps(body) + "\n").encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _final(self, base, content, prompt_tokens, eval_tokens, start, prefill_done):
+                now = time.perf_counter()
+                return {
+                    **base,
+                    "message": {"role": "assistant", "content": content},
+                    "done": True,
+                    "done_reason": "stop",
+                    "total_duration": int((now - start) * 1e9),
+                    "load_duration": 0,
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int((prefill_done - start) * 1e9),
+                    "eval_count": eval_tokens,
+                    "eval_duration": int((now - prefill_done) * 1e9),
+                }
+
+        return Handler
@@ -0,0 +1,48 @@
+import threading
+import time
+
+
+class FakeSearchBackend:
+    """Stand-in for ``duckduckgo_search.DDGS`` with fixed latency and canned results.
+
+    Use ``backend.ddgs`` in place of the DDGS class. Every text() call is
+    logged with timestamps in ``calls``; ``fail=True`` makes searches raise.
+    """
+
+    def __init__(self, latency: float = 0.0, results: list = None, fail: bool = False):
+        self.latency = latency
+        self.results = results or [
+            {"title": "Result", "href": "https://example.com/1", "body": "Bitcoin is trading at $83,674 USD today."},
+            {"title": "Result", "href": "https://example.com/2", "body": "The price of Bitcoin rose 1.25% in 24 hours."},
+            {"title": "Result", "href": "https://example.com/3", "body": "Bitcoin market cap is $1.66 trillion."},
+        ]
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    def ddgs(self, *args, **kwargs):
+        return _FakeDDGS(self)
+
+
+class _FakeDDGS:
+    def __init__(self, backend: FakeSearchBackend):
+        self.backend = backend
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, max_results=None, **kwargs):
+        start = time.perf_counter()
+        time.sleep(self.backend.latency)
+        with self.backend._lock:
+            self.backend.calls.append({"stage": "search", "query": query, "start": start, "end": time.perf_counter()})
+        if self.backend.fail:
+            raise RuntimeError("search backend unavailable")
+        return self.backend.results[:max_results]
@@ -0,0 +1,71 @@
+"""Measure cold-start cost of importing simple_agents in fresh interpreters.
+
+Usage:
+    python -m benchmarks.import_time --iterations 10
+    python -m benchmarks.import_time --max-ms 80
+
+Each target runs in a new ``python`` process so nothing is cached in
+``sys.modules``. Besides the time, every run reports which of the heavy
+optional dependencies got imported; none of them should be needed until an
+agent actually talks to a model or searches the web.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("ollama", "httpx", "pydantic", "duckduckgo_search")
+
+TARGETS = {
+    "package": "import simple_agents",
+    "coordinator": "from simple_agents.coordinator_assistant import CoordinatorAssistant; CoordinatorAssistant()",
+    "batch_cli": "import simple_agents.batch",
+}
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_once(code: str) -> dict:
+    probe = _PROBE.format(code=code, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(iterations: int = 5, targets=None) -> dict:
+    """Median import time (ms) and heavy modules loaded, per target."""
+    results = {}
+    for name in targets or TARGETS:
+        runs = [measure_once(TARGETS[name]) for _ in range(iterations)]
+        results[name] = {
+            "median_ms": statistics.median(run["seconds"] for run in runs) * 1000,
+            "heavy_modules": sorted({module for run in runs for module in run["loaded"]}),
+        }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="Measure only these targets")
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero if any target's median exceeds this")
+    args = parser.parse_args(argv)
+
+    results = measure(args.iterations, args.target)
+    failed = False
+    for name, result in results.items():
+        heavy = ", ".join(result["heavy_modules"]) or "none"
+        print(f"{name:12} {result['median_ms']:8.2f}ms  heavy modules: {heavy}")
+        if args.max_ms is not None and result["median_ms"] > args.max_ms:
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
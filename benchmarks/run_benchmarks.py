@@ -0,0 +1,222 @@
+"""Drive CoordinatorAssistant through canned scenarios against a fake Ollama server.
+
+Usage:
+    python -m benchmarks.run_benchmarks --iterations 20 --latency 0.2 --output bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json
+
+Each request is measured end to end. Time spent inside the fake LLM and
+search backends ("external" time, with overlapping calls merged) is
+subtracted from the wall time to give the framework overhead.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+from simple_agents.agents.web_search.cache import SearchCache
+from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.llm.client import LLMClient
+
+from .fake_ollama import FakeOllamaServer
+from .fake_search import FakeSearchBackend
+
+GREET_ROUTE = {"agent": "greet", "task": "Greet the user and reverse their name",
+               "context": {"relevant_info": "User's name is John", "user_intent": "greeting", "required_tools": ["say_hello", "name_backwards"]},
+               "depends_on": []}
+SEARCH_ROUTE = {"agent": "websearch", "task": "Find the current price of Bitcoin",
+                "context": {"relevant_info": "Bitcoin price", "user_intent": "get price", "required_tools": ["web_search"]},
+                "depends_on": []}
+GREET_PLAN = {"steps": [{"tool_name": "say_hello", "arguments": {"name": "John"}},
+                        {"tool_name": "name_backwards", "arguments": {"name": "John"}}]}
+SEARCH_PLAN = {"steps": [{"tool_name": "web_search", "arguments": {"query": "bitcoin price usd"}}]}
+
+SCENARIOS = {
+    "single_agent_greet": {
+        "input": "Hi, my name is John. What's my name backwards?",
+        "agents": [GREET_ROUTE],
+    },
+    "single_agent_search": {
+        "input": "What is the current price of Bitcoin in USD?",
+        "agents": [SEARCH_ROUTE],
+    },
+    "multi_agent": {
+        "input": "what is the price of bitcoin? btw my name is John, I would like to know my name backwards",
+        "agents": [GREET_ROUTE, SEARCH_ROUTE],
+    },
+    "error_bad_plan": {
+        "input": "What is the current price of Bitcoin in USD?",
+        "agents": [SEARCH_ROUTE],
+        "bad_search_plan": True,
+    },
+    "error_search_down": {
+        "input": "What is the current price of Bitcoin in USD?",
+        "agents": [SEARCH_ROUTE],
+        "search_fail": True,
+    },
+}
+
+
+def make_responder(scenario: dict):
+    def respond(stage, messages):
+        system = messages[0]["content"] if messages else ""
+        if stage == "router":
+            return json.dumps({"agents": scenario["agents"]})
+        if stage == "planner":
+            if "web search tool" in system:
+                return "I cannot plan this." if scenario.get("bad_search_plan") else json.dumps(SEARCH_PLAN)
+            return json.dumps(GREET_PLAN)
+        if stage == "summarizer":
+            return "Bitcoin is trading at about $83,674 USD." if "web search" in system else "Hello John! Your name backwards is nhoJ."
+        return "Hello John! Your name backwards is nhoJ, and Bitcoin is trading at about $83,674 USD today."
+    return respond
+
+
+def merged_duration(intervals: list) -> float:
+    """Total time covered by possibly overlapping ``(start, end)`` intervals."""
+    total, current_start, current_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(values: list) -> dict:
+    return {
+        "mean": statistics.mean(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def run_scenario(name: str, scenario: dict, server: FakeOllamaServer, search: FakeSearchBackend,
+                 coordinator: CoordinatorAssistant, iterations: int, mode: str) -> dict:
+    server.responder = make_responder(scenario)
+    search.fail = scenario.get("search_fail", False)
+    walls, overheads = [], []
+    stage_totals = {}
+    llm_calls = {}
+
+    for _ in range(iterations):
+        coordinator.search_cache.clear()
+        server.reset()
+        search.reset()
+        start = time.perf_counter()
+        if mode == "async":
+            asyncio.run(coordinator.arun(scenario["input"]))
+        else:
+            coordinator.run(scenario["input"])
+        wall = time.perf_counter() - start
+
+        calls = server.calls + search.calls
+        external = merged_duration([(c["start"], c["end"]) for c in calls])
+        walls.append(wall)
+        overheads.append(max(0.0, wall - external))
+        for call in calls:
+            stage = stage_totals.setdefault(call["stage"], {"calls": 0, "total_s": 0.0})
+            stage["calls"] += 1
+            stage["total_s"] += call["end"] - call["start"]
+        llm_calls = coordinator.last_llm_calls
+
+    stages = {
+        stage: {"calls_per_request": totals["calls"] / iterations, "mean_s": totals["total_s"] / totals["calls"]}
+        for stage, totals in stage_totals.items()
+    }
+    return {
+        "iterations": iterations,
+        "wall_s": summarize(walls),
+        "framework_overhead_s": summarize(overheads),
+        "stages": stages,
+        "llm_calls": llm_calls,
+    }
+
+
+def run_benchmarks(iterations: int = 10, latency: float = 0.05, tokens_per_second: float = 0.0,
+                   search_latency: float = 0.05, mode: str = "sync", scenarios: list = None,
+                   coordinator_kwargs: dict = None) -> dict:
+    search = FakeSearchBackend(latency=search_latency)
+    with FakeOllamaServer(responder=None, latency=latency, tokens_per_second=tokens_per_second) as server, \
+            patch("simple_agents.agents.web_search.tools.DDGS", search.ddgs):
+        coordinator = CoordinatorAssistant(
+            llm=LLMClient(host=server.url),
+            search_cache=SearchCache(),
+            **(coordinator_kwargs or {})
+        )
+        results = {
+            name: run_scenario(name, SCENARIOS[name], server, search, coordinator, iterations, mode)
+            for name in (scenarios or SCENARIOS)
+        }
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {
+            "iterations": iterations,
+            "llm_latency_s": latency,
+            "tokens_per_second": tokens_per_second,
+            "search_latency_s": search_latency,
+            "mode": mode,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Lines describing the change in mean wall time and overhead per scenario."""
+    lines = []
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for metric in ("wall_s", "framework_overhead_s"):
+            old, new = before[metric]["mean"], result[metric]["mean"]
+            change = (new - old) / old * 100 if old else 0.0
+            lines.append(f"{name:22} {metric:22} {old * 1000:9.2f}ms -> {new * 1000:9.2f}ms ({change:+.1f}%)")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM prompt-processing time per call (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Fake generation speed, 0 for instant")
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.iterations, args.latency, args.tokens_per_second, args.search_latency, args.mode, args.scenario)
+
+    for name, result in results["scenarios"].items():
+        print(f"{name:22} wall {result['wall_s']['mean'] * 1000:8.2f}ms  "
+              f"overhead {result['framework_overhead_s']['mean'] * 1000:7.2f}ms  "
+              f"llm calls {result['llm_calls'].get('total', 0)}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            print("\n".join(compare(results, json.load(f))))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,4 +10,9 @@ setup(
         "gradio",
     ],
     python_requires=">=3.9",
+    entry_points={
+        "console_scripts": [
+            "simple-agents-batch=simple_agents.batch:main",
+        ],
+    },
 ) 
\ No newline at end of file
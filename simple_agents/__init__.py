@@ -1,6 +1,12 @@
 """Simple Agents - A modular, LLM-powered multi-agent framework."""
 
-from .coordinator_assistant import CoordinatorAssistant
-
 __version__ = "0.1.0"
 __all__ = ['CoordinatorAssistant']
+
+
+def __getattr__(name):
+    # Imported on first use so ``import simple_agents`` stays cheap.
+    if name == "CoordinatorAssistant":
+        from .coordinator_assistant import CoordinatorAssistant
+        return CoordinatorAssistant
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
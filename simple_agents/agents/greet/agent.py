@@ -1,11 +1,15 @@
 from ...base.base_agent import BaseAgent
 from ...base.validation import validate_tool_plan
-from ...coordinator_assistant import chat
+from ...llm.ollama_api import chat
+from ...utils.async_chat import achat
+from ...llm.client import achat_with, chat_with
+from ...llm.models import DEFAULT_MODEL
+from ...llm.warmup import WarmUpTarget
 from ...planner.llm_planner import LLMPlanner
 
 class GreetUserAgent(BaseAgent):
-    def __init__(self, agent_name: str, tools: dict, planner: LLMPlanner, model: str = "gemma3:4b"):
-        super().__init__(agent_name=agent_name, tools=tools, planner=planner)
+    def __init__(self, agent_name: str, tools: dict, planner: LLMPlanner, model: str = DEFAULT_MODEL, **kwargs):
+        super().__init__(agent_name=agent_name, tools=tools, planner=planner, **kwargs)
         self.model_name = model
         self.system_prompt = """You are a greeting specialist agent. Your task is to:
 1. Generate friendly greetings for users
@@ -20,45 +24,59 @@ When generating greetings:
 """
 
     def plan(self):
-        user_input = self.task.get("user_input")
-        plan = self.planner.plan(user_input)
-        validate_tool_plan(plan)
-        self.state["steps"] = plan["steps"]
+        steps = self._preplanned_steps()
+        if steps is None:
+            user_input = self.task.get("user_input")
+            plan = self.planner.plan(user_input)
+            validate_tool_plan(plan)
+            steps = plan["steps"]
+        self.state["steps"] = steps
 
-    def _summarize_results(self, results):
-        """Summarize the greeting results using the LLM."""
-        messages = [
+    async def aplan(self):
+        steps = self._preplanned_steps()
+        if steps is None:
+            user_input = self.task.get("user_input")
+            plan = await self.planner.aplan(user_input)
+            validate_tool_plan(plan)
+            steps = plan["steps"]
+        self.state["steps"] = steps
+
+    def warm_up_targets(self) -> list:
+        targets = super().warm_up_targets()
+        if self.summary_policy.agent_summaries != "none":
+            targets.append(WarmUpTarget("summarizer", self.model_name, self.system_prompt))
+        return targets
+
+    def _summary_messages(self, results):
+        return [
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": f"""Please generate a friendly greeting based on these results:
 
 Results:
-{results}
+{self.renderer.tool_results(results)}
 
 Provide a natural, conversational greeting."""}
         ]
-        
-        response = chat(self.model_name, messages)
+
+    def _summarize_results(self, results):
+        """Summarize the greeting results using the LLM."""
+        response = chat_with(self.llm, "summarizer", self.model_name, self._summary_messages(results), chat)
+        return response.message.content
+
+    async def _asummarize_results(self, results):
+        response = await achat_with(self.llm, "summarizer", self.model_name, self._summary_messages(results), achat)
         return response.message.content
 
     def execute(self):
-        results = []
-        for step in self.state["steps"]:
-            tool_name = step.get("tool_name")
-            arguments = step.get("arguments", {})
-            if tool_name not in self.tools:
-                raise ValueError(f"Tool '{tool_name}' not found.")
-            output = self.tools[tool_name].run(arguments)
-            results.append({
-                "tool": tool_name,
-                "input": arguments,
-                "output": output
-            })
+        results = self.execute_steps(self.state["steps"])
         
         # Summarize the results
-        summary = self._summarize_results(results)
+        summary = self.summarize(results)
         
-        return {
-            "agent": self.agent_name,
-            "results": results,
-            "summary": summary
-        }
\ No newline at end of file
+        return self._agent_result(results, summary)
+
+    async def aexecute(self):
+        results = await self.aexecute_steps(self.state["steps"])
+        summary = await self.asummarize(results)
+
+        return self._agent_result(results, summary)
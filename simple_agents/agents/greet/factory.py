@@ -0,0 +1,68 @@
+from ...base.rendering import ResultRenderer
+from ...base.summarization import SummaryPolicy
+from ...base.validation import plan_schema
+from ...llm.client import LLMClient
+from ...llm.models import StageModels
+from ...planner.llm_planner import LLMPlanner
+from .agent import GreetUserAgent
+from .tools import GreetUserTool, ReverseNameTool
+
+
+def build_greet_agent(model: str, summary_policy: SummaryPolicy = None, llm: LLMClient = None, stream_json: bool = False, constrained: bool = True, models: StageModels = None, renderer: ResultRenderer = None, **options) -> GreetUserAgent:
+    """Registry factory for the greet agent; coordinator options it does not use are ignored."""
+    models = models if models is not None else StageModels(model)
+    greet_prompt = """
+    You are an AI assistant that decides which tools to call and in what order based on user input.
+    
+    You will receive messages in this format:
+    {
+      "task_type": "greet",
+      "user_input": "What's my name backwards?",
+      "task": "Greet the user and perform a name manipulation",
+      "context": {
+        "relevant_info": "User name is Alice",
+        "user_intent": "wants to be greeted and have name reversed",
+        "required_tools": ["say_hello", "name_backwards"]
+      },
+      "previous_results": []
+    }
+
+    Important fields to understand:
+    - user_input: The user's original query exactly as they typed it
+    - task: The coordinator's interpretation of what needs to be done
+    - context.relevant_info: Contains important details about the user
+    - context.user_intent: Tells you what the user wants to achieve
+    - context.required_tools: Lists which tools you should use
+    - previous_results: Contains results from other agents if any
+    
+    Available tools:
+    1. say_hello(name: string) — Greets the user by name.
+    2. name_backwards(name: string) — Reverses the user's name.
+    
+    Respond in this format:
+    {
+      "steps": [
+        {
+          "tool_name": "<tool_name>",
+          "arguments": {
+            "<arg1>": <value1>
+          }
+        }
+      ]
+    }
+    """
+
+    tools = {
+        "say_hello": GreetUserTool(),
+        "name_backwards": ReverseNameTool()
+    }
+    greet_agent = GreetUserAgent(
+        agent_name="GreeterAgent",
+        tools=tools,
+        planner=LLMPlanner(model=models.model_for("planner", "greet"), system_prompt=greet_prompt, llm=llm, stream_json=stream_json, format_schema=plan_schema(tools) if constrained else None),
+        model=models.model_for("summarizer", "greet"),
+        summary_policy=summary_policy,
+        llm=llm,
+        renderer=renderer
+    )
+    return greet_agent
@@ -1,13 +1,45 @@
 from ...base.base_tool import BaseTool
 
 class GreetUserTool(BaseTool):
+    concurrent_safe = True
+    speculative_safe = True
+    args_schema = {
+        "type": "object",
+        "properties": {"name": {"type": "string"}},
+        "additionalProperties": False,
+    }
+
     def run(self, input_data: dict) -> dict:
         name = input_data.get("name", "")
         if not name:
             return {"greeting": "Hello there!"}
         return {"greeting": f"Hello {name}!"}
 
+    def summarize(self, output: dict):
+        return output.get("greeting")
+
+    async def arun(self, input_data: dict) -> dict:
+        # Pure string work, not worth a thread hop.
+        return self.run(input_data)
+
 class ReverseNameTool(BaseTool):
+    concurrent_safe = True
+    speculative_safe = True
+    args_schema = {
+        "type": "object",
+        "properties": {"name": {"type": "string", "minLength": 1}},
+        "required": ["name"],
+        "additionalProperties": False,
+    }
+
     def run(self, input_data: dict) -> dict:
         name = input_data.get("name", "")
         return {"reversed_name": name[::-1]}
+
+    def summarize(self, output: dict):
+        if "reversed_name" not in output:
+            return None
+        return f"Your name backwards is {output['reversed_name']}."
+
+    async def arun(self, input_data: dict) -> dict:
+        return self.run(input_data)
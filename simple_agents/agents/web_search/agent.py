@@ -1,13 +1,18 @@
 from ...base.base_agent import BaseAgent
 from ...base.validation import validate_tool_plan
 from ...planner.llm_planner import LLMPlanner
-from ...coordinator_assistant import chat
+from ...llm.ollama_api import chat
+from ...utils.async_chat import achat
+from ...llm.client import achat_with, chat_with
+from ...llm.models import DEFAULT_MODEL
+from ...llm.warmup import WarmUpTarget
+from ...utils.logging_config import LazyJSON
 
 
 
 class WebSearchAgent(BaseAgent):
-    def __init__(self, agent_name: str, tools: dict, planner: LLMPlanner, model: str = "gemma3:4b"):
-        super().__init__(agent_name=agent_name, tools=tools, planner=planner)
+    def __init__(self, agent_name: str, tools: dict, planner: LLMPlanner, model: str = DEFAULT_MODEL, **kwargs):
+        super().__init__(agent_name=agent_name, tools=tools, planner=planner, **kwargs)
         self.model_name = model
         self.system_prompt = """You are a web search specialist agent. Your task is to:
 1. Plan and execute web searches to answer user queries
@@ -23,55 +28,82 @@ When summarizing results:
 - If no relevant information is found, say so clearly
 
 Available tools:
-- web_search: Search the web for information. Takes a 'query' parameter.
+- web_search: Search the web for information. Takes a 'query' parameter, or 'queries' with up to 4 phrasings of the question.
 """
 
     def plan(self):
-        user_input = self.task.get("user_input")
-        plan = self.planner.plan(user_input)
-        validate_tool_plan(plan)
-        self.state["steps"] = plan["steps"]
-        self.logger.info(f"{self.agent_name} planned steps: {plan['steps']}")
+        steps = self._preplanned_steps()
+        if steps is None:
+            user_input = self.task.get("user_input")
+            plan = self.planner.plan(user_input)
+            validate_tool_plan(plan)
+            steps = plan["steps"]
+        self.state["steps"] = steps
+        self.logger.info("%s planned steps: %s", self.agent_name, steps)
 
-    def _summarize_results(self, results):
-        """Summarize the search results using the LLM."""
-        messages = [
+    async def aplan(self):
+        steps = self._preplanned_steps()
+        if steps is None:
+            user_input = self.task.get("user_input")
+            plan = await self.planner.aplan(user_input)
+            validate_tool_plan(plan)
+            steps = plan["steps"]
+        self.state["steps"] = steps
+        self.logger.info("%s planned steps: %s", self.agent_name, steps)
+
+    def _tool_input(self, step: dict) -> dict:
+        arguments = super()._tool_input(step)
+        rank_query = self._query()  # No task yet while speculating
+        if step.get("tool_name") == "web_search" and rank_query:
+            return {**arguments, "rank_query": rank_query}  # Search results are ranked against the task too
+        return arguments
+
+    def warm_up_targets(self) -> list:
+        targets = super().warm_up_targets()
+        if self.summary_policy.agent_summaries != "none":
+            targets.append(WarmUpTarget("summarizer", self.model_name, self.system_prompt))
+        return targets
+
+    def _query(self) -> str:
+        task = self.task or {}
+        return task.get("task") or task.get("user_input") or ""
+
+    def _summary_messages(self, results):
+        return [
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": f"""Please summarize these search results to answer the user's query:
 
+Query: {self._query()}
+
 Search Results:
-{results}
+{self.renderer.tool_results(results)}
 
 Provide a clear, concise summary that directly answers the user's question."""}
         ]
-        
-        response = chat(self.model_name, messages)
+
+    def _summarize_results(self, results):
+        """Summarize the search results using the LLM."""
+        response = chat_with(self.llm, "summarizer", self.model_name, self._summary_messages(results), chat)
+        return response.message.content
+
+    async def _asummarize_results(self, results):
+        response = await achat_with(self.llm, "summarizer", self.model_name, self._summary_messages(results), achat)
         return response.message.content
 
     def execute(self):
-        results = []
-        for step in self.state["steps"]:
-            tool_name = step.get("tool_name")
-            arguments = step.get("arguments", {})
-
-            if tool_name not in self.tools:
-                raise ValueError(f"Tool '{tool_name}' not found.")
-
-            self.logger.info(f"{self.agent_name} executing {tool_name} with arguments: {arguments}")
-            output = self.tools[tool_name].run(arguments)
-            results.append({
-                "tool": tool_name,
-                "input": arguments,
-                "output": output
-            })
+        results = self.execute_steps(self.state["steps"])
 
         # Summarize the results
-        summary = self._summarize_results(results)
+        summary = self.summarize(results)
         
-        result = {
-            "agent": self.agent_name,
-            "results": results,
-            "summary": summary
-        }
-        self.logger.info(f"{self.agent_name} completed execution with results: {result}")
-        return result
\ No newline at end of file
+        result = self._agent_result(results, summary)
+        self.logger.info("%s completed execution with results: %s", self.agent_name, LazyJSON(result))
+        return result
+
+    async def aexecute(self):
+        results = await self.aexecute_steps(self.state["steps"])
+        summary = await self.asummarize(results)
+
+        result = self._agent_result(results, summary)
+        self.logger.info("%s completed execution with results: %s", self.agent_name, LazyJSON(result))
+        return result
@@ -0,0 +1,183 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger()
+
+# Queries about things that change minute to minute get a short TTL.
+VOLATILE_PATTERN = re.compile(
+    r"\b(price|prices|weather|temperature|forecast|now|today|tonight|current|currently|latest|live|news|score|scores|stock|stocks|rate|rates)\b"
+)
+VOLATILE_TTL = 60
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(re.sub(r"[^\w\s$%.-]", " ", query.lower()).split())
+
+
+def default_ttl(query: str) -> float:
+    """Seconds a result for ``query`` stays fresh."""
+    return VOLATILE_TTL if VOLATILE_PATTERN.search(normalize_query(query)) else DEFAULT_TTL
+
+
+class _Flight:
+    """A fetch in progress that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class SearchCache:
+    """Two-level cache for search results: an in-memory LRU in front of SQLite.
+
+    Concurrent misses for the same key are coalesced into a single fetch.
+    Without ``db_path`` only the in-memory level is used. The SQLite level
+    is pruned on open and every ``prune_every`` writes. Rows expired for
+    more than ``keep_stale_for`` seconds are deleted; they are kept that
+    long so a failing search can still serve them. The oldest rows are
+    deleted beyond ``max_disk_entries``.
+    """
+
+    def __init__(self, db_path: str = None, max_entries: int = 1024, ttl_policy=default_ttl, serve_stale_on_error: bool = True,
+                 max_disk_entries: int = 10000, keep_stale_for: float = DEFAULT_TTL, prune_every: int = 100):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.keep_stale_for = keep_stale_for
+        self.prune_every = max(1, prune_every)
+        self._writes = 0
+        self.ttl_policy = ttl_policy
+        self.serve_stale_on_error = serve_stale_on_error
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stale": 0, "coalesced": 0, "errors": 0}
+        self._memory = OrderedDict()  # key -> (expires_at, results)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, results TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            with self._lock:
+                self.prune()
+
+    @staticmethod
+    def make_key(query: str, max_results: int) -> str:
+        return f"{max_results}:{normalize_query(query)}"
+
+    def _count(self, name: str):
+        self.stats[name] += 1
+
+    def _lookup(self, key: str):
+        """Return ``(expires_at, results)`` from memory, then disk; caller holds the lock."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry, "memory"
+        if self._db is not None:
+            row = self._db.execute("SELECT expires_at, results FROM search_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._remember(key, entry)
+                return entry, "disk"
+        return None, None
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, key: str, query: str, results: list):
+        entry = (time.time() + self.ttl_policy(query), results)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, results, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(results), entry[0])
+                )
+                self._db.commit()
+                self._writes += 1
+                if self._writes % self.prune_every == 0:
+                    self.prune()
+
+    def prune(self) -> int:
+        """Delete long-expired rows, then the oldest rows over ``max_disk_entries``; caller holds the lock.
+
+        Returns the number of rows deleted.
+        """
+        if self._db is None:
+            return 0
+        deleted = self._db.execute("DELETE FROM search_cache WHERE expires_at < ?", (time.time() - self.keep_stale_for,)).rowcount
+        # INSERT OR REPLACE gives a rewritten row a new rowid, so rowid order is write order
+        deleted += self._db.execute(
+            "DELETE FROM search_cache WHERE rowid IN (SELECT rowid FROM search_cache ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        ).rowcount
+        self._db.commit()
+        if deleted:
+            logger.info("Pruned %d search cache rows", deleted)
+        return deleted
+
+    def get_or_fetch(self, query: str, max_results: int, fetch) -> list:
+        """Return cached results for the query, calling ``fetch()`` on a miss."""
+        key = self.make_key(query, max_results)
+        with self._lock:
+            entry, level = self._lookup(key)
+            if entry is not None and entry[0] > time.time():
+                self._count("hits" if level == "memory" else "disk_hits")
+                return entry[1]
+            stale = entry[1] if entry is not None else None
+            self._count("stale" if entry is not None else "misses")
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._count("coalesced")
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.results
+
+        try:
+            flight.results = fetch()
+            self._store(key, query, flight.results)
+        except Exception as e:
+            with self._lock:
+                self._count("errors")
+            if self.serve_stale_on_error and stale is not None:
+                logger.warning("Search failed for %r, serving stale results: %s", query, e)
+                flight.results = stale
+            else:
+                flight.error = e
+                raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.results
+
+    def clear(self):
+        """Drop every cached entry from both levels."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,67 @@
+from ...base.rendering import ResultRenderer
+from ...base.summarization import SummaryPolicy
+from ...base.validation import plan_schema
+from ...llm.client import LLMClient
+from ...llm.models import StageModels
+from ...planner.llm_planner import LLMPlanner
+from .agent import WebSearchAgent
+from .cache import SearchCache
+from .tools import WebSearchTool
+
+
+def build_web_search_agent(model: str, search_cache: SearchCache = None, summary_policy: SummaryPolicy = None, llm: LLMClient = None, stream_json: bool = False, constrained: bool = True, models: StageModels = None, renderer: ResultRenderer = None, **options) -> WebSearchAgent:
+    """Registry factory for the web search agent; coordinator options it does not use are ignored."""
+    models = models if models is not None else StageModels(model)
+    system_prompt = """
+    You are an AI assistant that decides how to answer a user's question using a web search tool.
+    
+    You will receive messages in this format:
+    {
+      "task_type": "websearch",
+      "user_input": "What's the weather like today?",
+      "task": "Search for current weather information",
+      "context": {
+        "relevant_info": "User wants current weather",
+        "user_intent": "get weather update",
+        "required_tools": ["web_search"]
+      },
+      "previous_results": [
+        {
+          "agent": "GreeterAgent",
+          "results": [...],
+          "summary": "Hello Alice!"
+        }
+      ]
+    }
+
+    Important fields to understand:
+    - user_input: The user's original query exactly as they typed it
+    - task: The coordinator's interpretation of what needs to be done
+    - context.relevant_info: Contains important details about what to search for
+    - context.user_intent: Tells you what the user wants to achieve
+    - context.required_tools: Indicates which tools you should use
+    - previous_results: May contain relevant information from other agents
+    
+    Available tools:
+    1. web_search(query: string) — performs a web search and returns short summaries of the top results.
+       For questions that can be phrased several ways, pass queries: [string, ...] instead
+       (up to 4 variants); they are searched together and the best results are kept.
+    
+    Only respond with JSON, do not include explanations or markdown.
+    Format:
+    {
+      "steps": [
+        {
+          "tool_name": "web_search",
+          "arguments": {
+            "query": "<search query>"
+          }
+        }
+      ]
+    }
+    """
+
+    tools = {"web_search": WebSearchTool(cache=search_cache)}
+    planner = LLMPlanner(model=models.model_for("planner", "websearch"), system_prompt=system_prompt, llm=llm, stream_json=stream_json, format_schema=plan_schema(tools) if constrained else None)
+
+    return WebSearchAgent(agent_name="WebSearchAgent", tools=tools, planner=planner, model=models.model_for("summarizer", "websearch"), summary_policy=summary_policy, llm=llm, renderer=renderer)
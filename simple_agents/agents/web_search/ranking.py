@@ -0,0 +1,85 @@
+import math
+import re
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Too common to tell passages apart
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were what when where which who will with".split()
+)
+# Query parameters that track the visit without changing the page
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src", "_ga"})
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def normalize_url(url: str) -> str:
+    """Scheme, "www.", host case, tracking parameters, parameter order and trailing slash don't make a different page."""
+    parts = urlsplit((url or "").strip())
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    params = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                    if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_"))
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{host}{parts.path.rstrip('/')}{query}"
+
+
+def _shingles(tokens: list, size: int = 3) -> set:
+    if len(tokens) < size:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the two texts' word 3-grams."""
+    sa, sb = _shingles(tokenize(a)), _shingles(tokenize(b))
+    if not sa or not sb:
+        return 0.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def dedupe(results: list, threshold: float = 0.5) -> list:
+    """Drop results whose URL was already seen or whose body nearly repeats an earlier one."""
+    kept, urls = [], set()
+    for result in results:
+        url = normalize_url(result.get("href"))
+        if url and url in urls:
+            continue
+        if any(similarity(result.get("body", ""), other.get("body", "")) >= threshold for other in kept):
+            continue
+        if url:
+            urls.add(url)
+        kept.append(result)
+    return kept
+
+
+def bm25_scores(query: str, documents: list, k1: float = 1.5, b: float = 0.75) -> list:
+    """Okapi BM25 score of each document for ``query``, with the documents as the corpus."""
+    docs = [tokenize(d) for d in documents]
+    if not docs:
+        return []
+    avg_len = sum(len(d) for d in docs) / len(docs) or 1.0
+    document_frequency = Counter(term for d in docs for term in set(d))
+    scores = []
+    for doc in docs:
+        counts = Counter(doc)
+        score = 0.0
+        for term in set(tokenize(query)):
+            tf = counts.get(term)
+            if not tf:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def rank(query: str, results: list, limit: int = None) -> list:
+    """Results sorted by BM25 score of title and body against ``query``; ties keep search order."""
+    scores = bm25_scores(query, [f"{r.get('title', '')} {r.get('body', '')}" for r in results])
+    order = sorted(range(len(results)), key=lambda i: -scores[i])
+    return [results[i] for i in order[:limit]]
@@ -1,17 +1,119 @@
 from ...base.base_tool import BaseTool
-from duckduckgo_search import DDGS
+from ...utils.deadline import check_deadline, remaining_time
+from ...utils.logging_config import LazyJSON
+from .ranking import dedupe, rank
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import logging
+import math
+import threading
 
+MAX_QUERIES = 4
+
+
+def DDGS(*args, **kwargs):
+    """Construct ``duckduckgo_search.DDGS``, importing it on the first search."""
+    from duckduckgo_search import DDGS as _DDGS
+
+    return _DDGS(*args, **kwargs)
+
+
+class _Session:
+    """One DDGS session, opened by the first query that misses the cache and shared by the rest."""
 
-class WebSearchTool(BaseTool):
     def __init__(self):
+        self._cm = None
+        self._ddgs = None
+        self._lock = threading.Lock()
+
+    def text(self, query: str, max_results: int) -> list:
+        with self._lock:
+            if self._ddgs is None:
+                check_deadline("Web search")
+                # DDGS times out after 10s by default; never wait past the request deadline
+                remaining = remaining_time()
+                kwargs = {} if remaining is None else {"timeout": max(1, min(10, math.ceil(remaining)))}
+                self._cm = DDGS(**kwargs)
+                self._ddgs = self._cm.__enter__()
+        return self._ddgs.text(query, max_results=max_results)
+
+    def close(self):
+        if self._cm is not None:
+            self._cm.__exit__(None, None, None)
+            self._cm = self._ddgs = None
+
+
+class WebSearchTool(BaseTool):
+    """DuckDuckGo search returning the ``max_passages`` best result snippets.
+
+    A step searches one ``query`` or up to MAX_QUERIES ``queries`` (phrasings
+    of the same question), fetched concurrently through one DDGS session with
+    ``max_results`` results each. Results are de-duplicated by URL and by
+    near-identical text, then ranked with BM25 against the queries plus
+    ``rank_query`` (the agent's task, when it passes one).
+    """
+
+    concurrent_safe = True
+    speculative_safe = True
+    args_schema = {
+        "anyOf": [
+            {
+                "type": "object",
+                "properties": {"query": {"type": "string", "minLength": 1}},
+                "required": ["query"],
+                "additionalProperties": False,
+            },
+            {
+                "type": "object",
+                "properties": {
+                    "queries": {"type": "array", "items": {"type": "string", "minLength": 1}, "minItems": 1, "maxItems": MAX_QUERIES}
+                },
+                "required": ["queries"],
+                "additionalProperties": False,
+            },
+        ]
+    }
+
+    def __init__(self, cache=None, max_results: int = 3, max_passages: int = None, duplicate_threshold: float = 0.5):
         self.logger = logging.getLogger()
+        self.cache = cache  # Optional SearchCache shared across calls
+        self.max_results = max_results  # Per query
+        self.max_passages = max_passages or max_results
+        self.duplicate_threshold = duplicate_threshold
 
-    def run(self, input_data: dict) -> dict:
-        query = input_data.get("query", "")
-        self.logger.info(f"Querying DuckDuckGo: {query}")
+    def _search(self, session: _Session, query: str) -> list:
+        self.logger.info("Querying DuckDuckGo: %s", query)
+        results = [{"title": r.get("title", ""), "href": r.get("href", ""), "body": r["body"]}
+                   for r in session.text(query, max_results=self.max_results)]
+        self.logger.info("Query results: %s", LazyJSON(results))
+        return results
 
-        with DDGS() as ddgs:
-            results = [r["body"] for r in ddgs.text(query, max_results=3)]
-        self.logger.info(f"Query results: {results}")
-        return {"results": results}
\ No newline at end of file
+    def _fetch(self, session: _Session, query: str) -> list:
+        if self.cache is None:
+            results = self._search(session, query)
+        else:
+            results = self.cache.get_or_fetch(query, self.max_results, lambda: self._search(session, query))
+        # Entries cached before results kept their URL hold just the body
+        return [r if isinstance(r, dict) else {"body": r} for r in results]
+
+    def _fetch_all(self, queries: list) -> list:
+        session = _Session()
+        try:
+            if len(queries) == 1:
+                return self._fetch(session, queries[0])
+            with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="web-search") as pool:
+                futures = [pool.submit(contextvars.copy_context().run, self._fetch, session, q) for q in queries]
+                return [r for future in futures for r in future.result()]
+        finally:
+            session.close()
+
+    @staticmethod
+    def _queries(input_data: dict) -> list:
+        queries = input_data.get("queries") or [input_data.get("query", "")]
+        return list(dict.fromkeys(q.strip() for q in queries[:MAX_QUERIES]))
+
+    def run(self, input_data: dict) -> dict:
+        queries = self._queries(input_data)
+        results = dedupe(self._fetch_all(queries), self.duplicate_threshold)
+        ranked = rank(" ".join([input_data.get("rank_query", ""), *queries]), results, limit=self.max_passages)
+        return {"results": [r["body"] for r in ranked]}
@@ -1,31 +1,377 @@
+import asyncio
+import contextvars
 import logging
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from ..llm.warmup import WarmUpTarget
+from ..tracing.tracer import span
+from ..utils.deadline import DeadlineExceeded, low_on_time, remaining_time
+from .context import AgentContext
+from .rendering import ResultRenderer
+from .summarization import SummaryPolicy
+from .validation import validate_tool_arguments, validate_tool_plan
 
 class BaseAgent:
-    def __init__(self, agent_name, tools=None, planner=None):
+    # Whether one instance may run several tasks at once. BaseAgent keeps
+    # per-invocation state on an AgentContext; agents that keep it on the
+    # instance should set this False so the coordinator runs them one at a time.
+    reentrant = True
+
+    def __init__(self, agent_name, tools=None, planner=None, max_workers: int = 4, step_timeout: float = None, summary_policy: SummaryPolicy = None, llm=None, renderer: ResultRenderer = None):
         self.agent_name = agent_name
         self.tools = tools or {}
         self.planner = planner
-        self.state = {}
-        self.messages = {}  # Dictionary to store latest messages by type
+        self.summary_policy = summary_policy or SummaryPolicy()
+        self.llm = llm  # Optional shared LLMClient for the agent's own LLM calls
+        self.renderer = renderer or ResultRenderer()  # Tool results as compact summarizer-prompt text
+        self.max_workers = max_workers  # Upper bound on tool steps running at once
+        self.step_timeout = step_timeout  # Seconds a single tool step may take, None for no limit
+        # task/state/messages live on the AgentContext of the running invocation;
+        # outside run()/arun() they fall back to this instance-level context.
+        self._default_context = AgentContext()
+        self._current_context = contextvars.ContextVar(f"agent_context_{id(self)}", default=None)
         self.logger = logging.getLogger()
 
+    @property
+    def context(self) -> AgentContext:
+        return self._current_context.get() or self._default_context
+
+    @property
+    def task(self):
+        return self.context.task
+
+    @task.setter
+    def task(self, task: dict):
+        self.context.task = task
+
+    @property
+    def state(self) -> dict:
+        return self.context.state
+
+    @state.setter
+    def state(self, state: dict):
+        self.context.state = state
+
+    @property
+    def messages(self) -> dict:
+        return self.context.messages
+
     def receive_task(self, task: dict):
         self.task = task
         self.state = {"status": "received", "task_type": task.get("task_type")}
         # Store the latest task received message
-        self.messages["task_received"] = str(task)
-        self.logger.info(f"{self.agent_name} received task: {task}")
+        self.messages["task_received"] = task
+        self.logger.info("%s received task: %s", self.agent_name, task)
 
     def plan(self):
         raise NotImplementedError("Subclasses must implement plan()")
 
+    def warm_up_targets(self) -> list:
+        """WarmUpTargets for the LLM calls this agent makes; subclasses add their own."""
+        if self.planner is None or not getattr(self.planner, "model", None):
+            return []
+        return [WarmUpTarget("planner", self.planner.model, getattr(self.planner, "system_prompt", None))]
+
     def execute(self):
         raise NotImplementedError("Subclasses must implement execute()")
 
     def run(self, task: dict):
-        self.receive_task(task)
-        self.plan()
-        result = self.execute()
-        # Store the latest result message
-        self.messages["result"] = str(result)
+        token = self._current_context.set(AgentContext(task))
+        try:
+            self.receive_task(task)
+            with span("plan", agent=self.agent_name):
+                self.plan()
+            result = self.execute()
+            # Store the latest result message
+            self.messages["result"] = result
+            return result
+        finally:
+            self._current_context.reset(token)
+
+    def _preplanned_steps(self):
+        """Steps planned upstream (e.g. by a combined router), or None to use the planner.
+
+        Invalid or empty pre-planned steps are discarded so a bad combined
+        plan costs one planner call rather than the whole request.
+        """
+        steps = self.task.get("steps")
+        if not steps:
+            return None
+        try:
+            validate_tool_plan({"steps": steps})
+            self._check_steps(steps)
+        except ValueError as e:
+            self.logger.warning("%s ignoring pre-planned steps: %s", self.agent_name, e)
+            return None
+        self.logger.info("%s using pre-planned steps, skipping the planner", self.agent_name)
+        return steps
+
+    # --- Step execution ---
+
+    def _check_steps(self, steps: list):
+        for step in steps:
+            tool_name = step.get("tool_name")
+            if tool_name not in self.tools:
+                raise ValueError(f"Tool '{tool_name}' not found.")
+            validate_tool_arguments(tool_name, self.tools[tool_name].args_schema, step.get("arguments", {}))
+
+    def _step_result(self, step: dict, output: dict) -> dict:
+        return {
+            "tool": step.get("tool_name"),
+            "input": step.get("arguments", {}),
+            "output": output
+        }
+
+    def _prefetched_output(self, step: dict):
+        """Output of this exact step if it already ran speculatively, else None."""
+        for result in (self.task or {}).get("prefetched") or []:
+            if result.get("tool") == step.get("tool_name") and result.get("input") == step.get("arguments", {}):
+                return result.get("output")
+        return None
+
+    def _tool_input(self, step: dict) -> dict:
+        """Input handed to the step's tool; agents may add request context the planner doesn't write."""
+        return step.get("arguments", {})
+
+    def _run_tool(self, step: dict) -> dict:
+        output = self._prefetched_output(step)
+        if output is not None:
+            return output
+        with span(f"tool:{step['tool_name']}", agent=self.agent_name):
+            return self.tools[step["tool_name"]].run(self._tool_input(step))
+
+    def _step_time_limit(self):
+        """Seconds a step may take: step_timeout, capped by the request's remaining time."""
+        remaining = remaining_time()
+        if remaining is None:
+            return self.step_timeout
+        return remaining if self.step_timeout is None else min(self.step_timeout, remaining)
+
+    def _timeout_output(self, step: dict, seconds: float) -> dict:
+        message = f"Tool '{step.get('tool_name')}' timed out after {round(seconds, 2)}s"
+        self.logger.warning("%s: %s", self.agent_name, message)
+        return {"error": message}
+
+    def execute_steps(self, steps: list) -> list:
+        """Run plan steps and return their results in plan order.
+
+        Steps whose tool is ``concurrent_safe`` run on a thread pool of up to
+        ``max_workers`` threads; the others run one at a time, in plan order,
+        alongside them. A step exceeding ``step_timeout`` (or the request's
+        remaining time) gets an error output instead of blocking the agent; a
+        tool exception still fails the agent.
+        """
+        self._check_steps(steps)
+        for step in steps:
+            self.logger.info("%s executing %s with arguments: %s", self.agent_name, step.get('tool_name'), step.get('arguments', {}))
+
+        concurrent = [i for i, step in enumerate(steps) if self.tools[step["tool_name"]].concurrent_safe]
+        if self._step_time_limit() is None and len(concurrent) < 2:
+            # Nothing to overlap and nothing to time out: skip the thread pool.
+            return [self._step_result(step, self._run_tool(step)) for step in steps]
+
+        results = [None] * len(steps)
+        pending_concurrent = deque(concurrent)
+        pending_serial = deque(sorted(set(range(len(steps))) - set(concurrent)))
+        in_flight = {}  # future -> (step index, deadline, runs on the serial lane, time limit)
+        pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers))
+
+        def submit(i, is_serial):
+            step = steps[i]
+            future = pool.submit(contextvars.copy_context().run, self._run_tool, step)
+            limit = self._step_time_limit()
+            deadline = None if limit is None else time.monotonic() + limit
+            in_flight[future] = (i, deadline, is_serial, limit)
+
+        try:
+            while pending_concurrent or pending_serial or in_flight:
+                serial_running = any(is_serial for _, _, is_serial, _ in in_flight.values())
+                if pending_serial and not serial_running and len(in_flight) < max(1, self.max_workers):
+                    submit(pending_serial.popleft(), True)
+                while pending_concurrent and len(in_flight) < max(1, self.max_workers):
+                    submit(pending_concurrent.popleft(), False)
+
+                deadlines = [d for _, d, _, _ in in_flight.values() if d is not None]
+                timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, _, _, _ = in_flight.pop(future)
+                    results[i] = self._step_result(steps[i], future.result())
+                now = time.monotonic()
+                for future, (i, deadline, _, limit) in list(in_flight.items()):
+                    if deadline is not None and now >= deadline:
+                        # The thread keeps running in the background; we stop waiting for it.
+                        del in_flight[future]
+                        results[i] = self._step_result(steps[i], self._timeout_output(steps[i], limit))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    async def aexecute_steps(self, steps: list) -> list:
+        """Async counterpart of execute_steps with the same ordering and timeout rules."""
+        self._check_steps(steps)
+        semaphore = asyncio.Semaphore(max(1, self.max_workers))
+        serial_lock = asyncio.Lock()
+
+        async def run_step(step):
+            tool = self.tools[step["tool_name"]]
+            arguments = self._tool_input(step)
+            async with semaphore:
+                if tool.concurrent_safe:
+                    output = await self._arun_tool(tool, step, arguments)
+                else:
+                    async with serial_lock:
+                        output = await self._arun_tool(tool, step, arguments)
+            return self._step_result(step, output)
+
+        return list(await asyncio.gather(*(run_step(step) for step in steps)))
+
+    async def _arun_tool(self, tool, step: dict, arguments: dict) -> dict:
+        output = self._prefetched_output(step)
+        if output is not None:
+            return output
+        self.logger.info("%s executing %s with arguments: %s", self.agent_name, step.get('tool_name'), arguments)
+        limit = self._step_time_limit()
+        with span(f"tool:{step['tool_name']}", agent=self.agent_name) as tool_span:
+            try:
+                return await asyncio.wait_for(tool.arun(arguments), timeout=limit)
+            except asyncio.TimeoutError:
+                if tool_span is not None:
+                    tool_span.set_attribute("timed_out", True)
+                return self._timeout_output(step, limit)
+
+    # --- Speculation ---
+
+    def _speculative_step(self, steps: list):
+        """The first step, if its tool is safe to call before routing has settled."""
+        return steps[0] if steps and self.tools[steps[0]["tool_name"]].speculative_safe else None
+
+    def _speculative_tool_input(self, user_input: str, step: dict) -> dict:
+        """Tool input prepared as in execute_steps, with the raw request standing in for the task."""
+        token = self._current_context.set(AgentContext({"user_input": user_input}))
+        try:
+            return self._tool_input(step)
+        finally:
+            self._current_context.reset(token)
+
+    def _speculative_plan(self, plan: dict) -> list:
+        validate_tool_plan(plan)
+        self._check_steps(plan["steps"])
+        return plan["steps"]
+
+    def speculate(self, user_input: str, run_tools: bool = False) -> dict:
+        """Plan ``user_input`` before the router has assigned this agent.
+
+        Returns task fields (``steps`` and ``prefetched`` tool results) that
+        the coordinator merges into the task if the router does pick this
+        agent. With ``run_tools`` the first step runs too when its tool is
+        ``speculative_safe``.
+        """
+        steps = self._speculative_plan(self.planner.plan(user_input))
+        prefetched = []
+        step = self._speculative_step(steps) if run_tools else None
+        if step is not None:
+            with span(f"tool:{step['tool_name']}", agent=self.agent_name):
+                prefetched.append(self._step_result(step, self.tools[step["tool_name"]].run(self._speculative_tool_input(user_input, step))))
+        return {"steps": steps, "prefetched": prefetched}
+
+    async def aspeculate(self, user_input: str, run_tools: bool = False) -> dict:
+        steps = self._speculative_plan(await self.planner.aplan(user_input))
+        prefetched = []
+        step = self._speculative_step(steps) if run_tools else None
+        if step is not None:
+            with span(f"tool:{step['tool_name']}", agent=self.agent_name):
+                prefetched.append(self._step_result(step, await self.tools[step["tool_name"]].arun(self._speculative_tool_input(user_input, step))))
+        return {"steps": steps, "prefetched": prefetched}
+
+    # --- Summaries ---
+
+    def _summarize_results(self, results):
+        raise NotImplementedError("Subclasses must implement _summarize_results()")
+
+    async def _asummarize_results(self, results):
+        return await asyncio.to_thread(self._summarize_results, results)
+
+    def _template_summary(self, results: list):
+        """Join the tools' deterministic summaries, or None if any tool has none."""
+        parts = []
+        for result in results:
+            text = self.tools[result["tool"]].summarize(result["output"])
+            if text is None:
+                return None
+            parts.append(text)
+        return " ".join(parts)
+
+    def _degraded_summary(self, summarize_span, results: list, reason: str):
+        """Summary without an LLM call when the request is short of time."""
+        self.logger.warning("%s skipping LLM summary: %s", self.agent_name, reason)
+        if summarize_span is not None:
+            summarize_span.set_attribute("degraded", reason)
+        return self._template_summary(results)
+
+    def summarize(self, results: list):
+        """Summarize tool results according to the summary policy; None means no summary.
+
+        Close to the request deadline only tool summaries are used, and the
+        formatter reads the raw tool output of tools without one.
+        """
+        mode = self.summary_policy.agent_summaries
+        if mode == "none":
+            return None
+        with span("summarize", agent=self.agent_name, mode=mode) as summarize_span:
+            if mode == "template":
+                summary = self._template_summary(results)
+                if summary is not None:
+                    return summary
+            if low_on_time("summary"):
+                return self._degraded_summary(summarize_span, results, "low on time")
+            try:
+                return self._summarize_results(results)
+            except DeadlineExceeded as e:
+                return self._degraded_summary(summarize_span, results, str(e))
+
+    async def asummarize(self, results: list):
+        mode = self.summary_policy.agent_summaries
+        if mode == "none":
+            return None
+        with span("summarize", agent=self.agent_name, mode=mode) as summarize_span:
+            if mode == "template":
+                summary = self._template_summary(results)
+                if summary is not None:
+                    return summary
+            if low_on_time("summary"):
+                return self._degraded_summary(summarize_span, results, "low on time")
+            try:
+                return await self._asummarize_results(results)
+            except DeadlineExceeded as e:
+                return self._degraded_summary(summarize_span, results, str(e))
+
+    def _agent_result(self, results: list, summary) -> dict:
+        result = {"agent": self.agent_name, "results": results}
+        if summary is not None:
+            result["summary"] = summary
         return result
+
+    # --- Async API ---
+    # Subclasses with LLM or network calls should override aplan/aexecute;
+    # the defaults push the sync implementation onto a worker thread.
+
+    async def aplan(self):
+        await asyncio.to_thread(self.plan)
+
+    async def aexecute(self):
+        return await asyncio.to_thread(self.execute)
+
+    async def arun(self, task: dict):
+        token = self._current_context.set(AgentContext(task))
+        try:
+            self.receive_task(task)
+            with span("plan", agent=self.agent_name):
+                await self.aplan()
+            result = await self.aexecute()
+            self.messages["result"] = result
+            return result
+        finally:
+            self._current_context.reset(token)
@@ -1,3 +1,28 @@
+import asyncio
+
+
 class BaseTool:
+    # Whether several calls of this tool may run at the same time. Tools that
+    # touch shared state should leave this False so their steps run in order.
+    concurrent_safe = False
+    # JSON Schema for the ``arguments`` of a step calling this tool. It drives
+    # constrained plan generation and is checked before the tool runs.
+    args_schema = None
+    # Whether a call may be made ahead of routing and thrown away if the
+    # router picks another agent. Only true for read-only tools.
+    speculative_safe = False
+
     def run(self, input_data: dict) -> dict:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def summarize(self, output: dict):
+        """Deterministic one-line summary of this tool's output, or None to defer to the LLM."""
+        return None
+
+    async def arun(self, input_data: dict) -> dict:
+        """Run the tool without blocking the event loop.
+
+        Tools wrapping blocking I/O get a worker thread by default; tools with
+        a native async implementation should override this.
+        """
+        return await asyncio.to_thread(self.run, input_data)
@@ -0,0 +1,11 @@
+class AgentContext:
+    """State of one agent invocation: the task, planned steps and messages.
+
+    BaseAgent.run/arun create a fresh context per call, so a single agent
+    instance can serve several requests at once.
+    """
+
+    def __init__(self, task: dict = None):
+        self.task = task
+        self.state = {"status": "received", "task_type": task.get("task_type")} if task is not None else {}
+        self.messages = {}  # Latest messages by type
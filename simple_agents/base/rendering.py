@@ -0,0 +1,79 @@
+import json
+
+from ..utils.tokens import CHARS_PER_TOKEN, count_tokens
+
+# Prompt tokens the rendered results may take per stage; None for no limit.
+DEFAULT_RENDER_BUDGETS = {"formatter": 1500, "summarizer": 1000}
+# Longest string kept in a rendered output at each step of shrinking
+STRING_LIMITS = (None, 400, 200, 100, 40)
+ELLIPSIS = "…"
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True, ensure_ascii=False, default=str)
+
+
+def shorten(value, max_chars: int = None):
+    """``value`` with every string longer than ``max_chars`` cut short."""
+    if max_chars is None:
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars - 1] + ELLIPSIS
+    if isinstance(value, dict):
+        return {k: shorten(v, max_chars) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [shorten(v, max_chars) for v in value]
+    return value
+
+
+class ResultRenderer:
+    """Turns tool and agent results into compact prompt text within a token budget.
+
+    Each tool result becomes one ``<tool> <input>: <output>`` line, input
+    and output as compact JSON with sorted keys; the input tells the
+    summarizer what was asked, e.g. the search query. When the text is over
+    the stage's budget in ``budgets``, raw output of agents that have a
+    summary is dropped first, then long strings are cut shorter and
+    shorter, and finally the text itself is truncated.
+    """
+
+    def __init__(self, budgets: dict = None):
+        self.budgets = {**DEFAULT_RENDER_BUDGETS, **(budgets or {})}
+
+    @staticmethod
+    def _tool_line(result: dict, max_chars: int = None) -> str:
+        call = result.get("tool")
+        if result.get("input"):
+            call = f"{call} {compact_json(shorten(result['input'], max_chars))}"
+        return f"{call}: {compact_json(shorten(result.get('output'), max_chars))}"
+
+    def _tool_lines(self, results: list, max_chars: int = None) -> list:
+        return [self._tool_line(r, max_chars) for r in results]
+
+    def _agent_block(self, result: dict, drop_outputs: bool, max_chars: int = None) -> str:
+        lines = [f"## {result.get('agent', 'Agent')}"]
+        if result.get("summary"):
+            lines.append(f"summary: {shorten(result['summary'], max_chars)}")
+        if result.get("error"):
+            lines.append(f"error: {shorten(result['error'], max_chars)}")
+        if not (drop_outputs and result.get("summary")):
+            lines.extend(self._tool_lines(result.get("results") or [], max_chars))
+        return "\n".join(lines)
+
+    def _fit(self, stage: str, render) -> str:
+        budget = self.budgets.get(stage)
+        text = ""
+        for drop_outputs, max_chars in [(False, None)] + [(True, limit) for limit in STRING_LIMITS]:
+            text = render(drop_outputs, max_chars)
+            if budget is None or count_tokens(text) <= budget:
+                return text
+        return text[:budget * CHARS_PER_TOKEN - 1] + ELLIPSIS
+
+    def tool_results(self, results: list, stage: str = "summarizer") -> str:
+        """One agent's tool results, for its summarizer prompt."""
+        return self._fit(stage, lambda drop_outputs, max_chars: "\n".join(self._tool_lines(results, max_chars)))
+
+    def agent_results(self, agent_results: list, stage: str = "formatter") -> str:
+        """Every agent's summary and tool results, for the formatter prompt."""
+        return self._fit(stage, lambda drop_outputs, max_chars: "\n\n".join(
+            self._agent_block(r, drop_outputs, max_chars) for r in agent_results))
@@ -0,0 +1,29 @@
+AGENT_SUMMARY_MODES = ("llm", "template", "none")
+
+
+class SummaryPolicy:
+    """Controls how many LLM calls are spent turning tool output into prose.
+
+    agent_summaries:
+      - "llm": each agent asks the LLM to summarize its tool results (default).
+      - "template": use the tools' own deterministic summaries when every tool
+        in the plan provides one, falling back to the LLM otherwise.
+      - "none": skip per-agent summaries; the formatter reads raw tool output.
+    direct_single_agent: when exactly one agent ran and produced a summary,
+      return it as the reply instead of calling the formatter.
+    """
+
+    def __init__(self, agent_summaries: str = "llm", direct_single_agent: bool = False):
+        if agent_summaries not in AGENT_SUMMARY_MODES:
+            raise ValueError(f"agent_summaries must be one of {AGENT_SUMMARY_MODES}, got {agent_summaries!r}")
+        self.agent_summaries = agent_summaries
+        self.direct_single_agent = direct_single_agent
+
+    def direct_reply(self, results: list):
+        """Return the reply to send without formatting, or None to call the formatter."""
+        if not self.direct_single_agent or len(results) != 1:
+            return None
+        result = results[0]
+        if "error" in result:
+            return None
+        return result.get("summary") or None
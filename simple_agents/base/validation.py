@@ -6,4 +6,149 @@ def validate_tool_plan(plan: dict):
 
     for i, step in enumerate(plan["steps"]):
         if not all(k in step for k in ("tool_name", "arguments")):
-            raise ValueError(f"Step {i} missing 'tool_name' or 'arguments': {step}")
\ No newline at end of file
+            raise ValueError(f"Step {i} missing 'tool_name' or 'arguments': {step}")
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def _type_matches(value, expected: str) -> bool:
+    if expected in ("integer", "number") and isinstance(value, bool):
+        return False
+    return isinstance(value, _JSON_TYPES[expected])
+
+
+def validate_against_schema(value, schema: dict, path: str = "$"):
+    """Check ``value`` against the JSON Schema subset used for tool arguments.
+
+    Supports type, enum, const, properties, required, additionalProperties,
+    items, minItems, maxItems, minLength, maxLength, minimum, maximum and anyOf.
+    Raises ValueError naming the offending path.
+    """
+    if "anyOf" in schema:
+        errors = []
+        for option in schema["anyOf"]:
+            try:
+                validate_against_schema(value, option, path)
+                return
+            except ValueError as e:
+                errors.append(str(e))
+        raise ValueError(f"{path} matches none of the allowed forms: {'; '.join(errors)}")
+
+    expected = schema.get("type")
+    if expected is not None:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_type_matches(value, t) for t in types):
+            raise ValueError(f"{path} must be of type {expected}, got {type(value).__name__}")
+    if "const" in schema and value != schema["const"]:
+        raise ValueError(f"{path} must be {schema['const']!r}, got {value!r}")
+    if "enum" in schema and value not in schema["enum"]:
+        raise ValueError(f"{path} must be one of {schema['enum']}, got {value!r}")
+
+    if isinstance(value, str):
+        if len(value) < schema.get("minLength", 0):
+            raise ValueError(f"{path} must be at least {schema['minLength']} characters")
+        if "maxLength" in schema and len(value) > schema["maxLength"]:
+            raise ValueError(f"{path} must be at most {schema['maxLength']} characters")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            raise ValueError(f"{path} must be >= {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            raise ValueError(f"{path} must be <= {schema['maximum']}")
+    if isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            raise ValueError(f"{path} must have at least {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            raise ValueError(f"{path} must have at most {schema['maxItems']} items")
+        if "items" in schema:
+            for i, item in enumerate(value):
+                validate_against_schema(item, schema["items"], f"{path}[{i}]")
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for key in schema.get("required", []):
+            if key not in value:
+                raise ValueError(f"{path} is missing required field '{key}'")
+        for key, item in value.items():
+            if key in properties:
+                validate_against_schema(item, properties[key], f"{path}.{key}")
+            elif schema.get("additionalProperties") is False:
+                raise ValueError(f"{path} has unexpected field '{key}'")
+
+
+def validate_tool_arguments(tool_name: str, schema: dict, arguments):
+    """Validate a step's arguments against its tool's ``args_schema`` before running it."""
+    if schema is None:
+        return
+    try:
+        validate_against_schema(arguments, schema, "arguments")
+    except ValueError as e:
+        raise ValueError(f"Invalid arguments for tool '{tool_name}': {e}")
+
+
+def step_schema(tool_name: str, args_schema: dict = None) -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "tool_name": {"type": "string", "enum": [tool_name]},
+            "arguments": args_schema or {"type": "object"},
+        },
+        "required": ["tool_name", "arguments"],
+    }
+
+
+def steps_schema(tools: dict) -> dict:
+    return {
+        "type": "array",
+        "items": {"anyOf": [step_schema(name, tool.args_schema) for name, tool in tools.items()]},
+        "minItems": 1,
+    }
+
+
+def plan_schema(tools: dict) -> dict:
+    """JSON Schema for a planner reply that can only call ``tools`` with valid arguments."""
+    return {
+        "type": "object",
+        "properties": {"steps": steps_schema(tools)},
+        "required": ["steps"],
+    }
+
+
+def routing_schema(agent_tools: dict, with_steps: bool = False) -> dict:
+    """JSON Schema for a routing decision over ``agent_tools`` (agent name -> tools).
+
+    ``tools`` maps tool names to tools or tool classes. With ``with_steps``
+    (combined mode) each assignment also carries tool steps restricted to
+    that agent's own tools, so only then are their ``args_schema`` read.
+    """
+    assignments = []
+    for name, tools in agent_tools.items():
+        properties = {
+            "agent": {"type": "string", "enum": [name]},
+            "task": {"type": "string"},
+            "context": {
+                "type": "object",
+                "properties": {
+                    "relevant_info": {"type": "string"},
+                    "user_intent": {"type": "string"},
+                    "required_tools": {"type": "array", "items": {"type": "string", "enum": list(tools)}},
+                },
+            },
+            "depends_on": {"type": "array", "items": {"type": "integer", "minimum": 0}},
+        }
+        required = ["agent", "task"]
+        if with_steps:
+            properties["steps"] = steps_schema(tools)
+            required.append("steps")
+        assignments.append({"type": "object", "properties": properties, "required": required})
+    return {
+        "type": "object",
+        "properties": {"agents": {"type": "array", "items": {"anyOf": assignments}}},
+        "required": ["agents"],
+    }
@@ -0,0 +1,127 @@
+"""Offline batch runs over JSONL files.
+
+    simple-agents-batch queries.jsonl results.jsonl --field input --concurrency 8
+
+Each input line is a JSON object with the user input in ``--field`` (or a
+bare JSON string). Each output line is one result record with its input
+``line`` number, ``output`` or ``error``, ``duration_s`` and ``llm_calls``.
+Output is appended as items finish. Re-running with the same output file
+skips lines that are already done, so a crashed run picks up where it
+stopped. Lines whose latest record has an ``error`` run again, unless
+``--no-retry-errors`` is given; the retry appends a newer record for the
+line, and the last record of a line is the one that counts.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger()
+
+
+def read_inputs(path: str, field: str = "input"):
+    """Yield ``(line_number, user_input)`` for every usable line of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping line %d: invalid JSON (%s)", line_number, e)
+                continue
+            text = item.get(field) if isinstance(item, dict) else item
+            if not isinstance(text, str) or not text.strip():
+                logger.warning("Skipping line %d: no %r text", line_number, field)
+                continue
+            yield line_number, text
+
+
+def completed_lines(path: str, retry_errors: bool = False) -> set:
+    """Input line numbers already recorded in an output file.
+
+    With ``retry_errors``, lines whose latest record has an ``error`` are
+    left out so they run again. A trailing partial record left by a crash
+    is truncated away.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    failed = {}  # line -> whether its latest record has an error
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+            failed[record["line"]] = record.get("error") is not None
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return {line for line, error in failed.items() if not (retry_errors and error)}
+
+
+def run_file(assistant, input_path: str, output_path: str, field: str = "input", concurrency: int = 4, resume: bool = True,
+             retry_errors: bool = True) -> dict:
+    """Run every pending line of ``input_path`` and append records to ``output_path``.
+
+    When resuming, lines that errored last time are pending again unless ``retry_errors`` is False.
+    """
+    done = completed_lines(output_path, retry_errors=retry_errors) if resume else set()
+    line_numbers = []  # batch index -> input line number
+
+    def pending():
+        for line_number, text in read_inputs(input_path, field):
+            if line_number not in done:
+                line_numbers.append(line_number)
+                yield text
+
+    counts = {"skipped": len(done), "completed": 0, "errors": 0, "duplicates": 0}
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+        for record in assistant.iter_batch(pending(), concurrency=concurrency):
+            record = {"line": line_numbers[record["index"]], **{k: v for k, v in record.items() if k != "index"}}
+            if "duplicate_of" in record:
+                record["duplicate_of"] = line_numbers[record["duplicate_of"]]
+                counts["duplicates"] += 1
+            counts["completed"] += 1
+            counts["errors"] += record["error"] is not None
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a JSONL file of user inputs through the coordinator.")
+    parser.add_argument("input", help="JSONL file with one input per line")
+    parser.add_argument("output", help="JSONL file to append results to")
+    parser.add_argument("--field", default="input", help="key holding the user input in each object (default: input)")
+    parser.add_argument("--concurrency", type=int, default=4, help="inputs processed at once (default: 4)")
+    parser.add_argument("--model", default=None, help="Ollama model for every stage")
+    parser.add_argument("--host", default=None, help="Ollama host (default: OLLAMA_HOST or localhost)")
+    parser.add_argument("--plan-mode", choices=("separate", "combined"), default="separate")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of skipping finished lines")
+    parser.add_argument("--no-retry-errors", action="store_true", help="when resuming, also skip lines that failed")
+    parser.add_argument("--log-file", default=None, help="also write logs to this file")
+    args = parser.parse_args(argv)
+
+    from .coordinator_assistant import MODEL, CoordinatorAssistant
+    from .llm.client import LLMClient
+    from .utils.logging_config import configure_logging
+
+    configure_logging(args.log_file, level=logging.INFO if args.log_file else logging.WARNING, console=not args.log_file)
+    llm = LLMClient(host=args.host, max_concurrency=args.concurrency)
+    assistant = CoordinatorAssistant(model=args.model or MODEL, plan_mode=args.plan_mode, llm=llm)
+    counts = run_file(assistant, args.input, args.output, field=args.field, concurrency=args.concurrency, resume=not args.no_resume,
+                      retry_errors=not args.no_retry_errors)
+    print(
+        f"{counts['completed']} completed ({counts['errors']} errors, {counts['duplicates']} duplicates), "
+        f"{counts['skipped']} already done",
+        file=sys.stderr
+    )
+    return 1 if counts["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
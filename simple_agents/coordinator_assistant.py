@@ -1,20 +1,38 @@
-import json
+import asyncio
+import contextvars
+import hashlib
 import logging
-from ollama import chat
-
-from .agents.greet.agent import GreetUserAgent
-from .agents.greet.tools import GreetUserTool, ReverseNameTool
-
-from .agents.web_search.agent import WebSearchAgent
-from .agents.web_search.tools import WebSearchTool
-
-from .planner.llm_planner import LLMPlanner
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .agents.web_search.cache import SearchCache
+
+from .base.rendering import ResultRenderer, compact_json
+from .base.summarization import SummaryPolicy
+from .base.validation import routing_schema
+from .history import normalize_history, render_prompt
+from .registry import AgentRegistry, LazyAgents
+from .scheduler import arun_dependency_graph, resolve_dependencies, run_dependency_graph
+from .utils.async_chat import achat
+from .utils.deadline import DeadlineExceeded, deadline_scope, low_on_time
 from .utils.json_utils import extract_json
+from .utils.logging_config import LazyJSON
+from .llm.client import achat_json_with, achat_with, chat_json_with, chat_with
+from .llm.models import DEFAULT_MODEL, StageModels
+from .llm.ollama_api import chat
+from .llm.warmup import KeepAlive, WarmUpTarget, warm_up
+from .tracing.tracer import Tracer, current_span, span
+from .utils.metrics import start_llm_call_count
 
 # Get the root logger
 logger = logging.getLogger()
 
-MODEL = "gemma3:4b"
+MODEL = DEFAULT_MODEL
+
+NO_AGENT_RESPONSE = "I'm not sure how to help with that request. Could you please rephrase?"
+NO_RESULTS_RESPONSE = "I encountered an error while processing your request. Please try again."
+TIMEOUT_RESPONSE = "Sorry, that took too long to answer. Please try again."
 
 # --- LLM PROMPTS ---
 
@@ -51,6 +69,7 @@ Consider:
 - Be specific in the task description for each agent
 - Include any relevant context that the agent might need
 - Choose agents based on their available tools and capabilities
+- Leave "depends_on" empty unless an agent truly needs another agent's output; independent agents run in parallel
 
 Respond in this format:
 {
@@ -62,12 +81,32 @@ Respond in this format:
         "relevant_info": "<extracted_relevant_information>",
         "user_intent": "<user's_intent>",
         "required_tools": ["<tool1>", "<tool2>"]  # List of tools this agent should use
-      }
+      },
+      "depends_on": []  # Indexes of earlier agents in this list whose results this agent needs
     }
   ]
 }
 """
 
+# Appended to ROUTER_PROMPT in combined mode so one call also plans each agent's tool calls.
+COMBINED_PLAN_PROMPT = """
+Also plan the tool calls for every agent you assign. Add a "steps" list to each agent entry:
+      "steps": [
+        {
+          "tool_name": "<tool_name>",
+          "arguments": {"<arg1>": "<value1>"}
+        }
+      ]
+Only use tools listed for that agent, with the argument names shown in their signatures.
+Only respond with JSON.
+"""
+
+# Appended to ROUTER_PROMPT for registered agents that bring their own description.
+EXTRA_AGENTS_PROMPT = """
+Additional agents:
+{agents}
+"""
+
 FORMATTER_PROMPT = """
 You are a helpful assistant. Given the user's latest request, previous messages if relevant, and the structured outputs from multiple specialized agents, combine and summarize the responses in a natural, conversational way.
 
@@ -84,197 +123,726 @@ Be friendly, clear, and helpful.
 
 
 
-def build_greet_agent(model: str) -> GreetUserAgent:
-    greet_prompt = """
-    You are an AI assistant that decides which tools to call and in what order based on user input.
-    
-    You will receive messages in this format:
-    {
-      "task_type": "greet",
-      "user_input": "What's my name backwards?",
-      "task": "Greet the user and perform a name manipulation",
-      "context": {
-        "relevant_info": "User name is Alice",
-        "user_intent": "wants to be greeted and have name reversed",
-        "required_tools": ["say_hello", "name_backwards"]
-      },
-      "previous_results": []
-    }
-
-    Important fields to understand:
-    - user_input: The user's original query exactly as they typed it
-    - task: The coordinator's interpretation of what needs to be done
-    - context.relevant_info: Contains important details about the user
-    - context.user_intent: Tells you what the user wants to achieve
-    - context.required_tools: Lists which tools you should use
-    - previous_results: Contains results from other agents if any
-    
-    Available tools:
-    1. say_hello(name: string) — Greets the user by name.
-    2. name_backwards(name: string) — Reverses the user's name.
-    
-    Respond in this format:
-    {
-      "steps": [
-        {
-          "tool_name": "<tool_name>",
-          "arguments": {
-            "<arg1>": <value1>
-          }
-        }
-      ]
-    }
-    """
-
-    greet_agent = GreetUserAgent(
-        agent_name="GreeterAgent",
-        tools={
-            "say_hello": GreetUserTool(),
-            "name_backwards": ReverseNameTool()
-        },
-        planner=LLMPlanner(model=model, system_prompt=greet_prompt)
-    )
-    return greet_agent
-
-def build_web_search_agent(model: str) -> WebSearchAgent:
-    system_prompt = """
-    You are an AI assistant that decides how to answer a user's question using a web search tool.
-    
-    You will receive messages in this format:
-    {
-      "task_type": "websearch",
-      "user_input": "What's the weather like today?",
-      "task": "Search for current weather information",
-      "context": {
-        "relevant_info": "User wants current weather",
-        "user_intent": "get weather update",
-        "required_tools": ["web_search"]
-      },
-      "previous_results": [
-        {
-          "agent": "GreeterAgent",
-          "results": [...],
-          "summary": "Hello Alice!"
-        }
-      ]
-    }
-
-    Important fields to understand:
-    - user_input: The user's original query exactly as they typed it
-    - task: The coordinator's interpretation of what needs to be done
-    - context.relevant_info: Contains important details about what to search for
-    - context.user_intent: Tells you what the user wants to achieve
-    - context.required_tools: Indicates which tools you should use
-    - previous_results: May contain relevant information from other agents
-    
-    Available tools:
-    1. web_search(query: string) — performs a web search and returns short summaries of the top results.
-    
-    Only respond with JSON, do not include explanations or markdown.
-    Format:
-    {
-      "steps": [
-        {
-          "tool_name": "web_search",
-          "arguments": {
-            "query": "<search query>"
-          }
-        }
-      ]
-    }
-    """
-
-    planner = LLMPlanner(model=model, system_prompt=system_prompt)
-    tools = {"web_search": WebSearchTool()}
-
-    return WebSearchAgent(agent_name="WebSearchAgent", tools=tools, planner=planner)
-
-
 # --- Main Coordinator Class ---
 
 class CoordinatorAssistant:
-    def __init__(self, model=MODEL):
-        self.model = model
+    def __init__(self, model=MODEL, max_parallel_agents=None, pre_router=None, search_cache=None, summary_policy=None, plan_mode="separate", llm=None, tracer=None, stream_json=False, constrained=True, registry=None, speculator=None, latency_budget=None, models=None, renderer=None, history_manager=None):
+        if plan_mode not in ("separate", "combined"):
+            raise ValueError(f"plan_mode must be 'separate' or 'combined', got {plan_mode!r}")
+        # StageModels picks the model of each stage; ``model`` alone serves them all
+        self.models = models if models is not None else StageModels(model)
+        self.model = self.models.default
+        # Shared LLMClient handed to planners and agents; None uses ollama's module-level client
+        self.llm = llm
+        # "combined" asks the router to return each agent's tool steps too, skipping the planners
+        self.plan_mode = plan_mode
+        # Stream router and planner replies and stop generating once their JSON object closes
+        self.stream_json = stream_json
+        # Pass JSON Schemas built from the tools' args_schema as Ollama's ``format``
+        self.constrained = constrained
+        self.max_parallel_agents = max_parallel_agents
+        self.pre_router = pre_router  # Optional FastRouter tried before the LLM router
+        # Optional Speculator: plans the likeliest agent while the router call is in flight
+        self.speculator = speculator
+        self._speculation_pool = ThreadPoolExecutor(thread_name_prefix="speculate") if speculator is not None else None
+        self._closed = False  # Set by close(); no more speculation afterwards
+        # Optional LatencyBudget: each request gets a deadline and degrades instead of overrunning it
+        self.latency_budget = latency_budget
+        # In-memory by default; pass SearchCache(db_path=...) to persist across restarts
+        self.search_cache = search_cache if search_cache is not None else SearchCache()
+        self.summary_policy = summary_policy or SummaryPolicy()
+        # Renders agent results into the formatter and summarizer prompts within per-stage token budgets
+        self.renderer = renderer or ResultRenderer()
+        self.last_llm_calls = {}  # LLM calls per stage made by the most recent request
+        # Records route/plan/tool/summarize/format spans per request; add exporters to ship them
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.last_trace = None
+        # Agents are declared by name and only imported and built when first routed to
+        self.registry = registry if registry is not None else AgentRegistry()
         self.agents = self._init_agents()
+        self._routing_schema = None
+        self._router_prompt = None
+        self.keep_alive = None  # KeepAlive started by warm_up(keep_alive_interval=...)
+        # Optional HistoryManager: turns ``history=`` into a budgeted prompt inside the request's trace and deadline
+        self.history_manager = history_manager
 
     def _init_agents(self):
-        greet_agent = build_greet_agent(self.model)
-        web_search_agent = build_web_search_agent(self.model)
-        return {
-            "greet": greet_agent,
-            "websearch": web_search_agent
-        }
-
-    def route(self, user_input: str) -> list:
-        messages = [
-            {"role": "system", "content": ROUTER_PROMPT},
+        return LazyAgents(self.registry, {
+            "model": self.model,
+            "models": self.models,
+            "search_cache": self.search_cache,
+            "summary_policy": self.summary_policy,
+            "renderer": self.renderer,
+            "llm": self.llm,
+            "stream_json": self.stream_json,
+            "constrained": self.constrained,
+        })
+
+    def _build_router_prompt(self) -> str:
+        prompt = ROUTER_PROMPT
+        described = [spec for spec in self.registry.specs() if spec.description]
+        if described:
+            lines = []
+            for spec in described:
+                lines.append(f"- {spec.name} — {spec.description}")
+                if spec.tools:
+                    lines.append(f"   Available tools: {', '.join(spec.tools)}")
+            prompt += EXTRA_AGENTS_PROMPT.format(agents="\n".join(lines))
+        if self.plan_mode == "combined":
+            prompt += COMBINED_PLAN_PROMPT
+        return prompt
+
+    def warm_up_targets(self) -> list:
+        """Model and static system prompt of every LLM stage; builds all registered agents."""
+        targets = [
+            WarmUpTarget("router", self.models.model_for("router"), self._router_messages("")[0]["content"]),
+            WarmUpTarget("formatter", self.models.model_for("formatter"), FORMATTER_PROMPT),
+        ]
+        for name in self.agents:
+            agent = self.agents[name]
+            if hasattr(agent, "warm_up_targets"):
+                targets.extend(agent.warm_up_targets())
+        return targets
+
+    def warm_up(self, extra_targets=(), keep_alive_interval: float = None) -> list:
+        """Load every model the pipeline uses and pre-fill its system prompts.
+
+        Call once at startup so the first request doesn't pay for model loads.
+        With ``keep_alive_interval``, models are also pinged every that many
+        idle seconds so Ollama doesn't evict them between bursts of traffic.
+        Returns one result per distinct target (see ``llm.warmup.warm_up``).
+        The fallbacks of an adaptive model policy are warmed up as well.
+        """
+        targets = self.warm_up_targets() + list(extra_targets)
+        policy = getattr(self.llm, "model_policy", None)
+        if policy is not None:
+            targets += [WarmUpTarget(t.stage, policy.fallbacks[t.model], t.system_prompt) for t in targets if t.model in policy.fallbacks]
+        results = warm_up(targets, llm=self.llm, default_chat=chat)
+        if keep_alive_interval and self.keep_alive is None:
+            self.keep_alive = KeepAlive([t.model for t in targets], interval=keep_alive_interval, llm=self.llm, default_chat=chat).start()
+        return results
+
+    def stop_keep_alive(self):
+        if self.keep_alive is not None:
+            self.keep_alive.stop()
+            self.keep_alive = None
+
+    def close(self):
+        """Stop the keep-alive pings and the speculation workers; later requests route without speculating."""
+        self.stop_keep_alive()
+        if self._speculation_pool is not None:
+            self._speculation_pool.shutdown(wait=False, cancel_futures=True)
+        self._closed = True
+
+    def _router_messages(self, user_input: str) -> list:
+        if self._router_prompt is None:
+            self._router_prompt = self._build_router_prompt()
+        system_prompt = self._router_prompt
+        return [
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_input}
         ]
-        response = chat(self.model, messages)
-        routing = extract_json(response.message.content)
+
+    def _router_kwargs(self) -> dict:
+        if not self.constrained:
+            return {}
+        if self._routing_schema is None:
+            # Combined mode needs the tools' argument schemas, which imports the
+            # tool classes; separate mode only needs the tool names.
+            combined = self.plan_mode == "combined"
+            agent_tools = {spec.name: spec.tool_classes() if combined else spec.tools for spec in self.registry.specs()}
+            self._routing_schema = routing_schema(agent_tools, with_steps=combined)
+        return {"format": self._routing_schema}
+
+    def _parse_routing(self, content: str) -> list:
+        return self._routing_assignments(extract_json(content))
+
+    def _routing_assignments(self, routing: dict) -> list:
         agent_assignments = routing.get("agents", [])
-        logger.info(f"Routing decision: {agent_assignments}")
+        logger.info("Routing decision: %s", agent_assignments)
         return agent_assignments
 
-    def format_response(self, agent_results: list, user_input: str) -> str:
-        """Format multiple agent results into a natural response."""
+    def _fast_route(self, user_input: str):
+        if self.pre_router is None:
+            return None
+        return self.pre_router.route(user_input)
+
+    def _record_routing(self, user_input: str, agent_assignments: list):
+        if self.pre_router is not None:
+            self.pre_router.record(user_input, agent_assignments)
+
+    def _trace_routing(self, route_span, agent_assignments: list, fast_path: bool):
+        if route_span is not None:
+            route_span.set_attributes(fast_path=fast_path, agents=[a.get("agent") for a in agent_assignments])
+
+    def route(self, user_input: str) -> list:
+        with span("route") as route_span:
+            agent_assignments = self._fast_route(user_input)
+            if agent_assignments is not None:
+                self._trace_routing(route_span, agent_assignments, True)
+                return agent_assignments
+            if self.stream_json:
+                routing, _ = chat_json_with(self.llm, "router", self.models.model_for("router"), self._router_messages(user_input), chat, **self._router_kwargs())
+                agent_assignments = self._routing_assignments(routing)
+            else:
+                response = chat_with(self.llm, "router", self.models.model_for("router"), self._router_messages(user_input), chat, **self._router_kwargs())
+                agent_assignments = self._parse_routing(response.message.content)
+            self._record_routing(user_input, agent_assignments)
+            self._trace_routing(route_span, agent_assignments, False)
+            return agent_assignments
+
+    async def aroute(self, user_input: str) -> list:
+        with span("route") as route_span:
+            agent_assignments = self._fast_route(user_input)
+            if agent_assignments is not None:
+                self._trace_routing(route_span, agent_assignments, True)
+                return agent_assignments
+            if self.stream_json:
+                routing, _ = await achat_json_with(self.llm, "router", self.models.model_for("router"), self._router_messages(user_input), achat, **self._router_kwargs())
+                agent_assignments = self._routing_assignments(routing)
+            else:
+                response = await achat_with(self.llm, "router", self.models.model_for("router"), self._router_messages(user_input), achat, **self._router_kwargs())
+                agent_assignments = self._parse_routing(response.message.content)
+            self._record_routing(user_input, agent_assignments)
+            self._trace_routing(route_span, agent_assignments, False)
+            return agent_assignments
+
+    # --- Speculation ---
+
+    def _speculation_target(self, user_input: str):
+        """Agent to plan ahead of routing, or None."""
+        agent_name = self.speculator.predict(user_input)
+        agent = self.agents[agent_name] if agent_name is not None and agent_name in self.agents else None
+        if agent is None or getattr(agent, "planner", None) is None or not hasattr(agent, "speculate"):
+            self.speculator.count("skipped")
+            return None, None
+        self.speculator.count("speculated")
+        return agent_name, agent
+
+    def _speculate(self, agent_name: str, agent, user_input: str) -> dict:
+        with span("speculate", agent=agent_name):
+            return agent.speculate(user_input, run_tools=self.speculator.run_tools)
+
+    async def _aspeculate(self, agent_name: str, agent, user_input: str) -> dict:
+        with span("speculate", agent=agent_name):
+            return await agent.aspeculate(user_input, run_tools=self.speculator.run_tools)
+
+    def _speculation_outcome(self, agent_name: str, outcome: str):
+        self.speculator.count(outcome)
+        logger.info("Speculative run of %s %s", agent_name, outcome)
+        request_span = current_span()
+        if request_span is not None:
+            request_span.set_attributes(speculated_agent=agent_name, speculation=outcome)
+
+    def _adopt_speculation(self, agent_name: str, agent_assignments: list, fields: dict):
+        assignment = next(a for a in agent_assignments if a.get("agent") == agent_name)
+        if assignment.get("steps"):
+            # The router planned the steps itself (combined mode): the speculative plan went unused
+            self._speculation_outcome(agent_name, "wasted")
+            return
+        assignment["steps"] = fields["steps"]
+        if fields["prefetched"]:
+            assignment["prefetched"] = fields["prefetched"]
+        self._speculation_outcome(agent_name, "accepted")
+
+    def _speculation_wanted(self, agent_name: str, agent_assignments: list) -> bool:
+        self.speculator.observe(agent_assignments)
+        if any(a.get("agent") == agent_name for a in agent_assignments):
+            return True
+        self._speculation_outcome(agent_name, "wasted")
+        return False
+
+    def _route_speculatively(self, user_input: str) -> list:
+        """route(), with the predicted agent planning on a worker thread meanwhile."""
+        if self.speculator is None or self._closed:
+            return self.route(user_input)
+        agent_name, agent = self._speculation_target(user_input)
+        if agent is None:
+            agent_assignments = self.route(user_input)
+            self.speculator.observe(agent_assignments)
+            return agent_assignments
+        future = self._speculation_pool.submit(contextvars.copy_context().run, self._speculate, agent_name, agent, user_input)
+        try:
+            agent_assignments = self.route(user_input)
+        except BaseException:
+            future.cancel()
+            self._speculation_outcome(agent_name, "wasted")
+            raise
+        if not self._speculation_wanted(agent_name, agent_assignments):
+            # A running planner call can't be interrupted; its result is dropped
+            future.cancel()
+            return agent_assignments
+        try:
+            fields = future.result()
+        except Exception as e:
+            logger.warning("Speculative run of %s failed, planning normally: %s", agent_name, e)
+            self._speculation_outcome(agent_name, "failed")
+            return agent_assignments
+        self._adopt_speculation(agent_name, agent_assignments, fields)
+        return agent_assignments
+
+    async def _aroute_speculatively(self, user_input: str) -> list:
+        if self.speculator is None or self._closed:
+            return await self.aroute(user_input)
+        agent_name, agent = self._speculation_target(user_input)
+        if agent is None:
+            agent_assignments = await self.aroute(user_input)
+            self.speculator.observe(agent_assignments)
+            return agent_assignments
+        task = asyncio.ensure_future(self._aspeculate(agent_name, agent, user_input))
+        # Retrieve the outcome of discarded tasks so a late failure isn't reported as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            agent_assignments = await self.aroute(user_input)
+        except BaseException:
+            task.cancel()
+            self._speculation_outcome(agent_name, "wasted")
+            raise
+        if not self._speculation_wanted(agent_name, agent_assignments):
+            task.cancel()
+            return agent_assignments
+        try:
+            fields = await task
+        except Exception as e:
+            logger.warning("Speculative run of %s failed, planning normally: %s", agent_name, e)
+            self._speculation_outcome(agent_name, "failed")
+            return agent_assignments
+        self._adopt_speculation(agent_name, agent_assignments, fields)
+        return agent_assignments
+
+    def _formatter_messages(self, agent_results: list, user_input: str) -> list:
         # Log the raw results for debugging
-        logger.info(f"Agent raw results: {json.dumps(agent_results, indent=2)}")
-        
-        messages = [
+        logger.info("Agent raw results: %s", LazyJSON(agent_results))
+
+        return [
             {"role": "system", "content": FORMATTER_PROMPT},
             {"role": "user", "content": f"""Here is the user's input and the agents' results:
 
 User Input: {user_input}
 
-Agent Results: {json.dumps(agent_results, indent=2)}
+Agent Results:
+{self.renderer.agent_results(agent_results)}
 
 Please provide a natural, conversational response that combines all the relevant information from the different agents."""}
         ]
-        
-        response = chat(self.model, messages)
+
+    @staticmethod
+    def _fallback_response(agent_results: list) -> str:
+        """Reply assembled without the formatter: each agent's summary, or its raw tool output."""
+        parts = []
+        for result in agent_results:
+            if result.get("summary"):
+                parts.append(result["summary"])
+            elif result.get("results"):
+                outputs = [r.get("output") for r in result["results"]]
+                parts.append(compact_json(outputs))
+        return "\n\n".join(parts) or TIMEOUT_RESPONSE
+
+    def _degraded_response(self, format_span, agent_results: list, reason: str) -> str:
+        logger.warning("Skipping the formatter: %s", reason)
+        if format_span is not None:
+            format_span.set_attribute("degraded", reason)
+        return self._fallback_response(agent_results)
+
+    def format_response(self, agent_results: list, user_input: str) -> str:
+        """Format multiple agent results into a natural response.
+
+        Close to the request deadline the formatter is skipped and the
+        agents' summaries are returned as they are.
+        """
+        with span("format") as format_span:
+            if low_on_time("formatter"):
+                return self._degraded_response(format_span, agent_results, "low on time")
+            try:
+                response = chat_with(self.llm, "formatter", self.models.model_for("formatter"), self._formatter_messages(agent_results, user_input), chat)
+            except DeadlineExceeded as e:
+                return self._degraded_response(format_span, agent_results, str(e))
         return response.message.content
 
-    def run(self, user_input: str) -> str:
-        agent_assignments = self.route(user_input)
-        
-        if not agent_assignments:
-            return "I'm not sure how to help with that request. Could you please rephrase?"
-        
-        results = []
-        for agent_assignment in agent_assignments:
-            agent_name = agent_assignment["agent"]
-            if agent_name not in self.agents:
-                logger.warning(f"Unknown agent: {agent_name}")
-                continue
-            
-            task = {
-                "task_type": agent_name,
-                "user_input": user_input,  # Pass the original user input
-                "task": agent_assignment["task"],  # Pass the coordinator's task
-                "context": agent_assignment.get("context", {}),  # Pass the extracted context
-                "previous_results": results  # Pass previous results as context
-            }
-            
-            agent = self.agents[agent_name]
-            logger.info(f"Task sent to {agent_name}: {task}")
-            
+    async def aformat_response(self, agent_results: list, user_input: str) -> str:
+        with span("format") as format_span:
+            if low_on_time("formatter"):
+                return self._degraded_response(format_span, agent_results, "low on time")
+            try:
+                response = await achat_with(self.llm, "formatter", self.models.model_for("formatter"), self._formatter_messages(agent_results, user_input), achat)
+            except DeadlineExceeded as e:
+                return self._degraded_response(format_span, agent_results, str(e))
+        return response.message.content
+
+    def _build_task(self, agent_name: str, agent_assignment: dict, user_input: str, previous_results: list) -> dict:
+        task = {
+            "task_type": agent_name,
+            "user_input": user_input,  # Pass the original user input
+            "task": agent_assignment["task"],  # Pass the coordinator's task
+            "context": agent_assignment.get("context", {}),  # Pass the extracted context
+            "previous_results": previous_results  # Pass previous results as context
+        }
+        if agent_assignment.get("steps"):
+            task["steps"] = agent_assignment["steps"]  # Planned by the router in combined mode, or speculatively
+        if agent_assignment.get("prefetched"):
+            task["prefetched"] = agent_assignment["prefetched"]  # Tool results from speculation
+        logger.info("Task sent to %s: %s", agent_name, task)
+        return task
+
+    def _run_agent(self, agent_assignment: dict, user_input: str, previous_results: list):
+        agent_name = agent_assignment["agent"]
+        if agent_name not in self.agents:
+            logger.warning("Unknown agent: %s", agent_name)
+            return None
+
+        task = self._build_task(agent_name, agent_assignment, user_input, previous_results)
+        agent = self.agents[agent_name]
+
+        with span(f"agent:{agent_name}") as agent_span:
             try:
                 result = agent.run(task)
-                results.append(result)
-                
-                # Log the final result from the agent
-                if "result" in agent.messages:
-                    logger.info(f"{agent_name} (task_received) -> Coordinator: {agent.messages['task_received']}")
-                    logger.info(f"{agent_name} (result) -> Coordinator: {agent.messages['result']}")
+                logger.info("%s (result) -> Coordinator: %s", agent_name, LazyJSON(result))
+                return result
             except Exception as e:
-                logger.error(f"Error running agent {agent_name}: {str(e)}")
-                results.append({"error": f"Error running {agent_name}: {str(e)}"})
+                if agent_span is not None:
+                    agent_span.record_error(e)
+                logger.error("Error running agent %s: %s", agent_name, e)
+                return {"error": f"Error running {agent_name}: {str(e)}"}
+
+    async def _arun_agent(self, agent_assignment: dict, user_input: str, previous_results: list):
+        agent_name = agent_assignment["agent"]
+        if agent_name not in self.agents:
+            logger.warning("Unknown agent: %s", agent_name)
+            return None
+
+        task = self._build_task(agent_name, agent_assignment, user_input, previous_results)
+        agent = self.agents[agent_name]
+
+        with span(f"agent:{agent_name}") as agent_span:
+            try:
+                result = await agent.arun(task)
+                logger.info("%s (result) -> Coordinator: %s", agent_name, LazyJSON(result))
+                return result
+            except Exception as e:
+                if agent_span is not None:
+                    agent_span.record_error(e)
+                logger.error("Error running agent %s: %s", agent_name, e)
+                return {"error": f"Error running {agent_name}: {str(e)}"}
+
+    def _exclusive_key(self, agent_assignments: list):
+        """Assignments of a non-reentrant agent share a key so they never overlap."""
+        def key(i):
+            name = agent_assignments[i].get("agent")
+            if name not in self.agents or getattr(self.agents[name], "reentrant", False):
+                return None
+            return name
+        return key
+
+    def _run_agents(self, agent_assignments: list, user_input: str) -> list:
+        # Independent agents run concurrently; each one only sees the
+        # results of the assignments it depends on.
+        dependencies = resolve_dependencies(agent_assignments)
+        results = run_dependency_graph(
+            dependencies,
+            lambda i, deps: self._run_agent(agent_assignments[i], user_input, [r for r in deps if r is not None]),
+            max_workers=self.max_parallel_agents,
+            exclusive_key=self._exclusive_key(agent_assignments)
+        )
+        return [r for r in results if r is not None]
+
+    async def _arun_agents(self, agent_assignments: list, user_input: str) -> list:
+        dependencies = resolve_dependencies(agent_assignments)
+        results = await arun_dependency_graph(
+            dependencies,
+            lambda i, deps: self._arun_agent(agent_assignments[i], user_input, [r for r in deps if r is not None]),
+            max_workers=self.max_parallel_agents,
+            exclusive_key=self._exclusive_key(agent_assignments)
+        )
+        return [r for r in results if r is not None]
+
+    def _finish_request(self, counter, trace) -> None:
+        self.last_llm_calls = counter.as_dict()
+        self.last_trace = trace
+        trace.root.set_attribute("llm_calls", self.last_llm_calls["total"])
+        logger.info("LLM calls for request %s: %s", trace.request_id, self.last_llm_calls)
+
+    def _request_deadline(self):
+        return self.latency_budget.start() if self.latency_budget is not None else None
+
+    def _timed_out(self, error: DeadlineExceeded) -> str:
+        logger.warning("Request gave up: %s", error)
+        root = current_span()
+        if root is not None:
+            root.set_attribute("degraded", str(error))
+        return TIMEOUT_RESPONSE
+
+    def _with_history(self, user_input: str, history, session_id):
+        """``user_input`` preceded by the conversation so far, when there is one."""
+        if history is None:
+            return user_input
+        if self.history_manager is None:
+            prompt = render_prompt("", normalize_history(history), user_input)
+        else:
+            prompt = self.history_manager.build_prompt(session_id, history, user_input)
+        logger.info("Coordinator -> Agents: %s", prompt)
+        return prompt
+
+    async def _awith_history(self, user_input: str, history, session_id):
+        if history is None or self.history_manager is None:
+            return self._with_history(user_input, history, session_id)
+        return await asyncio.to_thread(self._with_history, user_input, history, session_id)
+
+    def run(self, user_input: str, request_id: str = None, session_id: str = None, history=None) -> str:
+        counter = start_llm_call_count()
+        with self.tracer.start_request(request_id=request_id, session_id=session_id) as trace, deadline_scope(self._request_deadline()):
+            try:
+                return self._run(self._with_history(user_input, history, session_id))
+            finally:
+                self._finish_request(counter, trace)
+
+    def _run(self, user_input: str) -> str:
+        try:
+            agent_assignments = self._route_speculatively(user_input)
+        except DeadlineExceeded as e:
+            return self._timed_out(e)
+        
+        if not agent_assignments:
+            return NO_AGENT_RESPONSE
+
+        results = self._run_agents(agent_assignments, user_input)
         
         if not results:
-            return "I encountered an error while processing your request. Please try again."
+            return NO_RESULTS_RESPONSE
+
+        direct_reply = self.summary_policy.direct_reply(results)
+        if direct_reply is not None:
+            logger.info("Final Response (agent summary): %s", direct_reply)
+            return direct_reply
         
         # Format the combined results
         formatted_response = self.format_response(results, user_input)
-        logger.info(f"Final Response: {formatted_response}")
-        return formatted_response
\ No newline at end of file
+        logger.info("Final Response: %s", formatted_response)
+        return formatted_response
+
+    async def arun(self, user_input: str, request_id: str = None, session_id: str = None, history=None) -> str:
+        """Async variant of run(); every LLM and tool call is awaited."""
+        counter = start_llm_call_count()
+        with self.tracer.start_request(request_id=request_id, session_id=session_id) as trace, deadline_scope(self._request_deadline()):
+            try:
+                return await self._arun(await self._awith_history(user_input, history, session_id))
+            finally:
+                self._finish_request(counter, trace)
+
+    async def _arun(self, user_input: str) -> str:
+        try:
+            agent_assignments = await self._aroute_speculatively(user_input)
+        except DeadlineExceeded as e:
+            return self._timed_out(e)
+
+        if not agent_assignments:
+            return NO_AGENT_RESPONSE
+
+        results = await self._arun_agents(agent_assignments, user_input)
+
+        if not results:
+            return NO_RESULTS_RESPONSE
+
+        direct_reply = self.summary_policy.direct_reply(results)
+        if direct_reply is not None:
+            logger.info("Final Response (agent summary): %s", direct_reply)
+            return direct_reply
+
+        formatted_response = await self.aformat_response(results, user_input)
+        logger.info("Final Response: %s", formatted_response)
+        return formatted_response
+
+    def run_stream(self, user_input: str, request_id: str = None, session_id: str = None, history=None):
+        """Like run(), but yields the formatter's reply token by token as Ollama generates it."""
+        start = time.perf_counter()
+        counter = start_llm_call_count()
+        with self.tracer.start_request(request_id=request_id, session_id=session_id) as trace, deadline_scope(self._request_deadline()):
+            try:
+                user_input = self._with_history(user_input, history, session_id)
+                try:
+                    agent_assignments = self._route_speculatively(user_input)
+                except DeadlineExceeded as e:
+                    yield self._timed_out(e)
+                    return
+
+                if not agent_assignments:
+                    yield NO_AGENT_RESPONSE
+                    return
+
+                results = self._run_agents(agent_assignments, user_input)
+
+                if not results:
+                    yield NO_RESULTS_RESPONSE
+                    return
+
+                direct_reply = self.summary_policy.direct_reply(results)
+                if direct_reply is not None:
+                    logger.info("Final Response (agent summary): %s", direct_reply)
+                    yield direct_reply
+                    return
+
+                with span("format", stream=True) as format_span:
+                    if low_on_time("formatter"):
+                        yield self._degraded_response(format_span, results, "low on time")
+                        return
+                    parts = []
+                    try:
+                        for chunk in chat_with(self.llm, "formatter", self.models.model_for("formatter"), self._formatter_messages(results, user_input), chat, stream=True):
+                            token = chunk.message.content
+                            if token:
+                                if not parts:
+                                    ttft = time.perf_counter() - start
+                                    logger.info("Time to first token: %.2fs", ttft)
+                                    if format_span is not None:
+                                        format_span.set_attribute("time_to_first_token_s", ttft)
+                                parts.append(token)
+                                yield token
+                    except DeadlineExceeded as e:
+                        if not parts:
+                            yield self._degraded_response(format_span, results, str(e))
+                            return
+                        logger.warning("Formatter stream cut off: %s", e)
+                        if format_span is not None:
+                            format_span.set_attribute("degraded", str(e))
+                    logger.info("Final Response: %s", ''.join(parts))
+            finally:
+                self._finish_request(counter, trace)
+
+    async def arun_stream(self, user_input: str, request_id: str = None, session_id: str = None, history=None):
+        """Async generator counterpart of run_stream()."""
+        start = time.perf_counter()
+        counter = start_llm_call_count()
+        with self.tracer.start_request(request_id=request_id, session_id=session_id) as trace, deadline_scope(self._request_deadline()):
+            try:
+                user_input = await self._awith_history(user_input, history, session_id)
+                try:
+                    agent_assignments = await self._aroute_speculatively(user_input)
+                except DeadlineExceeded as e:
+                    yield self._timed_out(e)
+                    return
+
+                if not agent_assignments:
+                    yield NO_AGENT_RESPONSE
+                    return
+
+                results = await self._arun_agents(agent_assignments, user_input)
+
+                if not results:
+                    yield NO_RESULTS_RESPONSE
+                    return
+
+                direct_reply = self.summary_policy.direct_reply(results)
+                if direct_reply is not None:
+                    logger.info("Final Response (agent summary): %s", direct_reply)
+                    yield direct_reply
+                    return
+
+                with span("format", stream=True) as format_span:
+                    if low_on_time("formatter"):
+                        yield self._degraded_response(format_span, results, "low on time")
+                        return
+                    parts = []
+                    try:
+                        async for chunk in await achat_with(self.llm, "formatter", self.models.model_for("formatter"), self._formatter_messages(results, user_input), achat, stream=True):
+                            token = chunk.message.content
+                            if token:
+                                if not parts:
+                                    ttft = time.perf_counter() - start
+                                    logger.info("Time to first token: %.2fs", ttft)
+                                    if format_span is not None:
+                                        format_span.set_attribute("time_to_first_token_s", ttft)
+                                parts.append(token)
+                                yield token
+                    except DeadlineExceeded as e:
+                        if not parts:
+                            yield self._degraded_response(format_span, results, str(e))
+                            return
+                        logger.warning("Formatter stream cut off: %s", e)
+                        if format_span is not None:
+                            format_span.set_attribute("degraded", str(e))
+                    logger.info("Final Response: %s", ''.join(parts))
+            finally:
+                self._finish_request(counter, trace)
+
+    # --- Batch mode ---
+
+    def _run_batch_item(self, index: int, user_input: str) -> dict:
+        start = time.perf_counter()
+        counter = start_llm_call_count()
+        record = {"index": index, "input": user_input, "output": None, "error": None}
+        with self.tracer.start_request(batch_index=index) as trace, deadline_scope(self._request_deadline()):
+            try:
+                record["output"] = self._run(user_input)
+            except Exception as e:
+                logger.error("Batch item %d failed: %s", index, e)
+                record["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                self._finish_request(counter, trace)
+        record["request_id"] = trace.request_id
+        record["duration_s"] = round(time.perf_counter() - start, 4)
+        record["llm_calls"] = counter.as_dict()
+        return record
+
+    @staticmethod
+    def _duplicate_record(index: int, original: dict) -> dict:
+        return {
+            "index": index, "input": original["input"], "output": original["output"], "error": original["error"],
+            "duplicate_of": original["index"], "request_id": original["request_id"], "duration_s": 0.0,
+            "llm_calls": original["llm_calls"]
+        }
+
+    @staticmethod
+    def _batch_key(user_input: str) -> bytes:
+        return hashlib.sha1(user_input.encode("utf-8")).digest()
+
+    def iter_batch(self, inputs, concurrency: int = 4, dedupe_window: int = 1024):
+        """Run every input and yield one record per input as it completes.
+
+        ``inputs`` is read lazily, with at most ``concurrency`` requests in
+        flight. An input identical to one still running, or to one of the
+        last ``dedupe_window`` distinct inputs that finished without an
+        error, isn't run again: it gets a copy of that record with
+        ``duplicate_of`` set. Only hashes of those inputs and the recent
+        records are kept, so memory stays bounded on long inputs. A failing
+        input yields a record with ``error`` instead of stopping the batch.
+        """
+        running = {}  # input hash -> index of the running request
+        repeats = defaultdict(list)  # running index -> repeats waiting for it
+        recent = OrderedDict()  # input hash -> record, the last dedupe_window successes
+        pending = enumerate(inputs)
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            in_flight = {}  # future -> (index, input hash)
+            while True:
+                while not exhausted and len(in_flight) < max(1, concurrency):
+                    try:
+                        index, user_input = next(pending)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    key = self._batch_key(user_input)
+                    if key in recent:
+                        recent.move_to_end(key)
+                        yield self._duplicate_record(index, recent[key])
+                    elif key in running:
+                        repeats[running[key]].append(index)
+                    else:
+                        running[key] = index
+                        in_flight[pool.submit(contextvars.copy_context().run, self._run_batch_item, index, user_input)] = (index, key)
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, key = in_flight.pop(future)
+                    del running[key]
+                    record = future.result()
+                    if record["error"] is None and dedupe_window > 0:
+                        recent[key] = record
+                        while len(recent) > dedupe_window:
+                            recent.popitem(last=False)
+                    yield record
+                    for repeat in repeats.pop(index, []):
+                        yield self._duplicate_record(repeat, record)
+
+    def run_batch(self, inputs, concurrency: int = 4, dedupe_window: int = 1024) -> list:
+        """Run every input with bounded concurrency; records come back in input order."""
+        return sorted(self.iter_batch(inputs, concurrency=concurrency, dedupe_window=dedupe_window), key=lambda record: record["index"])
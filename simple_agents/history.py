@@ -0,0 +1,167 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from .llm.client import chat_with
+from .llm.ollama_api import chat
+from .llm.warmup import WarmUpTarget
+from .tracing.tracer import span
+from .utils.deadline import DeadlineExceeded
+from .utils.tokens import CHARS_PER_TOKEN, count_tokens
+
+logger = logging.getLogger()
+
+HISTORY_SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a user and an assistant.
+Given the current summary and the next turns, return an updated summary.
+Keep names, facts, preferences and open questions the assistant may need later. Drop small talk.
+Only respond with the summary, in at most a few sentences.
+"""
+
+
+class LLMHistorySummarizer:
+    """Fold new turns into a running summary with one LLM call."""
+
+    def __init__(self, model: str, llm=None):
+        self.model = model
+        self.llm = llm  # Optional shared LLMClient
+
+    def warm_up_targets(self) -> list:
+        return [WarmUpTarget("history", self.model, HISTORY_SUMMARY_PROMPT)]
+
+    def __call__(self, summary: str, turns: list) -> str:
+        transcript = format_turns(turns)
+        messages = [
+            {"role": "system", "content": HISTORY_SUMMARY_PROMPT},
+            {"role": "user", "content": f"Current summary: {summary or '(none)'}\n\nNext turns:\n{transcript}"}
+        ]
+        response = chat_with(self.llm, "history", self.model, messages, chat)
+        return response.message.content.strip()
+
+
+def normalize_history(history) -> list:
+    """Return ``history`` as ``(user, assistant)`` pairs.
+
+    Accepts Gradio's tuple format as well as role/content message dicts.
+    """
+    turns = []
+    for item in history or []:
+        if isinstance(item, dict):
+            if item.get("role") == "user":
+                turns.append((item.get("content", ""), ""))
+            elif item.get("role") == "assistant" and turns and not turns[-1][1]:
+                turns[-1] = (turns[-1][0], item.get("content", ""))
+        else:
+            user, assistant = item
+            turns.append((user or "", assistant or ""))
+    return turns
+
+
+def format_turns(turns: list) -> str:
+    return "\n".join(f"User: {u}\nAssistant: {a}" for u, a in turns)
+
+
+def render_prompt(summary: str, recent: list, user_input: str) -> str:
+    parts = []
+    if summary:
+        parts.append(f"Summary of earlier conversation: {summary}")
+    if recent:
+        parts.append(format_turns(recent))
+    parts.append(f"User: {user_input}")
+    return "\n".join(parts)
+
+
+def _fingerprint(turns: list) -> str:
+    # First and last covered turns: cheap, and enough to tell conversations apart
+    return hashlib.sha1(repr((turns[0], turns[-1])).encode()).hexdigest() if turns else ""
+
+
+class _SessionSummary:
+    def __init__(self):
+        self.turns = 0  # How many leading turns the summary covers
+        self.fingerprint = ""  # Hash of the covered turns, to detect a different conversation
+        self.summary = ""
+
+
+class HistoryManager:
+    """Builds the prompt for a turn within a token budget.
+
+    The last ``keep_turns`` turns are sent verbatim; older turns are folded
+    into a per-session summary that is updated incrementally, so each turn
+    summarizes only the turns that just aged out. If the prompt would still
+    be over ``budget_tokens``, more of the oldest verbatim turns are folded
+    in by the same call, counting ``summary_tokens`` for the new summary.
+    Call it inside the request (``CoordinatorAssistant.run(..., history=...)``)
+    so the summarizer call is traced and bounded by the request deadline.
+    """
+
+    def __init__(self, summarizer, budget_tokens: int = 1500, keep_turns: int = 3, max_sessions: int = 1000, summary_tokens: int = 100):
+        self.summarizer = summarizer  # Callable(summary, turns) -> new summary
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id) -> _SessionSummary:
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                state = self._sessions[session_id] = _SessionSummary()
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return state
+
+    def _check_cache(self, state: _SessionSummary, turns: list):
+        if state.turns > len(turns) or _fingerprint(turns[:state.turns]) != state.fingerprint:
+            # A new or edited conversation: the cached summary no longer applies.
+            state.turns, state.fingerprint, state.summary = 0, "", ""
+
+    def _summarize_up_to(self, state: _SessionSummary, turns: list, boundary: int):
+        if boundary <= state.turns:
+            return
+        new_turns = turns[state.turns:boundary]
+        logger.info("Folding %d turns into the history summary", len(new_turns))
+        state.summary = self.summarizer(state.summary, new_turns)
+        state.turns = boundary
+        state.fingerprint = _fingerprint(turns[:boundary])
+
+    def _render(self, summary: str, recent: list, user_input: str) -> str:
+        return render_prompt(summary, recent, user_input)
+
+    def _fold_boundary(self, state: _SessionSummary, turns: list, user_input: str) -> int:
+        """How many leading turns to summarize so the prompt fits the budget."""
+        # Turns already in the summary are never re-sent verbatim.
+        boundary = max(len(turns) - self.keep_turns, state.turns)
+        if boundary == state.turns and count_tokens(self._render(state.summary, turns[boundary:], user_input)) <= self.budget_tokens:
+            return boundary  # Nothing to fold: the cached summary stays as it is
+        # The new summary isn't known yet; assume it takes summary_tokens
+        summary = state.summary if count_tokens(state.summary) >= self.summary_tokens else "x" * self.summary_tokens * CHARS_PER_TOKEN
+        while boundary < len(turns) and count_tokens(self._render(summary, turns[boundary:], user_input)) > self.budget_tokens:
+            boundary += 1
+        return boundary
+
+    def build_prompt(self, session_id, history, user_input: str) -> str:
+        """The prompt for ``user_input``, making at most one summarizer call."""
+        turns = normalize_history(history)
+        state = self._session(session_id)
+        self._check_cache(state, turns)
+        boundary = self._fold_boundary(state, turns, user_input)
+        if boundary > state.turns:
+            with span("history", turns=boundary - state.turns) as history_span:
+                try:
+                    self._summarize_up_to(state, turns, boundary)
+                except DeadlineExceeded as e:
+                    # Out of time: leave the summary for the next turn and send only the recent turns
+                    logger.warning("Skipping history summary: %s", e)
+                    if history_span is not None:
+                        history_span.set_attribute("degraded", str(e))
+                    return self._render(state.summary, turns[boundary:], user_input)
+        return self._render(state.summary, turns[state.turns:], user_input)
+
+    def reset(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
@@ -0,0 +1,304 @@
+import asyncio
+import time
+import weakref
+
+from .limiter import FairLimiter
+from .ollama_api import AsyncClient, Client
+from ..tracing.tracer import atrace_stream, record_llm_response, start_span, trace_stream
+from ..utils.deadline import (
+    DeadlineExceeded, adeadline_chunks, arun_with_deadline, deadline_chunks, remaining_time, run_with_deadline
+)
+from ..utils.json_utils import aextract_json_stream, extract_json_stream
+from ..utils.metrics import record_llm_call
+
+# Output budgets per pipeline stage: routing and planning emit short JSON,
+# the formatter writes the user-facing reply.
+DEFAULT_STAGE_OPTIONS = {
+    "router": {"num_predict": 512, "temperature": 0},
+    "planner": {"num_predict": 256, "temperature": 0},
+    "summarizer": {"num_predict": 384},
+    "formatter": {"num_predict": 1024},
+    "history": {"num_predict": 256, "temperature": 0},
+}
+
+
+class LLMClient:
+    """Shared Ollama client passed from the coordinator to planners and agents.
+
+    One underlying HTTP client (per event loop for async calls) keeps
+    connections alive, ``keep_alive`` stops Ollama from evicting the model
+    between requests, and ``options`` are merged per stage: global
+    ``options``, then ``stage_options[stage]``, then per-call options.
+    With ``max_concurrency``, at most that many requests (streams included)
+    are in flight at once and the rest queue fairly in arrival order. An
+    AdaptiveModelPolicy as ``model_policy`` swaps slow stages to smaller
+    models.
+    """
+
+    def __init__(self, host: str = None, keep_alive="30m", options: dict = None, stage_options: dict = None, timeout: float = None, max_concurrency: int = None, model_policy=None):
+        self.host = host
+        self.keep_alive = keep_alive
+        self.options = dict(options or {})
+        self.stage_options = {stage: dict(opts) for stage, opts in DEFAULT_STAGE_OPTIONS.items()}
+        for stage, opts in (stage_options or {}).items():
+            self.stage_options.setdefault(stage, {}).update(opts)
+        self.timeout = timeout
+        self._client = Client(host=host, timeout=timeout)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self.limiter = FairLimiter(max_concurrency) if max_concurrency else None
+        self.last_request_at = None  # time.monotonic() of the latest request, read by KeepAlive
+        self.model_policy = model_policy
+
+    def options_for(self, stage: str, overrides: dict = None) -> dict:
+        options = dict(self.options)
+        options.update(self.stage_options.get(stage, {}))
+        options.update(overrides or {})
+        return options
+
+    def _request_kwargs(self, stage: str, kwargs: dict) -> dict:
+        kwargs = dict(kwargs)
+        kwargs["options"] = self.options_for(stage, kwargs.get("options"))
+        kwargs.setdefault("keep_alive", self.keep_alive)
+        if not kwargs.pop("background", False):
+            self.last_request_at = time.monotonic()
+        return kwargs
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncClient(host=self.host, timeout=self.timeout)
+            self._async_clients[loop] = client
+        return client
+
+    def chat(self, stage: str, model: str, messages: list, **kwargs):
+        if self.limiter is None:
+            return self._client.chat(model, messages, **self._request_kwargs(stage, kwargs))
+        if not self.limiter.acquire(timeout=remaining_time()):
+            raise DeadlineExceeded(f"Still queued for Ollama at the request deadline ({stage})")
+        try:
+            response = self._client.chat(model, messages, **self._request_kwargs(stage, kwargs))
+        except BaseException:
+            self.limiter.release()
+            raise
+        if kwargs.get("stream"):
+            return self._release_after(response)
+        self.limiter.release()
+        return response
+
+    async def achat(self, stage: str, model: str, messages: list, **kwargs):
+        if self.limiter is None:
+            return await self._async_client().chat(model, messages, **self._request_kwargs(stage, kwargs))
+        await self.limiter.aacquire()
+        try:
+            response = await self._async_client().chat(model, messages, **self._request_kwargs(stage, kwargs))
+        except BaseException:
+            self.limiter.release()
+            raise
+        if kwargs.get("stream"):
+            return self._arelease_after(response)
+        self.limiter.release()
+        return response
+
+    def _release_after(self, chunks):
+        return _SlotStream(self.limiter, chunks)
+
+    def _arelease_after(self, chunks):
+        return _AsyncSlotStream(self.limiter, chunks)
+
+
+class _SlotStream:
+    """A streamed response holding its limiter slot until it is exhausted, fails, is closed or is garbage-collected.
+
+    A generator with a ``finally`` would keep the slot forever when the
+    stream is never iterated, since closing an unstarted generator skips it.
+    """
+
+    def __init__(self, limiter: FairLimiter, chunks):
+        self._limiter = limiter
+        self._chunks = iter(chunks)
+        self._held = True
+
+    def _release(self):
+        if self._held:
+            self._held = False
+            self._limiter.release()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self._release()
+            raise
+
+    def close(self):
+        try:
+            close = getattr(self._chunks, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+    def __del__(self):
+        self._release()
+
+
+class _AsyncSlotStream(_SlotStream):
+    def __init__(self, limiter: FairLimiter, chunks):
+        self._limiter = limiter
+        self._chunks = chunks.__aiter__()
+        self._held = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._chunks.__anext__()
+        except BaseException:
+            self._release()
+            raise
+
+    async def aclose(self):
+        try:
+            aclose = getattr(self._chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        finally:
+            self._release()
+
+
+def _select_model(llm, stage: str, model: str, background: bool = False):
+    """The client's model policy (if any) and the model it picks for ``stage``.
+
+    Background calls (warm-up, keep-alive) bypass the policy: a cold load
+    would skew its latencies.
+    """
+    policy = llm.model_policy if isinstance(llm, LLMClient) and not background else None
+    return policy, (model if policy is None else policy.select(stage, model))
+
+
+def _call_kwargs(llm, kwargs: dict, background: bool) -> dict:
+    # Only LLMClient understands ``background``: it doesn't count the call as traffic
+    return {**kwargs, "background": True} if background and llm is not None else kwargs
+
+
+def _start_llm_span(stage: str, requested: str, model: str):
+    span = start_span(f"llm:{stage}", model=model, stage=stage)
+    if span is not None and model != requested:
+        span.set_attribute("requested_model", requested)
+    return span
+
+
+def _observe_stream(policy, stage: str, model: str, chunks, start: float):
+    try:
+        yield from chunks
+    finally:
+        policy.observe(stage, model, time.perf_counter() - start)
+
+
+async def _aobserve_stream(policy, stage: str, model: str, chunks, start: float):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        policy.observe(stage, model, time.perf_counter() - start)
+
+
+def chat_with(llm, stage: str, model: str, messages: list, default_chat, **kwargs):
+    """Run one LLM call for ``stage`` through ``llm``, or ``default_chat`` when no client is injected.
+
+    The call is recorded as an ``llm:<stage>`` span carrying Ollama's token
+    and timing counters; streamed calls end their span with the stream.
+    Under a request deadline the call gives up with DeadlineExceeded when
+    the time runs out, a stream included, even while waiting for a chunk. The
+    client's model policy may replace ``model`` and is told how long the
+    call took, unless ``background=True`` (warm-up and keep-alive calls,
+    which also don't count as traffic for ``last_request_at``).
+    """
+    record_llm_call(stage)
+    background = kwargs.pop("background", False)
+    policy, selected = _select_model(llm, stage, model, background)
+    span = _start_llm_span(stage, model, selected)
+    what = f"LLM call for {stage}"
+    start = time.perf_counter()
+    try:
+        if llm is not None:
+            call, args = llm.chat, (stage, selected, messages)
+        else:
+            call, args = default_chat, (selected, messages)
+        if kwargs.get("stream"):
+            response = deadline_chunks(what, call(*args, **_call_kwargs(llm, kwargs, background)))
+        else:
+            response = run_with_deadline(what, call, *args, **_call_kwargs(llm, kwargs, background))
+    except BaseException as e:
+        if policy is not None and isinstance(e, DeadlineExceeded):
+            policy.observe(stage, selected, time.perf_counter() - start)
+        if span is not None:
+            span.record_error(e)
+            span.end()
+        raise
+    if kwargs.get("stream"):
+        if policy is not None:
+            response = _observe_stream(policy, stage, selected, response, start)
+        return trace_stream(span, response) if span is not None else response
+    if policy is not None:
+        policy.observe(stage, selected, time.perf_counter() - start)
+    if span is not None:
+        record_llm_response(span, response)
+        span.end()
+    return response
+
+
+async def achat_with(llm, stage: str, model: str, messages: list, default_achat, **kwargs):
+    record_llm_call(stage)
+    background = kwargs.pop("background", False)
+    policy, selected = _select_model(llm, stage, model, background)
+    span = _start_llm_span(stage, model, selected)
+    what = f"LLM call for {stage}"
+    start = time.perf_counter()
+    try:
+        if llm is not None:
+            response = await arun_with_deadline(what, llm.achat(stage, selected, messages, **_call_kwargs(llm, kwargs, background)))
+        else:
+            response = await arun_with_deadline(what, default_achat(selected, messages, **kwargs))
+        if kwargs.get("stream"):
+            response = adeadline_chunks(what, response)
+    except BaseException as e:
+        if policy is not None and isinstance(e, DeadlineExceeded):
+            policy.observe(stage, selected, time.perf_counter() - start)
+        if span is not None:
+            span.record_error(e)
+            span.end()
+        raise
+    if kwargs.get("stream"):
+        if policy is not None:
+            response = _aobserve_stream(policy, stage, selected, response, start)
+        return atrace_stream(span, response) if span is not None else response
+    if policy is not None:
+        policy.observe(stage, selected, time.perf_counter() - start)
+    if span is not None:
+        record_llm_response(span, response)
+        span.end()
+    return response
+
+
+def _chunk_text(chunk) -> str:
+    return chunk.message.content or ""
+
+
+def chat_json_with(llm, stage: str, model: str, messages: list, default_chat, **kwargs):
+    """Stream a JSON-answering call and stop generation once the first object closes.
+
+    Returns ``(obj, text_read)``; raises ValueError if no object arrives.
+    """
+    chunks = chat_with(llm, stage, model, messages, default_chat, stream=True, **kwargs)
+    return extract_json_stream(chunks, _chunk_text)
+
+
+async def achat_json_with(llm, stage: str, model: str, messages: list, default_achat, **kwargs):
+    chunks = await achat_with(llm, stage, model, messages, default_achat, stream=True, **kwargs)
+    return await aextract_json_stream(chunks, _chunk_text)
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+
+class FairLimiter:
+    """FIFO concurrency limit shared by threads and event loops.
+
+    At most ``limit`` holders run at once; everyone else waits in arrival
+    order, whether they wait on a thread or in a coroutine, so one busy
+    session cannot starve the others. A released slot is handed straight to
+    the next waiter.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        self.limit = limit
+        self.active = 0
+        self.stats = {"acquired": 0, "queued": 0, "max_queue": 0, "wait_s": 0.0}
+        self._waiters = deque()  # threading.Event or asyncio.Future, oldest first
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _enter_or_enqueue(self, waiter) -> bool:
+        """Take a free slot and return True, or queue ``waiter`` and return False."""
+        with self._lock:
+            self.stats["acquired"] += 1
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return True
+            self._waiters.append(waiter)
+            self.stats["queued"] += 1
+            self.stats["max_queue"] = max(self.stats["max_queue"], len(self._waiters))
+            return False
+
+    def _record_wait(self, start: float):
+        with self._lock:
+            self.stats["wait_s"] += time.perf_counter() - start
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Wait for a slot; returns False if ``timeout`` seconds pass first."""
+        event = threading.Event()
+        if self._enter_or_enqueue(event):
+            return True
+        start = time.perf_counter()
+        if not event.wait(timeout):
+            with self._lock:
+                still_queued = event in self._waiters
+                if still_queued:
+                    self._waiters.remove(event)
+            if still_queued:
+                self._record_wait(start)
+                return False
+            # Granted just as we gave up: keep the slot
+        self._record_wait(start)
+        return True
+
+    async def aacquire(self):
+        future = asyncio.get_running_loop().create_future()
+        if self._enter_or_enqueue(future):
+            return
+        start = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                still_queued = future in self._waiters
+                if still_queued:
+                    self._waiters.remove(future)
+            if not still_queued and future.done() and not future.cancelled():
+                self.release()  # Granted just as we were cancelled
+            raise
+        self._record_wait(start)
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.active -= 1
+                return
+            waiter = self._waiters.popleft()  # The slot passes on; active is unchanged
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+
+    def _grant(self, future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
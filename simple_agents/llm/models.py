@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger()
+
+DEFAULT_MODEL = "gemma3:4b"
+
+STAGES = ("router", "planner", "summarizer", "formatter", "history")
+
+
+def parse_stage_models(text: str) -> dict:
+    """Parse "planner=gemma3:1b,summarizer:websearch=gemma3:1b" into a stage -> model dict."""
+    stages = {}
+    for item in (text or "").split(","):
+        if not item.strip():
+            continue
+        stage, sep, model = item.partition("=")
+        if not sep or not stage.strip() or not model.strip():
+            raise ValueError(f"Expected <stage>=<model>, got {item.strip()!r}")
+        stages[stage.strip()] = model.strip()
+    return stages
+
+
+class StageModels:
+    """Model used by each pipeline stage.
+
+    ``default`` serves every stage missing from ``stages``. Keys of
+    ``stages`` are stage names (router, planner, summarizer, formatter,
+    history), or ``<stage>:<agent>`` to override one agent's planner or
+    summarizer, e.g. ``{"planner": "gemma3:1b", "summarizer:websearch": "gemma3:4b"}``.
+    """
+
+    def __init__(self, default: str = DEFAULT_MODEL, stages: dict = None):
+        self.default = default
+        self.stages = dict(stages or {})
+        for key in self.stages:
+            if key.partition(":")[0] not in STAGES:
+                raise ValueError(f"Unknown stage {key!r}; expected one of {STAGES}, optionally followed by ':<agent>'")
+
+    def model_for(self, stage: str, agent: str = None) -> str:
+        if agent is not None and f"{stage}:{agent}" in self.stages:
+            return self.stages[f"{stage}:{agent}"]
+        return self.stages.get(stage, self.default)
+
+    def models(self) -> list:
+        """Distinct models, the default first."""
+        return list(dict.fromkeys([self.default, *self.stages.values()]))
+
+    def __repr__(self):
+        return f"StageModels({self.default!r}, {self.stages!r})"
+
+
+class AdaptiveModelPolicy:
+    """Moves a stage to a smaller model while its calls are too slow.
+
+    Keeps an exponentially weighted moving average (weight ``alpha``) of
+    the latency of each (stage, model) pair. Once ``min_samples`` calls put
+    it above ``thresholds[stage]`` seconds, that stage's calls go to
+    ``fallbacks[model]`` instead; fallbacks can chain. After ``retry_after``
+    seconds the slower model is tried again, and its next call decides
+    whether it stays. Attach it with ``LLMClient(model_policy=...)``.
+    """
+
+    def __init__(self, thresholds: dict, fallbacks: dict, alpha: float = 0.3, min_samples: int = 3, retry_after: float = 300.0):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.thresholds = dict(thresholds)
+        self.fallbacks = dict(fallbacks)
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.retry_after = retry_after
+        self._stats = {}  # (stage, model) -> {"ewma", "count", "demoted_at", "probing"}
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        return self._stats.setdefault(key, {"ewma": None, "count": 0, "demoted_at": None, "probing": False})
+
+    def select(self, stage: str, model: str) -> str:
+        """Model to call for ``stage`` when ``model`` was asked for."""
+        seen = set()
+        with self._lock:
+            while model in self.fallbacks and model not in seen:
+                seen.add(model)
+                entry = self._stats.get((stage, model))
+                if entry is None or entry["demoted_at"] is None:
+                    break
+                if time.monotonic() - entry["demoted_at"] >= self.retry_after:
+                    entry.update(ewma=None, count=0, demoted_at=None, probing=True)
+                    break
+                model = self.fallbacks[model]
+        return model
+
+    def observe(self, stage: str, model: str, seconds: float):
+        """Record the latency of a call made with ``model``."""
+        threshold = self.thresholds.get(stage)
+        with self._lock:
+            entry = self._entry((stage, model))
+            entry["ewma"] = seconds if entry["ewma"] is None else self.alpha * seconds + (1 - self.alpha) * entry["ewma"]
+            entry["count"] += 1
+            probing, entry["probing"] = entry["probing"], False
+            if threshold is None or model not in self.fallbacks or entry["demoted_at"] is not None:
+                return
+            if entry["ewma"] > threshold and (probing or entry["count"] >= self.min_samples):
+                entry["demoted_at"] = time.monotonic()
+                logger.warning("%s on %s averages %.2fs (over %.2fs); using %s", stage, model, entry["ewma"], threshold, self.fallbacks[model])
+
+    def latency(self, stage: str, model: str):
+        """Average latency of (stage, model) in seconds, or None before its first call."""
+        with self._lock:
+            entry = self._stats.get((stage, model))
+            return entry["ewma"] if entry else None
+
+    def demoted(self) -> dict:
+        """(stage, model) -> fallback, for the pairs currently moved to a smaller model."""
+        with self._lock:
+            return {key: self.fallbacks[key[1]] for key, entry in self._stats.items() if entry["demoted_at"] is not None}
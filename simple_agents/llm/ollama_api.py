@@ -0,0 +1,28 @@
+"""Lazy stand-ins for the parts of ``ollama`` this package uses.
+
+Importing ``ollama`` pulls in httpx and pydantic, which dominates the cold
+start of CLI and batch workers. These wrappers defer that import to the
+first call while keeping ``chat`` and friends plain module attributes that
+callers (and tests) can patch.
+"""
+
+
+def chat(*args, **kwargs):
+    """``ollama.chat``, imported on first call."""
+    import ollama
+
+    return ollama.chat(*args, **kwargs)
+
+
+def Client(*args, **kwargs):
+    """Construct an ``ollama.Client``, importing ollama on first use."""
+    import ollama
+
+    return ollama.Client(*args, **kwargs)
+
+
+def AsyncClient(*args, **kwargs):
+    """Construct an ``ollama.AsyncClient``, importing ollama on first use."""
+    import ollama
+
+    return ollama.AsyncClient(*args, **kwargs)
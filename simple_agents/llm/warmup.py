@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+
+from .client import chat_with
+from .ollama_api import chat
+
+logger = logging.getLogger()
+
+
+class WarmUpTarget:
+    """One model/system-prompt pair used by a pipeline stage."""
+
+    def __init__(self, stage: str, model: str, system_prompt: str = None):
+        self.stage = stage
+        self.model = model
+        self.system_prompt = system_prompt
+
+    def key(self) -> tuple:
+        return (self.model, self.system_prompt)
+
+    def __repr__(self):
+        return f"WarmUpTarget({self.stage!r}, {self.model!r})"
+
+
+def _seconds(nanoseconds):
+    return nanoseconds / 1e9 if isinstance(nanoseconds, (int, float)) else None
+
+
+def warm_up(targets, llm=None, default_chat=chat) -> list:
+    """Load each target's model and pre-fill its system prompt.
+
+    Every distinct (model, system prompt) pair gets one single-token
+    request, so Ollama loads the model and caches the prompt prefix that
+    real requests for that stage start with. Failures are logged and
+    reported, never raised: a cold model is slow, not broken.
+    """
+    results = []
+    seen = set()
+    for target in targets:
+        if target.key() in seen:
+            continue
+        seen.add(target.key())
+        messages = [{"role": "system", "content": target.system_prompt}] if target.system_prompt else []
+        result = {"stage": target.stage, "model": target.model}
+        start = time.perf_counter()
+        try:
+            response = chat_with(llm, target.stage, target.model, messages, default_chat, options={"num_predict": 1}, background=True)
+        except Exception as e:
+            logger.warning("Warm-up of %s for %s failed: %s", target.model, target.stage, e)
+            result["error"] = str(e)
+        else:
+            result["load_s"] = _seconds(getattr(response, "load_duration", None))
+            result["prompt_tokens"] = getattr(response, "prompt_eval_count", None)
+            logger.info("Warmed up %s for %s (load %ss)", target.model, target.stage, result["load_s"])
+        result["duration_s"] = time.perf_counter() - start
+        results.append(result)
+    return results
+
+
+class KeepAlive:
+    """Background thread that pings models while traffic is idle so Ollama keeps them loaded.
+
+    A ping is an empty chat request, which loads the model (if needed) and
+    resets its keep-alive timer without generating anything. Pings are
+    skipped while ``last_activity()`` (a ``time.monotonic()`` value) shows a
+    request within the last ``interval`` seconds, since real traffic already
+    keeps the model resident.
+    """
+
+    def __init__(self, models, interval: float = 240.0, llm=None, default_chat=chat, last_activity=None):
+        self.models = list(dict.fromkeys(models))
+        self.interval = interval
+        self.llm = llm
+        self.default_chat = default_chat
+        self.last_activity = last_activity or (lambda: getattr(llm, "last_request_at", None))
+        self.pings = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def idle(self) -> bool:
+        last = self.last_activity()
+        return last is None or time.monotonic() - last >= self.interval
+
+    def ping(self):
+        for model in self.models:
+            try:
+                chat_with(self.llm, "keep_alive", model, [], self.default_chat, background=True)
+                self.pings += 1
+            except Exception as e:
+                logger.warning("Keep-alive ping for %s failed: %s", model, e)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            if self.idle():
+                self.ping()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="ollama-keep-alive", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
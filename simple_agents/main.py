@@ -1,115 +1,78 @@
 import gradio as gr
 import logging
 import os
-from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.coordinator_assistant import MODEL, CoordinatorAssistant
+from simple_agents.history import HistoryManager, LLMHistorySummarizer
+from simple_agents.agents.web_search.cache import SearchCache
+from simple_agents.llm.client import LLMClient
+from simple_agents.llm.models import StageModels, parse_stage_models
+from simple_agents.tracing.store import TraceStore, render_trace
+from simple_agents.tracing.tracer import Tracer
+from simple_agents.utils.deadline import LatencyBudget
+from simple_agents.utils.logging_config import configure_logging
 
 # Get the absolute path for the log file
 LOG_FILE = os.path.abspath('chat.log')
 print(f"Log file will be created at: {LOG_FILE}")
 
-class HTTPFilter(logging.Filter):
-    """Filter out HTTP request logs."""
-    def filter(self, record):
-        # Only filter out actual HTTP request/response logs
-        return not (
-            record.getMessage().startswith("HTTP Request:") or 
-            record.getMessage().startswith("response:") or
-            record.getMessage().startswith("GET") or
-            record.getMessage().startswith("POST")
-        )
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Log through a background thread; chat.log rotates at 1MB keeping 5 backups.
+# Set SIMPLE_AGENTS_JSON_LOGS=1 for one compact JSON object per line.
+configure_logging(LOG_FILE, max_bytes=1024 * 1024, backup_count=5, json_lines=os.environ.get("SIMPLE_AGENTS_JSON_LOGS") == "1")
 
 # Get the root logger
 logger = logging.getLogger()
 
-# Add HTTP filter to all handlers
-for handler in logger.handlers:
-    handler.addFilter(HTTPFilter())
-
-# Test logging
-logger.info("Test log message")
-print(f"Log file exists: {os.path.exists(LOG_FILE)}")
-if os.path.exists(LOG_FILE):
-    print(f"Log file size: {os.path.getsize(LOG_FILE)} bytes")
-
-assistant = CoordinatorAssistant()
-
-def clear_chat_log():
-    """Clear the chat log file if it exists and exceeds 1MB in size."""
-    if os.path.exists('chat.log'):
-        file_size = os.path.getsize('chat.log')
-        # 1MB = 1024 * 1024 bytes
-        if file_size > 1024 * 1024:
-            os.remove('chat.log')
-            # Reconfigure logging to create a new log file
-            for handler in logging.root.handlers[:]:
-                logging.root.removeHandler(handler)
-            logging.basicConfig(
-                level=logging.INFO,
-                format='%(asctime)s - %(levelname)s - %(message)s',
-                handlers=[
-                    logging.FileHandler('chat.log'),
-                    logging.StreamHandler()
-                ]
-            )
-            return f"Chat log cleared! (Previous size: {file_size / (1024*1024):.2f}MB)"
-        return f"Chat log not cleared. Current size: {file_size / (1024*1024):.2f}MB"
-    return "No chat log file found."
+# Host comes from OLLAMA_HOST when set; keep the model resident between chats.
+# Requests beyond what Ollama runs in parallel wait in a fair FIFO queue.
+OLLAMA_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+# Sessions handled at once; agents keep per-request state, so this can exceed OLLAMA_PARALLEL
+UI_CONCURRENCY = int(os.environ.get("SIMPLE_AGENTS_UI_CONCURRENCY", "16"))
+llm = LLMClient(keep_alive="30m", max_concurrency=OLLAMA_PARALLEL)
+# Recent per-request traces for the trace panel, bounded by count and size
+trace_store = TraceStore(max_traces=500, max_bytes=5 * 1024 * 1024)
+# Seconds a chat turn may take before it answers with whatever it has; 0 disables the deadline
+LATENCY_BUDGET = float(os.environ.get("SIMPLE_AGENTS_LATENCY_BUDGET", "60"))
+# Per-stage models, e.g. SIMPLE_AGENTS_STAGE_MODELS="planner=gemma3:1b,summarizer:websearch=gemma3:1b"
+models = StageModels(MODEL, parse_stage_models(os.environ.get("SIMPLE_AGENTS_STAGE_MODELS", "")))
+# Keeps each turn's prompt at a constant size however long the chat gets
+history_summarizer = LLMHistorySummarizer(models.model_for("history"), llm=llm)
+history_manager = HistoryManager(history_summarizer, budget_tokens=1500, keep_turns=3)
+assistant = CoordinatorAssistant(
+    models=models,
+    llm=llm,
+    search_cache=SearchCache(db_path=os.path.abspath('search_cache.sqlite')),
+    tracer=Tracer(exporters=[trace_store]),
+    latency_budget=LatencyBudget(LATENCY_BUDGET) if LATENCY_BUDGET > 0 else None,
+    history_manager=history_manager
+)
+# Seconds between keep-alive pings while no chat traffic arrives; 0 disables them
+KEEP_ALIVE_INTERVAL = float(os.environ.get("SIMPLE_AGENTS_KEEP_ALIVE_INTERVAL", "240"))
 
-def chat_with_assistant(user_input, history):
+def stream_reply(user_input, history, request_id=None, session_id=None):
+    """Yield the reply text received so far for one user message."""
     try:
         # Log the user's query
-        logger.info(f"User Query: {user_input}")
-        
-        # Join conversation history to pass into the formatter LLM
-        full_history = "\n".join([f"User: {u}\nAssistant: {a}" for u, a in history])
-        full_prompt = f"{full_history}\nUser: {user_input}"
-
-        # Log the coordinator's initial message to other agents
-        logger.info(f"Coordinator -> Agents: {full_prompt}")
-        
-        response = assistant.run(full_prompt)
+        logger.info("User Query: %s", user_input)
         
-        return response
+        # The request prefixes recent turns verbatim plus a cached summary of older ones, within the token budget
+        response = ""
+        for token in assistant.run_stream(user_input, request_id=request_id, session_id=session_id, history=history):
+            response += token
+            yield response
     except Exception as e:
         error_msg = f"[Error] {e}"
-        logger.error(f"Error occurred: {error_msg}")
-        return error_msg
+        logger.error("Error occurred: %s", error_msg)
+        yield error_msg
 
-def get_latest_log_trace(user_input):
-    """Get the latest log entries for a query."""
-    log_entries = []
-    try:
-        with open('chat.log', 'r') as f:
-            lines = f.readlines()
-            # Get the last 10 lines that contain this query
-            for line in reversed(lines):
-                if user_input in line:
-                    # Include this line and the next 10 lines
-                    idx = lines.index(line)
-                    log_entries = lines[idx:idx+10]
-                    break
-    except Exception as e:
-        logger.error(f"Error reading log file: {e}")
-        return "Error reading log file"
-    
-    return "".join(log_entries)
+def chat_with_assistant(user_input, history, request: gr.Request = None):
+    """Stream the reply to Gradio, yielding the text received so far."""
+    session_id = request.session_hash if request is not None else None
+    yield from stream_reply(user_input, history, session_id=session_id)
 
-def respond(message, chat_history):
-    """Process the message and update chat history."""
-    response = chat_with_assistant(message, chat_history)
-    chat_history.append((message, response))
-    log_trace = get_latest_log_trace(message)
-    return "", chat_history, log_trace
+def latest_trace(request: gr.Request = None):
+    """Render the trace of the session's latest request for the trace panel."""
+    session_id = request.session_hash if request is not None else None
+    return render_trace(trace_store.latest(session_id))
 
 # Create the main interface
 with gr.Blocks(title="🧠 Simple Agents", fill_width=True, fill_height=True) as demo:
@@ -123,8 +86,20 @@ with gr.Blocks(title="🧠 Simple Agents", fill_width=True, fill_height=True) as
         theme="soft"
     )
 
+    # Trace panel: spans, timings and LLM calls of this session's latest request
+    with gr.Accordion("Trace", open=False):
+        trace_box = gr.Textbox(label="Latest request", lines=15, max_lines=30, interactive=False)
+        refresh_trace = gr.Button("Refresh trace")
+    refresh_trace.click(latest_trace, inputs=None, outputs=trace_box)
+
 if __name__ == "__main__":
-    demo.launch(share=True)
+    # Load the models and pre-fill the stage prompts before the first user arrives
+    assistant.warm_up(extra_targets=history_summarizer.warm_up_targets(), keep_alive_interval=KEEP_ALIVE_INTERVAL)
+    demo.queue(default_concurrency_limit=UI_CONCURRENCY)
+    try:
+        demo.launch(share=True)
+    finally:
+        assistant.close()
 
 
 
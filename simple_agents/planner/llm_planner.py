@@ -1,25 +1,48 @@
-from ollama import chat
-from ollama import ChatResponse
+from ..llm.ollama_api import chat
+from ..utils.async_chat import achat
 from ..utils.json_utils import extract_json
+from ..llm.client import achat_json_with, achat_with, chat_json_with, chat_with
 
 
 class LLMPlanner:
-    def __init__(self, model: str, system_prompt: str):
+    def __init__(self, model: str, system_prompt: str, llm=None, stream_json: bool = False, format_schema: dict = None):
         self.model = model
         self.system_prompt = system_prompt
+        self.llm = llm  # Optional shared LLMClient
+        # Stream the reply and stop generating as soon as the plan's JSON object closes
+        self.stream_json = stream_json
+        # JSON Schema passed as Ollama's ``format`` so decoding can only produce valid plans
+        self.format_schema = format_schema
 
-    def plan(self, user_input: str) -> dict:
-        messages = [
+    def _request_kwargs(self) -> dict:
+        return {"format": self.format_schema} if self.format_schema is not None else {}
+
+    def _messages(self, user_input: str) -> list:
+        return [
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": user_input}
         ]
-        response = chat(self.model,messages)
-        content = response.message.content
+
+    def _parse(self, content: str) -> dict:
         try:
-            json_content = extract_json(content)
+            return extract_json(content)
         except Exception as e:
             raise ValueError(f"Planner failed to parse JSON: {e}\nOutput was: {content}")
-        try:
-            return json_content
-        except Exception as e:
-            raise ValueError(f"Planner failed to parse JSON: {e}\nOutput was: {content}")
\ No newline at end of file
+
+    def plan(self, user_input: str) -> dict:
+        if self.stream_json:
+            try:
+                return chat_json_with(self.llm, "planner", self.model, self._messages(user_input), chat, **self._request_kwargs())[0]
+            except ValueError as e:
+                raise ValueError(f"Planner failed to parse JSON: {e}")
+        response = chat_with(self.llm, "planner", self.model, self._messages(user_input), chat, **self._request_kwargs())
+        return self._parse(response.message.content)
+
+    async def aplan(self, user_input: str) -> dict:
+        if self.stream_json:
+            try:
+                return (await achat_json_with(self.llm, "planner", self.model, self._messages(user_input), achat, **self._request_kwargs()))[0]
+            except ValueError as e:
+                raise ValueError(f"Planner failed to parse JSON: {e}")
+        response = await achat_with(self.llm, "planner", self.model, self._messages(user_input), achat, **self._request_kwargs())
+        return self._parse(response.message.content)
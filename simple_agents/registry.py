@@ -0,0 +1,163 @@
+import importlib
+import logging
+import threading
+from collections.abc import Mapping
+
+logger = logging.getLogger()
+
+# Third-party packages register agents under this entry point group. Each
+# entry point must resolve to an AgentSpec, so the module declaring it should
+# stay cheap to import and leave the agent itself to the factory path.
+ENTRY_POINT_GROUP = "simple_agents.agents"
+
+
+def import_object(path):
+    """Resolve a ``"package.module:attr"`` path; anything else is returned as is."""
+    if not isinstance(path, str):
+        return path
+    module_name, _, attr = path.partition(":")
+    if not attr:
+        raise ValueError(f"Expected 'module:attribute', got {path!r}")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+class AgentSpec:
+    """Declares an agent by name without importing it.
+
+    ``factory`` and the ``tools`` values are ``"module:attr"`` paths (or the
+    objects themselves). The factory is called with the coordinator's agent
+    options (``model``, ``llm``, ``summary_policy``, ...) as keyword
+    arguments. ``description`` is shown to the router for agents that are not
+    already described in its prompt.
+    """
+
+    def __init__(self, name: str, factory, tools: dict = None, description: str = None):
+        self.name = name
+        self.factory = factory
+        self.tools = dict(tools or {})
+        self.description = description
+
+    def load_factory(self):
+        return import_object(self.factory)
+
+    def tool_classes(self) -> dict:
+        """Tool name -> tool class, importing the tool modules."""
+        return {name: import_object(path) for name, path in self.tools.items()}
+
+    def build(self, **options):
+        return self.load_factory()(**options)
+
+    def __repr__(self):
+        return f"AgentSpec({self.name!r}, {self.factory!r})"
+
+
+BUILTIN_AGENTS = (
+    AgentSpec(
+        "greet",
+        "simple_agents.agents.greet.factory:build_greet_agent",
+        tools={
+            "say_hello": "simple_agents.agents.greet.tools:GreetUserTool",
+            "name_backwards": "simple_agents.agents.greet.tools:ReverseNameTool",
+        },
+    ),
+    AgentSpec(
+        "websearch",
+        "simple_agents.agents.web_search.factory:build_web_search_agent",
+        tools={"web_search": "simple_agents.agents.web_search.tools:WebSearchTool"},
+    ),
+)
+
+
+class AgentRegistry:
+    """Agent specs by name: the built-ins plus any found through entry points.
+
+    Entry points are only scanned the first time the registry is queried.
+    Pass ``entry_point_group=None`` to use only the given specs.
+    """
+
+    def __init__(self, specs=BUILTIN_AGENTS, entry_point_group: str = ENTRY_POINT_GROUP):
+        self._specs = {spec.name: spec for spec in specs}
+        self._group = entry_point_group
+        self._discovered = entry_point_group is None
+        self._lock = threading.Lock()
+
+    def register(self, spec: AgentSpec):
+        self._specs[spec.name] = spec
+
+    def _discover(self):
+        if self._discovered:
+            return
+        with self._lock:
+            if self._discovered:
+                return
+            # importlib.metadata is slow to import, so only pay for it when scanning
+            from importlib.metadata import entry_points
+
+            for ep in entry_points(group=self._group):
+                try:
+                    spec = ep.load()
+                except Exception as e:
+                    logger.error("Failed to load agent entry point %s: %s", ep.name, e)
+                    continue
+                if not isinstance(spec, AgentSpec):
+                    logger.error("Entry point %s did not resolve to an AgentSpec", ep.name)
+                    continue
+                if spec.name in self._specs:
+                    logger.warning("Ignoring entry point %s: agent %r is already registered", ep.name, spec.name)
+                    continue
+                self._specs[spec.name] = spec
+            self._discovered = True
+
+    def get(self, name: str) -> AgentSpec:
+        self._discover()
+        return self._specs[name]
+
+    def names(self) -> list:
+        self._discover()
+        return list(self._specs)
+
+    def specs(self) -> list:
+        self._discover()
+        return list(self._specs.values())
+
+    def __contains__(self, name) -> bool:
+        self._discover()
+        return name in self._specs
+
+
+class LazyAgents(Mapping):
+    """Read-only name -> agent mapping that builds each agent on first access."""
+
+    def __init__(self, registry: AgentRegistry, options: dict):
+        self.registry = registry
+        self.options = options
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        spec = self.registry.get(name)
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                logger.info("Loading agent %s", name)
+                agent = self._agents[name] = spec.build(**self.options)
+        return agent
+
+    def __contains__(self, name) -> bool:
+        return name in self.registry
+
+    def __iter__(self):
+        return iter(self.registry.names())
+
+    def __len__(self) -> int:
+        return len(self.registry.names())
+
+    def loaded(self) -> list:
+        """Names of the agents built so far."""
+        return list(self._agents)
@@ -0,0 +1,237 @@
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+logger = logging.getLogger()
+
+GREETING_PATTERN = re.compile(r"^\s*(hi|hello|hey|howdy|greetings|good (morning|afternoon|evening))\b", re.IGNORECASE)
+NAME_PATTERN = re.compile(r"\b(my name is|my name's|i am|i'm|im|call me)\s+([A-Za-z][\w'-]*)", re.IGNORECASE)
+# "I'm X" is only read as a name when X is capitalized ("I'm Bob", not "I'm in Tokyo")
+CASUAL_INTROS = {"i am", "i'm", "im"}
+BACKWARDS_PATTERN = re.compile(r"\b(backwards?|reversed?|reverse)\b", re.IGNORECASE)
+STRONG_SEARCH_PATTERN = re.compile(
+    r"\b(weather|temperature|forecast|price|prices|cost|news|headlines|stock|exchange rate|score|population)\b",
+    re.IGNORECASE
+)
+QUESTION_PATTERN = re.compile(r"\b(who|what|when|where|which|how much|how many)\b.*\?", re.IGNORECASE)
+# Words that follow "I'm" without being a name ("I'm fine", "I'm in Tokyo", "I am going...").
+NOT_NAMES = {
+    "a", "an", "the", "not", "so", "just", "also", "still", "really", "very", "here", "there", "back", "home", "new",
+    "in", "at", "on", "from", "to", "into", "near", "with", "for", "about", "by", "of", "off", "out", "over", "up",
+    "fine", "good", "great", "ok", "okay", "well", "sure", "glad", "happy", "sad", "tired", "bored", "hungry", "sick",
+    "busy", "free", "ready", "sorry", "curious", "interested", "confused", "lost", "stuck", "done", "afraid", "able",
+}
+# What may remain of a message once its greeting and introduction are removed
+# for it to still be just a greeting ("Hi there, I'm Bob, nice to meet you!").
+GREETING_FILLER = {"there", "all", "everyone", "folks", "and", "nice", "to", "meet", "you", "btw", "by", "the", "way", "so", "it", "is", "this", "here", "again"}
+
+
+def latest_user_message(text: str) -> str:
+    """Return the last ``User:`` turn of a joined conversation prompt."""
+    marker = "User:"
+    if marker in text:
+        text = text[text.rindex(marker) + len(marker):]
+    return text.strip()
+
+
+def _name_match(text: str):
+    """The self-introduction in ``text`` ("my name is X", "I'm X"), or None."""
+    for match in NAME_PATTERN.finditer(text):
+        name = match.group(2).strip("'")
+        if name.lower() in NOT_NAMES:
+            continue
+        if match.group(1).lower() in CASUAL_INTROS and (not name[0].isupper() or name.lower().endswith("ing")):
+            continue
+        return match
+    return None
+
+
+def extract_name(text: str) -> str:
+    match = _name_match(text)
+    return match.group(2).strip("'") if match else ""
+
+
+def greeting_remainder(text: str) -> list:
+    """Words left once the greeting, the introduction and filler are removed."""
+    text = GREETING_PATTERN.sub(" ", text, count=1)
+    match = _name_match(text)
+    if match:
+        text = text[:match.start()] + " " + text[match.end():]
+    return [w for w in re.findall(r"[a-z0-9']+", text.lower()) if w not in GREETING_FILLER]
+
+
+def build_assignment(agent_name: str, text: str) -> dict:
+    """Build a router-shaped assignment for ``agent_name`` without an LLM."""
+    if agent_name == "greet":
+        name = extract_name(text)
+        tools = ["say_hello"]
+        task = f"Greet the user {name}".strip()
+        if BACKWARDS_PATTERN.search(text):
+            tools.append("name_backwards")
+            task += " and reverse their name"
+        return {
+            "agent": "greet",
+            "task": task,
+            "context": {
+                "relevant_info": f"User's name is {name}" if name else "User did not give a name",
+                "user_intent": "wants to be greeted",
+                "required_tools": tools
+            },
+            "depends_on": []
+        }
+    if agent_name == "websearch":
+        return {
+            "agent": "websearch",
+            "task": f"Search the web to answer: {text}",
+            "context": {
+                "relevant_info": text,
+                "user_intent": "find current information",
+                "required_tools": ["web_search"]
+            },
+            "depends_on": []
+        }
+    return {"agent": agent_name, "task": text, "context": {"relevant_info": text}, "depends_on": []}
+
+
+class RuleClassifier:
+    """Keyword/regex rules for the intents that are obvious from the text."""
+
+    def classify(self, text: str):
+        """Return ``(agent_names, confidence)`` for ``text``."""
+        name_backwards = bool(BACKWARDS_PATTERN.search(text) and re.search(r"\bname\b", text, re.IGNORECASE))
+        search_confidence = 0.0
+        if STRONG_SEARCH_PATTERN.search(text):
+            search_confidence = 0.9
+        elif QUESTION_PATTERN.search(text) and not BACKWARDS_PATTERN.search(text):
+            search_confidence = 0.6
+
+        greet_confidence = 0.0
+        if GREETING_PATTERN.search(text) or extract_name(text):
+            # A greeting in front of another request is only certain when the
+            # rest is something these rules also recognise; otherwise the LLM
+            # router has to read it ("hello, tell me about quantum computing").
+            if not greeting_remainder(text) or search_confidence >= 0.9 or name_backwards:
+                greet_confidence = 0.95
+            else:
+                greet_confidence = 0.4
+        elif name_backwards:
+            greet_confidence = 0.9
+
+        agents = []
+        if greet_confidence:
+            agents.append("greet")
+        if search_confidence:
+            agents.append("websearch")
+        if not agents:
+            return [], 0.0
+        return agents, min(c for c in (greet_confidence, search_confidence) if c)
+
+
+class NGramClassifier:
+    """Naive Bayes over word unigrams and bigrams, trained on past routing decisions.
+
+    Each distinct combination of agents (e.g. ``greet+websearch``) is one label.
+    """
+
+    def __init__(self):
+        self.label_counts = Counter()
+        self.ngram_counts = defaultdict(Counter)
+        self.vocabulary = set()
+
+    @staticmethod
+    def _ngrams(text: str) -> list:
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def fit(self, examples) -> "NGramClassifier":
+        """Train on ``(text, agent_names)`` pairs."""
+        for text, agent_names in examples:
+            label = "+".join(sorted(set(agent_names)))
+            if not label:
+                continue
+            ngrams = self._ngrams(text)
+            self.label_counts[label] += 1
+            self.ngram_counts[label].update(ngrams)
+            self.vocabulary.update(ngrams)
+        return self
+
+    def classify(self, text: str):
+        if not self.label_counts:
+            return [], 0.0
+        ngrams = self._ngrams(latest_user_message(text))
+        total = sum(self.label_counts.values())
+        scores = {}
+        for label, count in self.label_counts.items():
+            label_ngrams = self.ngram_counts[label]
+            denominator = sum(label_ngrams.values()) + len(self.vocabulary)
+            score = math.log(count / total)
+            for ngram in ngrams:
+                score += math.log((label_ngrams[ngram] + 1) / denominator)
+            scores[label] = score
+        best = max(scores, key=scores.get)
+        # Softmax over label scores gives the posterior of the best label.
+        top = scores[best]
+        confidence = 1.0 / sum(math.exp(score - top) for score in scores.values())
+        return best.split("+"), confidence
+
+    @classmethod
+    def from_routing_log(cls, path: str) -> "NGramClassifier":
+        """Train from a JSONL log written by FastRouter(routing_log=...)."""
+        examples = []
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    examples.append((record["input"], [a["agent"] for a in record["agents"]]))
+        return cls().fit(examples)
+
+
+class FastRouter:
+    """Pre-router that answers obvious requests locally and defers the rest to the LLM.
+
+    Classifiers are tried in order; the first one whose confidence reaches
+    ``threshold`` decides. ``route`` returns None when the LLM router should
+    be used instead.
+    """
+
+    def __init__(self, classifiers=None, threshold: float = 0.85, known_agents=None, routing_log: str = None):
+        self.classifiers = classifiers if classifiers is not None else [RuleClassifier()]
+        self.threshold = threshold
+        self.known_agents = set(known_agents) if known_agents else None
+        self.routing_log = routing_log  # Append LLM decisions here to train an NGramClassifier later
+        self.stats = {"requests": 0, "fast_path": 0, "fallback": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[key] += 1
+
+    def fast_path_rate(self) -> float:
+        with self._lock:
+            return self.stats["fast_path"] / self.stats["requests"] if self.stats["requests"] else 0.0
+
+    def route(self, user_input: str):
+        text = latest_user_message(user_input)
+        for classifier in self.classifiers:
+            agent_names, confidence = classifier.classify(text)
+            if not agent_names or confidence < self.threshold:
+                continue
+            if self.known_agents and not set(agent_names) <= self.known_agents:
+                continue
+            self._count("fast_path")
+            logger.info("Fast path routed to %s (%s, confidence %.2f)", agent_names, type(classifier).__name__, confidence)
+            return [build_assignment(agent_name, text) for agent_name in agent_names]
+        self._count("fallback")
+        return None
+
+    def record(self, user_input: str, agent_assignments: list):
+        """Log an LLM routing decision as a future training example."""
+        if not self.routing_log or not agent_assignments:
+            return
+        record = {"input": latest_user_message(user_input), "agents": agent_assignments}
+        with self._lock, open(self.routing_log, "a") as f:
+            f.write(json.dumps(record) + "\n")
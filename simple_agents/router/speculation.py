@@ -0,0 +1,82 @@
+import logging
+import threading
+from collections import Counter, deque
+
+from .fast_router import RuleClassifier, latest_user_message
+
+logger = logging.getLogger()
+
+
+class Speculator:
+    """Predicts the agent to start while the router is still deciding, and scores the bets.
+
+    ``predict`` asks the classifiers first (the same ones FastRouter uses);
+    a prediction needs at least ``min_confidence``. Failing that, it falls
+    back to the agent chosen most often in the last ``window`` routing
+    decisions, if it took part in at least ``min_share`` of them.
+
+    With ``run_tools`` the first planned step is also run when its tool is
+    ``speculative_safe``. ``stats`` counts bets that were accepted (the
+    router picked that agent), wasted (it did not), or failed, plus requests
+    where no prediction was made.
+    """
+
+    def __init__(self, classifiers=None, min_confidence: float = 0.5, min_share: float = 0.6, window: int = 200, run_tools: bool = False, known_agents=None):
+        self.classifiers = classifiers if classifiers is not None else [RuleClassifier()]
+        self.min_confidence = min_confidence
+        self.min_share = min_share
+        self.run_tools = run_tools
+        self.known_agents = set(known_agents) if known_agents else None
+        self.stats = {"speculated": 0, "accepted": 0, "wasted": 0, "failed": 0, "skipped": 0}
+        self._recent = deque(maxlen=window)  # agent names of each routing decision
+        self._lock = threading.Lock()
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _allowed(self, agent_name: str) -> bool:
+        return self.known_agents is None or agent_name in self.known_agents
+
+    def _most_frequent(self, agent_names=None):
+        with self._lock:
+            counts = Counter(name for names in self._recent for name in names)
+            decisions = len(self._recent)
+        candidates = [(count, name) for name, count in counts.items() if agent_names is None or name in agent_names]
+        if not candidates:
+            return None, 0.0
+        count, name = max(candidates)
+        return name, count / decisions
+
+    def predict(self, user_input: str):
+        """Name of the agent most likely to be routed to, or None to skip speculating."""
+        text = latest_user_message(user_input)
+        for classifier in self.classifiers:
+            agent_names, confidence = classifier.classify(text)
+            agent_names = [name for name in agent_names if self._allowed(name)]
+            if agent_names and confidence >= self.min_confidence:
+                # Several agents: bet on the one the router has picked most often
+                name, _ = self._most_frequent(agent_names)
+                return name or agent_names[0]
+        name, share = self._most_frequent()
+        if name is not None and share >= self.min_share and self._allowed(name):
+            return name
+        return None
+
+    def observe(self, agent_assignments: list):
+        """Record a routing decision for the frequency fallback."""
+        names = {a.get("agent") for a in agent_assignments if a.get("agent")}
+        if names:
+            with self._lock:
+                self._recent.append(names)
+
+    def accept_rate(self) -> float:
+        """Share of speculative runs the router agreed with."""
+        with self._lock:
+            return self.stats["accepted"] / self.stats["speculated"] if self.stats["speculated"] else 0.0
+
+    def waste_rate(self) -> float:
+        """Share of speculative runs whose work was thrown away."""
+        with self._lock:
+            thrown_away = self.stats["wasted"] + self.stats["failed"]
+            return thrown_away / self.stats["speculated"] if self.stats["speculated"] else 0.0
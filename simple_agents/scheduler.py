@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import logging
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger()
+
+
+def resolve_dependencies(agent_assignments: list) -> list:
+    """Turn each assignment's ``depends_on`` into a list of earlier indexes.
+
+    ``depends_on`` may reference earlier assignments by position (0-based) or
+    by agent name. Assignments without it are independent. References to the
+    assignment itself or to later ones are dropped, which keeps the graph
+    acyclic.
+    """
+    dependencies = []
+    for i, assignment in enumerate(agent_assignments):
+        refs = assignment.get("depends_on") or []
+        if not isinstance(refs, list):
+            refs = [refs]
+        deps = []
+        for ref in refs:
+            if isinstance(ref, int) and not isinstance(ref, bool):
+                index = ref
+            else:
+                earlier = [j for j in range(i) if agent_assignments[j].get("agent") == ref]
+                index = earlier[-1] if earlier else None
+            if index is None or not 0 <= index < i:
+                logger.warning("Ignoring invalid dependency %r of assignment %s", ref, i)
+                continue
+            if index not in deps:
+                deps.append(index)
+        dependencies.append(deps)
+    return dependencies
+
+
+def run_dependency_graph(dependencies: list, run_node, max_workers: int = None, exclusive_key=None) -> list:
+    """Run ``run_node(index, dependency_results)`` for every node on a thread pool.
+
+    A node starts as soon as all of its dependencies have finished, so
+    independent nodes run concurrently. Nodes for which ``exclusive_key(index)``
+    returns the same non-None key never overlap; they run in node order.
+    Results are returned in node order.
+    """
+    results = [None] * len(dependencies)
+    if len(dependencies) == 1:
+        results[0] = run_node(0, [])
+        return results
+
+    remaining = {i: set(deps) for i, deps in enumerate(dependencies)}
+    dependents = defaultdict(list)
+    for i, deps in enumerate(dependencies):
+        for dep in deps:
+            dependents[dep].append(i)
+
+    keys = [exclusive_key(i) if exclusive_key else None for i in range(len(dependencies))]
+    with ThreadPoolExecutor(max_workers=max_workers or len(dependencies) or 1) as pool:
+        futures = {}
+        busy = set()  # exclusive keys of running nodes
+
+        def submit_ready():
+            for i in [i for i, waiting in remaining.items() if not waiting]:
+                if keys[i] is not None:
+                    if keys[i] in busy:
+                        continue
+                    busy.add(keys[i])
+                del remaining[i]
+                dep_results = [results[d] for d in dependencies[i]]
+                # Copy the context so per-request state (e.g. LLM call counts) follows the node.
+                futures[pool.submit(contextvars.copy_context().run, run_node, i, dep_results)] = i
+
+        submit_ready()
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures.pop(future)
+                busy.discard(keys[i])
+                results[i] = future.result()
+                for dependent in dependents[i]:
+                    remaining[dependent].discard(i)
+            submit_ready()
+    return results
+
+
+async def arun_dependency_graph(dependencies: list, arun_node, max_workers: int = None, exclusive_key=None) -> list:
+    """Async counterpart of run_dependency_graph using one task per node.
+
+    At most ``max_workers`` nodes run at once, like the sync version's pool.
+    """
+    tasks = []
+    locks = defaultdict(asyncio.Lock)
+    semaphore = asyncio.Semaphore(max_workers) if max_workers else None
+
+    async def run_bounded(i, dep_results):
+        if semaphore is None:
+            return await arun_node(i, dep_results)
+        async with semaphore:
+            return await arun_node(i, dep_results)
+
+    async def run(i):
+        dep_results = [await tasks[d] for d in dependencies[i]]
+        key = exclusive_key(i) if exclusive_key else None
+        if key is None:
+            return await run_bounded(i, dep_results)
+        # Wait for the key before taking a slot, so queued nodes don't hold slots
+        async with locks[key]:
+            return await run_bounded(i, dep_results)
+
+    for i in range(len(dependencies)):
+        tasks.append(asyncio.ensure_future(run(i)))
+    return list(await asyncio.gather(*tasks))
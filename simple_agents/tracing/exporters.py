@@ -0,0 +1,77 @@
+import json
+import threading
+
+
+class JSONLExporter:
+    """Append each finished trace as one JSON line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _otel_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+def to_otlp(trace, service_name: str = "simple_agents") -> dict:
+    """Convert a trace to the OTLP/JSON ``ExportTraceServiceRequest`` shape."""
+    spans = []
+    for span in trace.to_dict()["spans"]:
+        otel_span = {
+            "traceId": trace.trace_id,
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(span["end_ns"] or span["start_ns"]),
+            "attributes": [{"key": k, "value": _otel_value(v)} for k, v in span["attributes"].items()],
+            "status": {"code": 2, "message": span["error"]} if span["status"] == "error" else {"code": 1},
+        }
+        if span["parent_id"]:
+            otel_span["parentSpanId"] = span["parent_id"]
+        spans.append(otel_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "simple_agents.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class OTLPJSONExporter:
+    """Append each trace as an OTLP/JSON line, readable by the OpenTelemetry
+    Collector's ``otlpjsonfile`` receiver."""
+
+    def __init__(self, path: str, service_name: str = "simple_agents"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, trace):
+        line = json.dumps(to_otlp(trace, self.service_name))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class InMemoryExporter:
+    """Keep finished traces in a list; handy for tests and notebooks."""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, trace):
+        self.traces.append(trace)
@@ -0,0 +1,95 @@
+import json
+import threading
+from collections import OrderedDict
+
+# A model load this long means the call paid for a cold model, so show it
+MODEL_LOAD_SHOWN_NS = 100_000_000
+
+
+class TraceStore:
+    """Bounded in-memory ring buffer of finished traces, usable as a Tracer exporter.
+
+    Traces are kept as plain dicts keyed by request ID, with the latest
+    request of each session indexed too. The oldest traces are evicted once
+    either ``max_traces`` or ``max_bytes`` (JSON size) is exceeded.
+    """
+
+    def __init__(self, max_traces: int = 500, max_bytes: int = 5 * 1024 * 1024):
+        self.max_traces = max_traces
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._traces = OrderedDict()  # request_id -> (trace dict, size in bytes)
+        self._latest_by_session = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._traces)
+
+    def export(self, trace):
+        self.add(trace.to_dict())
+
+    def add(self, trace: dict):
+        size = len(json.dumps(trace, default=str))
+        request_id = trace["request_id"]
+        session_id = trace.get("attributes", {}).get("session_id")
+        with self._lock:
+            if request_id in self._traces:
+                self._evict(request_id)
+            self._traces[request_id] = (trace, size)
+            self.total_bytes += size
+            if session_id is not None:
+                self._latest_by_session[session_id] = request_id
+            while len(self._traces) > 1 and (len(self._traces) > self.max_traces or self.total_bytes > self.max_bytes):
+                self._evict(next(iter(self._traces)))
+
+    def _evict(self, request_id: str):
+        trace, size = self._traces.pop(request_id)
+        self.total_bytes -= size
+        session_id = trace.get("attributes", {}).get("session_id")
+        if self._latest_by_session.get(session_id) == request_id:
+            del self._latest_by_session[session_id]
+
+    def get(self, request_id: str):
+        """Return the trace dict for ``request_id``, or None if unknown or evicted."""
+        with self._lock:
+            entry = self._traces.get(request_id)
+        return entry[0] if entry else None
+
+    def latest(self, session_id: str = None):
+        """Return the most recent trace of ``session_id``, or of any session when omitted."""
+        with self._lock:
+            if session_id is None:
+                request_id = next(reversed(self._traces), None)
+            else:
+                request_id = self._latest_by_session.get(session_id)
+            entry = self._traces.get(request_id) if request_id is not None else None
+        return entry[0] if entry else None
+
+
+def render_trace(trace: dict) -> str:
+    """Render a trace dict as an indented span tree with durations and token counts."""
+    if not trace:
+        return "No trace recorded."
+    children = {}
+    for span in trace["spans"]:
+        children.setdefault(span["parent_id"], []).append(span)
+
+    lines = [f"Request {trace['request_id']}"]
+
+    def walk(parent_id, depth):
+        for span in children.get(parent_id, []):
+            duration = f"{span['duration_s'] * 1000:.0f}ms" if span["duration_s"] is not None else "running"
+            details = []
+            attributes = span["attributes"]
+            if "prompt_eval_count" in attributes or "eval_count" in attributes:
+                details.append(f"tokens in/out {attributes.get('prompt_eval_count', '?')}/{attributes.get('eval_count', '?')}")
+            if attributes.get("load_duration", 0) >= MODEL_LOAD_SHOWN_NS:
+                details.append(f"model load {attributes['load_duration'] / 1e9:.2f}s")
+            if span["status"] == "error":
+                details.append(span["error"])
+            suffix = f" ({', '.join(details)})" if details else ""
+            lines.append(f"{'  ' * depth}{span['name']}: {duration}{suffix}")
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
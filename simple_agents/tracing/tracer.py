@@ -0,0 +1,202 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger()
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+# Ollama response fields copied onto LLM spans.
+LLM_METRIC_FIELDS = ("prompt_eval_count", "eval_count", "prompt_eval_duration", "eval_duration", "load_duration", "total_duration")
+
+
+class Span:
+    """One timed unit of work inside a request trace."""
+
+    def __init__(self, trace, name: str, parent_id: str = None, attributes: dict = None):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._start = time.perf_counter()
+        self.duration_s = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.end_ns is None:
+            self.duration_s = time.perf_counter() - self._start
+            self.end_ns = self.start_ns + int(self.duration_s * 1e9)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_s": self.duration_s,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """All spans recorded for one request."""
+
+    def __init__(self, request_id: str = None, attributes: dict = None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.trace_id = uuid.uuid4().hex
+        self.attributes = dict(attributes or {})
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def new_span(self, name: str, parent_id: str = None, attributes: dict = None) -> Span:
+        span = Span(self, name, parent_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def root(self):
+        return self.spans[0] if self.spans else None
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [span.to_dict() for span in self.spans]
+        return {"request_id": self.request_id, "trace_id": self.trace_id, "attributes": self.attributes, "spans": spans}
+
+
+class Tracer:
+    """Creates a trace per request and hands finished traces to the exporters."""
+
+    def __init__(self, exporters=None):
+        self.exporters = list(exporters or [])
+
+    @contextmanager
+    def start_request(self, name: str = "request", request_id: str = None, **attributes):
+        attributes = {k: v for k, v in attributes.items() if v is not None}
+        trace = Trace(request_id, attributes)
+        root = trace.new_span(name, attributes={"request_id": trace.request_id, **attributes})
+        token = _current_span.set(root)
+        try:
+            yield trace
+        except BaseException as e:
+            root.record_error(e)
+            raise
+        finally:
+            root.end()
+            _reset(token, None)
+            self.export(trace)
+
+    def export(self, trace: Trace):
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace)
+            except Exception as e:
+                logger.error("Trace exporter %s failed: %s", type(exporter).__name__, e)
+
+
+def _reset(token, fallback):
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Generators resumed from another thread/context cannot reset the token.
+        _current_span.set(fallback)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_request_id():
+    span = _current_span.get()
+    return span.trace.request_id if span is not None else None
+
+
+def start_span(name: str, **attributes):
+    """Start a child of the current span without making it current; call ``end()`` when done.
+
+    Returns None outside a traced request.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return parent.trace.new_span(name, parent.span_id, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a nested span for the enclosed block; a no-op outside a traced request."""
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        child.end()
+        _reset(token, child.trace.spans[0] if child.parent_id else None)
+
+
+def record_llm_response(target, response):
+    """Copy Ollama's token and timing counters from ``response`` onto ``target``."""
+    if target is None or response is None:
+        return
+    for field in LLM_METRIC_FIELDS:
+        value = getattr(response, field, None)
+        if isinstance(value, (int, float)):
+            target.set_attribute(field, value)
+
+
+def trace_stream(target, chunks):
+    """Wrap a streaming response so ``target`` ends, with metrics, when the stream does."""
+    try:
+        for chunk in chunks:
+            if getattr(chunk, "done", False):
+                record_llm_response(target, chunk)
+            yield chunk
+    except BaseException as e:
+        if target is not None:
+            target.record_error(e)
+        raise
+    finally:
+        if target is not None:
+            target.end()
+
+
+async def atrace_stream(target, chunks):
+    try:
+        async for chunk in chunks:
+            if getattr(chunk, "done", False):
+                record_llm_response(target, chunk)
+            yield chunk
+    except BaseException as e:
+        if target is not None:
+            target.record_error(e)
+        raise
+    finally:
+        if target is not None:
+            target.end()
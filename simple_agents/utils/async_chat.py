@@ -0,0 +1,23 @@
+import asyncio
+import weakref
+
+from ..llm.ollama_api import AsyncClient
+
+# One AsyncClient per event loop so HTTP connections are reused across calls
+# without leaking a client bound to a closed loop.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Return the shared AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = AsyncClient()
+        _clients[loop] = client
+    return client
+
+
+async def achat(model: str, messages: list, **kwargs):
+    """Async counterpart of ``ollama.chat``."""
+    return await get_async_client().chat(model, messages, **kwargs)
@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+# Runs blocking calls that must give up at the deadline. A call that overruns
+# keeps its worker until it returns; the caller stops waiting for it.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="deadline")
+_END = object()  # next() default marking the end of a stream
+
+
+class DeadlineExceeded(TimeoutError):
+    """A stage ran out of the request's latency budget."""
+
+
+class Deadline:
+    """Absolute end time of one request, plus the reserves that trigger fallbacks."""
+
+    def __init__(self, seconds: float, summary_reserve_s: float = 0.0, formatter_reserve_s: float = 0.0):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.summary_reserve_s = summary_reserve_s
+        self.formatter_reserve_s = formatter_reserve_s
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+class LatencyBudget:
+    """Per-request latency budget for CoordinatorAssistant.
+
+    Every LLM and tool call gets the time left of ``total_s``. When less
+    than ``summary_reserve_s`` is left, agents skip their LLM summary (tool
+    summaries are used if every tool has one). When less than
+    ``formatter_reserve_s`` is left, the coordinator skips the formatter and
+    joins the agents' summaries, or their raw tool output.
+    """
+
+    def __init__(self, total_s: float, summary_reserve_s: float = 2.0, formatter_reserve_s: float = 2.0):
+        self.total_s = total_s
+        self.summary_reserve_s = summary_reserve_s
+        self.formatter_reserve_s = formatter_reserve_s
+
+    def start(self) -> Deadline:
+        return Deadline(self.total_s, self.summary_reserve_s, self.formatter_reserve_s)
+
+
+def current_deadline():
+    return _deadline.get()
+
+
+def remaining_time():
+    """Seconds left for the current request, or None without a deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def low_on_time(reserve: str) -> bool:
+    """Whether less than the deadline's ``<reserve>_reserve_s`` is left."""
+    deadline = _deadline.get()
+    return deadline is not None and deadline.remaining() < getattr(deadline, f"{reserve}_reserve_s")
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Make ``deadline`` (a Deadline or None) current for the enclosed calls."""
+    if deadline is None:
+        yield None
+        return
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context
+            _deadline.set(None)
+
+
+def check_deadline(what: str):
+    deadline = _deadline.get()
+    if deadline is not None and deadline.expired():
+        raise DeadlineExceeded(f"{what} skipped: request deadline of {deadline.seconds}s passed")
+
+
+def run_with_deadline(what: str, fn, *args, **kwargs):
+    """Call ``fn`` and give up with DeadlineExceeded when the request's time runs out."""
+    remaining = remaining_time()
+    if remaining is None:
+        return fn(*args, **kwargs)
+    check_deadline(what)
+    future = _executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    try:
+        return future.result(timeout=remaining)
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"{what} did not finish within the request deadline") from None
+
+
+async def arun_with_deadline(what: str, awaitable):
+    """Await ``awaitable``, cancelling it when the request's time runs out."""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()  # Never started; close it so it isn't reported as un-awaited
+        check_deadline(what)
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"{what} did not finish within the request deadline") from None
+
+
+def deadline_chunks(what: str, chunks):
+    """Pass a stream through, giving up with DeadlineExceeded when the next chunk doesn't arrive in time."""
+    if remaining_time() is None:
+        yield from chunks
+        return
+    iterator = iter(chunks)
+    pending = None
+    try:
+        while True:
+            check_deadline(what)
+            pending = _executor.submit(contextvars.copy_context().run, next, iterator, _END)
+            try:
+                chunk = pending.result(timeout=remaining_time())
+            except FutureTimeoutError:
+                raise DeadlineExceeded(f"{what} did not finish within the request deadline") from None
+            pending = None
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            if pending is None:
+                close()
+            else:
+                # The stalled next() still runs the stream; close it once that returns
+                pending.add_done_callback(lambda _: close())
+
+
+async def adeadline_chunks(what: str, chunks):
+    iterator = chunks.__aiter__()
+    try:
+        while True:
+            remaining = remaining_time()
+            if remaining is None:
+                chunk = await iterator.__anext__()
+            else:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=max(remaining, 0.001))
+                except asyncio.TimeoutError:
+                    raise DeadlineExceeded(f"{what} did not finish within the request deadline") from None
+            yield chunk
+    except StopAsyncIteration:
+        return
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
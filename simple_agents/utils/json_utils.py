@@ -1,10 +1,150 @@
 import re
 import json
 
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class JSONObjectScanner:
+    """Finds the first complete JSON object in text that arrives in pieces.
+
+    Skips ``<think>`` blocks, code fences and surrounding prose, tracks
+    braces outside of strings, and reports the object as soon as its
+    closing brace arrives. Brace-balanced text that is not valid JSON
+    (e.g. ``{name}`` in prose) is skipped and scanning continues after it.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.result = None
+        self.done = False
+        self._pos = 0
+        self._start = None  # Index of the candidate object's opening brace
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._in_think = False
+
+    def feed(self, chunk: str) -> bool:
+        """Add more text; returns True once an object has been found."""
+        if self.done:
+            return True
+        self.text += chunk
+        self._scan()
+        return self.done
+
+    def _scan(self):
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            if self._in_think:
+                end = text.find(THINK_CLOSE, self._pos)
+                if end < 0:
+                    self._pos = max(self._pos, len(text) - len(THINK_CLOSE) + 1)
+                    return
+                self._in_think = False
+                self._pos = end + len(THINK_CLOSE)
+            elif self._start is None:
+                brace = text.find("{", self._pos)
+                think = text.find("<", self._pos, brace if brace >= 0 else len(text))
+                if think >= 0:
+                    if len(text) - think < len(THINK_OPEN) and THINK_OPEN.startswith(text[think:]):
+                        self._pos = think  # Might be a tag split across chunks
+                        return
+                    if text.startswith(THINK_OPEN, think):
+                        self._in_think = True
+                        self._pos = think + len(THINK_OPEN)
+                        continue
+                    self._pos = think + 1
+                    continue
+                if brace < 0:
+                    self._pos = len(text)
+                    return
+                self._start, self._depth = brace, 1
+                self._in_string = self._escaped = False
+                self._pos = brace + 1
+            else:
+                self._scan_object(text)
+
+    def _scan_object(self, text: str):
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = text[self._start:i + 1]
+                    try:
+                        self.result = json.loads(candidate)
+                        self.done = True
+                        self._pos = i + 1
+                    except json.JSONDecodeError:
+                        self._pos = self._start + 1
+                    self._start = None
+                    return
+        self._pos = len(text)
+
+
+def find_json_object(content: str):
+    """Return the first JSON object embedded anywhere in ``content``, or raise ValueError."""
+    scanner = JSONObjectScanner()
+    if not scanner.feed(content):
+        raise ValueError("No JSON object found")
+    return scanner.result
+
 
 def extract_json(content):
     # Strip <think> tags or other non-JSON stuff
     content = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL).strip()
     if content.strip().startswith("```json"):
         content = re.sub(r"```json|```", "", content).strip()
-    return json.loads(content)
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        # Prose, a fence in the middle or trailing text around the object
+        return find_json_object(content)
+
+
+def _close(iterator):
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        close()
+
+
+def extract_json_stream(chunks, get_text=None):
+    """Consume streamed chunks until the first JSON object closes.
+
+    The stream is closed right away, which drops the HTTP connection and
+    stops the model generating the rest. Returns ``(obj, text_read)``.
+    Raises ValueError if the stream ends without an object.
+    """
+    scanner = JSONObjectScanner()
+    try:
+        for chunk in chunks:
+            if scanner.feed(get_text(chunk) if get_text else chunk):
+                return scanner.result, scanner.text
+    finally:
+        _close(chunks)
+    raise ValueError(f"No JSON object found in: {scanner.text}")
+
+
+async def aextract_json_stream(chunks, get_text=None):
+    scanner = JSONObjectScanner()
+    try:
+        async for chunk in chunks:
+            if scanner.feed(get_text(chunk) if get_text else chunk):
+                return scanner.result, scanner.text
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    raise ValueError(f"No JSON object found in: {scanner.text}")
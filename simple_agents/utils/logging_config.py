@@ -0,0 +1,128 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+from ..tracing.tracer import current_request_id
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+_listener = None
+_queue_handler = None
+
+
+class HTTPFilter(logging.Filter):
+    """Filter out HTTP request logs."""
+
+    PREFIXES = ("HTTP Request:", "response:", "GET", "POST")
+
+    def filter(self, record):
+        # Checks the unformatted template so records are not formatted on the request thread
+        return not str(record.msg).startswith(self.PREFIXES)
+
+
+class RequestIdFilter(logging.Filter):
+    """Tag records with the traced request they were logged from."""
+
+    def filter(self, record):
+        record.request_id = current_request_id() or "-"
+        return True
+
+
+class JSONLineFormatter(logging.Formatter):
+    """One compact JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LazyJSON:
+    """Serialize ``obj`` as compact JSON only if the record is actually emitted."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return json.dumps(self.obj, separators=(",", ":"), default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock handler formats every record on the logging thread. Here
+    records are queued with their arguments, so logged objects must not be
+    mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _file_handler(log_file: str, rotate: str, max_bytes: int, backup_count: int, when: str):
+    if rotate == "size":
+        return logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    if rotate == "time":
+        return logging.handlers.TimedRotatingFileHandler(log_file, when=when, backupCount=backup_count, encoding="utf-8", delay=True)
+    raise ValueError(f"rotate must be 'size' or 'time', got {rotate!r}")
+
+
+def configure_logging(log_file: str = "chat.log", level=logging.INFO, rotate: str = "size", max_bytes: int = 1024 * 1024, backup_count: int = 5, when: str = "midnight", json_lines: bool = False, console: bool = True):
+    """Route root logging through a queue to a background listener thread.
+
+    Records go to ``log_file`` (rotated by size or by time; None disables
+    the file) and optionally the console, as text or, with ``json_lines``,
+    one JSON object per line. Calling it again replaces the previous setup.
+    Returns the running QueueListener.
+    """
+    global _listener, _queue_handler
+    handlers = []
+    if log_file:
+        handlers.append(_file_handler(log_file, rotate, max_bytes, backup_count, when))
+    if console:
+        handlers.append(logging.StreamHandler())
+    formatter = JSONLineFormatter() if json_lines else logging.Formatter(TEXT_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    shutdown_logging()
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _DeferredQueueHandler(log_queue)
+    # Filters run on the calling thread, where the request context is still current
+    _queue_handler.addFilter(RequestIdFilter())
+    _queue_handler.addFilter(HTTPFilter())
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records, stop the listener and close its handlers."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,36 @@
+import contextvars
+import threading
+from collections import Counter
+
+_llm_calls = contextvars.ContextVar("llm_calls", default=None)
+
+
+class LLMCallCounter:
+    """Thread-safe count of LLM calls per pipeline stage for one request."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, stage: str):
+        with self._lock:
+            self._counts[stage] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["total"] = sum(counts.values())
+        return counts
+
+
+def start_llm_call_count() -> LLMCallCounter:
+    """Start counting LLM calls made from the current context (and threads/tasks it spawns)."""
+    counter = LLMCallCounter()
+    _llm_calls.set(counter)
+    return counter
+
+
+def record_llm_call(stage: str):
+    counter = _llm_calls.get()
+    if counter is not None:
+        counter.add(stage)
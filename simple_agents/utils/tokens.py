@@ -0,0 +1,11 @@
+import math
+
+# Rough average for English text with Llama/Gemma-style tokenizers.
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str) -> int:
+    """Cheap token estimate for budgeting prompts; no tokenizer needed."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from simple_agents.agents.greet.agent import GreetUserAgent
 from simple_agents.agents.greet.tools import GreetUserTool, ReverseNameTool
 
@@ -76,4 +77,55 @@ def test_greet_agent_multiple_steps(mock_chat, greet_agent):
     task = {"user_input": "Hello Alice and reverse my name"}
     result = greet_agent.run(task)
     assert "greeting" in result["results"][0]["output"]
-    assert "reversed_name" in result["results"][1]["output"] 
\ No newline at end of file
+    assert "reversed_name" in result["results"][1]["output"] 
+
+
+@patch('simple_agents.agents.greet.agent.achat', new_callable=AsyncMock)
+@patch('simple_agents.planner.llm_planner.achat', new_callable=AsyncMock)
+def test_greet_agent_arun(mock_planner_achat, mock_summary_achat, greet_agent):
+    """Test the async run method of the greet agent."""
+    mock_planner_achat.return_value.message.content = '{"steps": [{"tool_name": "name_backwards", "arguments": {"name": "Alice"}}]}'
+    mock_summary_achat.return_value.message.content = "Hi Alice, that's ecilA backwards!"
+
+    result = asyncio.run(greet_agent.arun({"user_input": "Reverse Alice"}))
+
+    assert result["results"][0]["output"] == {"reversed_name": "ecilA"}
+    assert result["summary"] == "Hi Alice, that's ecilA backwards!"
+
+@patch('simple_agents.agents.greet.agent.chat')
+@patch('simple_agents.planner.llm_planner.chat')
+def test_greet_agent_template_summary(mock_planner_chat, mock_summary_chat, greet_agent):
+    """Test that template summaries avoid the summarizer LLM call for deterministic tools."""
+    from simple_agents.base.summarization import SummaryPolicy
+    greet_agent.summary_policy = SummaryPolicy(agent_summaries="template")
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "John"}}, {"tool_name": "name_backwards", "arguments": {"name": "John"}}]}'
+
+    result = greet_agent.run({"user_input": "I'm John, reverse my name"})
+
+    assert result["summary"] == "Hello John! Your name backwards is nhoJ."
+    assert mock_summary_chat.call_count == 0
+
+@patch('simple_agents.agents.greet.agent.chat')
+@patch('simple_agents.planner.llm_planner.chat')
+def test_greet_agent_no_summary(mock_planner_chat, mock_summary_chat, greet_agent):
+    """Test that per-agent summaries can be skipped entirely."""
+    from simple_agents.base.summarization import SummaryPolicy
+    greet_agent.summary_policy = SummaryPolicy(agent_summaries="none")
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "John"}}]}'
+
+    result = greet_agent.run({"user_input": "I'm John"})
+
+    assert "summary" not in result
+    assert result["results"][0]["output"] == {"greeting": "Hello John!"}
+    assert mock_summary_chat.call_count == 0
+
+@patch('simple_agents.planner.llm_planner.chat')
+def test_invalid_preplanned_steps_fall_back_to_planner(mock_planner_chat, greet_agent):
+    """Test that steps naming unknown tools are discarded in favour of the agent's planner."""
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "John"}}]}'
+
+    greet_agent.receive_task({"user_input": "hi", "steps": [{"tool_name": "web_search", "arguments": {}}]})
+    greet_agent.plan()
+
+    assert greet_agent.state["steps"][0]["tool_name"] == "say_hello"
+    assert mock_planner_chat.call_count == 1
@@ -0,0 +1,113 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from simple_agents.agents.web_search.cache import SearchCache, default_ttl, normalize_query
+from simple_agents.agents.web_search.tools import WebSearchTool
+
+def test_normalize_query():
+    """Test that case, punctuation and spacing do not split cache entries."""
+    assert normalize_query("  Bitcoin   PRICE usd?! ") == "bitcoin price usd"
+
+def test_default_ttl():
+    """Test that 'current' queries expire quickly and factual ones last longer."""
+    assert default_ttl("bitcoin price usd") < default_ttl("capital of france")
+
+def test_cache_hit_and_miss():
+    """Test that a repeated query is served from memory."""
+    cache = SearchCache()
+    calls = []
+    fetch = lambda: calls.append(1) or ["result"]
+
+    assert cache.get_or_fetch("Bitcoin price", 3, fetch) == ["result"]
+    assert cache.get_or_fetch("bitcoin  price", 3, fetch) == ["result"]
+    assert cache.get_or_fetch("bitcoin price", 5, fetch) == ["result"]
+
+    assert len(calls) == 2  # Different max_results is a different key
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 2
+
+def test_cache_expiry_counts_stale():
+    """Test that an expired entry is refetched and counted as stale."""
+    cache = SearchCache(ttl_policy=lambda query: -1)
+    cache.get_or_fetch("q", 3, lambda: ["old"])
+    assert cache.get_or_fetch("q", 3, lambda: ["new"]) == ["new"]
+    assert cache.stats["stale"] == 1
+
+def test_cache_serves_stale_on_error():
+    """Test that a failed refresh falls back to the expired entry."""
+    cache = SearchCache(ttl_policy=lambda query: -1)
+    cache.get_or_fetch("q", 3, lambda: ["old"])
+
+    def failing_fetch():
+        raise RuntimeError("rate limited")
+
+    assert cache.get_or_fetch("q", 3, failing_fetch) == ["old"]
+    assert cache.stats["errors"] == 1
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("other", 3, failing_fetch)
+
+def test_cache_lru_eviction():
+    """Test that the in-memory level is bounded."""
+    cache = SearchCache(max_entries=2)
+    for query in ("a", "b", "c"):
+        cache.get_or_fetch(query, 3, lambda: [query])
+    assert len(cache._memory) == 2
+
+def test_cache_persists_to_sqlite(tmp_path):
+    """Test that entries survive a restart through the SQLite store."""
+    db_path = str(tmp_path / "search.sqlite")
+    cache = SearchCache(db_path=db_path)
+    cache.get_or_fetch("capital of france", 3, lambda: ["Paris"])
+    cache.close()
+
+    restarted = SearchCache(db_path=db_path)
+    assert restarted.get_or_fetch("capital of france", 3, lambda: ["wrong"]) == ["Paris"]
+    assert restarted.stats["disk_hits"] == 1
+
+def test_cache_single_flight():
+    """Test that concurrent identical queries share one fetch."""
+    cache = SearchCache()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return ["result"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("q", 3, slow_fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [["result"]] * 5
+    assert cache.stats["coalesced"] == 4
+
+@patch('simple_agents.agents.web_search.tools.DDGS')
+def test_web_search_tool_uses_cache(mock_ddgs):
+    """Test that WebSearchTool only opens a DDGS session on a cache miss."""
+    mock_ddgs.return_value.__enter__.return_value.text.return_value = [{"body": "First search result"}]
+    tool = WebSearchTool(cache=SearchCache())
+
+    assert tool.run({"query": "test query"}) == {"results": ["First search result"]}
+    assert tool.run({"query": "Test query"}) == {"results": ["First search result"]}
+    assert mock_ddgs.call_count == 1
+
+def test_cache_prunes_sqlite_rows(tmp_path):
+    """Test that long-expired rows are deleted and the disk level keeps only its newest rows."""
+    db_path = str(tmp_path / "search.sqlite")
+    cache = SearchCache(db_path=db_path, ttl_policy=lambda query: -10 if query == "old" else 60, keep_stale_for=5,
+                        max_disk_entries=3, prune_every=1)
+    for query in ("old", "a", "b", "c", "d"):
+        cache.get_or_fetch(query, 3, lambda: [query])
+
+    keys = [row[0] for row in cache._db.execute("SELECT key FROM search_cache ORDER BY rowid")]
+    assert keys == ["3:b", "3:c", "3:d"]
+    cache.close()
+
+    # A database that outgrew a smaller cap is trimmed when it is opened
+    reopened = SearchCache(db_path=db_path, max_disk_entries=1)
+    assert [row[0] for row in reopened._db.execute("SELECT key FROM search_cache")] == ["3:d"]
@@ -0,0 +1,33 @@
+from simple_agents.agents.web_search.ranking import bm25_scores, dedupe, normalize_url, rank, similarity
+
+
+def test_normalize_url():
+    """Test that scheme, www., tracking parameters and trailing slash are ignored, but real parameters are kept."""
+    assert normalize_url("https://www.Example.com/a/?utm_source=x&fbclid=1") == normalize_url("http://example.com/a") == "example.com/a"
+    assert normalize_url("https://youtube.com/watch?v=A") != normalize_url("https://youtube.com/watch?v=B")
+    assert normalize_url("https://shop.com/item.php?id=7&page=2&gclid=z") == normalize_url("https://shop.com/item.php?page=2&id=7")
+    assert normalize_url("https://shop.com/list?page=1") != normalize_url("https://shop.com/list?page=2")
+
+
+def test_dedupe_by_url_and_near_duplicate_text():
+    """Test that repeated pages and reworded copies of a snippet are dropped, keeping the first."""
+    results = [
+        {"href": "https://a.com/x", "body": "Bitcoin trades at 60,000 dollars today according to exchanges"},
+        {"href": "https://a.com/x/", "body": "Different text"},
+        {"href": "https://b.com", "body": "Bitcoin trades at 60,000 dollars today according to major exchanges"},
+        {"href": "https://c.com", "body": "Ethereum fell 3% overnight"},
+        {"body": "No URL at all"},
+    ]
+    assert [r["href"] for r in dedupe(results)[:2]] == ["https://a.com/x", "https://c.com"]
+    assert len(dedupe(results)) == 3
+    assert similarity("the cat sat on the mat", "") == 0.0
+
+
+def test_bm25_ranks_relevant_passages_first():
+    """Test that passages matching more (and rarer) query terms score higher, and ties keep search order."""
+    docs = ["Paris is the capital of France", "France borders Spain", "Berlin is in Germany"]
+    scores = bm25_scores("capital of France", docs)
+    assert scores[0] > scores[1] > scores[2] == 0
+    results = [{"body": d} for d in docs]
+    assert rank("capital of France", results, limit=2) == results[:2]
+    assert rank("unrelated", results) == results
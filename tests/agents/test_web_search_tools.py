@@ -57,4 +57,33 @@ def test_web_search_tool_max_results(mock_ddgs):
     result = tool.run({"query": "test query"})
     
     assert "results" in result
-    assert len(result["results"]) == 3  # Should be capped at 3 as per the tool implementation 
\ No newline at end of file
+    assert len(result["results"]) == 3  # Should be capped at 3 as per the tool implementation 
+
+
+@patch('simple_agents.agents.web_search.tools.DDGS')
+def test_web_search_tool_multiple_queries(mock_ddgs):
+    """Test that query variants share one DDGS session and come back de-duplicated and ranked."""
+    pages = {
+        "tokyo weather": [{"title": "Tokyo forecast", "href": "https://www.weather.com/tokyo/", "body": "Tokyo weather today: sunny, 25C"},
+                          {"title": "Travel", "href": "https://travel.com/tokyo", "body": "Things to do in Tokyo"}],
+        "tokyo temperature now": [{"title": "Tokyo forecast", "href": "http://weather.com/tokyo", "body": "Tokyo weather today: sunny, 25C"},
+                                  {"title": "Live", "href": "https://live.jp/t", "body": "Current temperature in Tokyo is 25C, weather sunny"}],
+    }
+    mock_ddgs.return_value.__enter__.return_value.text.side_effect = lambda query, max_results: pages[query]
+
+    tool = WebSearchTool(max_passages=2)
+    result = tool.run({"queries": ["tokyo weather", "tokyo temperature now"], "rank_query": "current Tokyo weather"})
+
+    assert mock_ddgs.call_count == 1
+    assert mock_ddgs.return_value.__enter__.return_value.text.call_count == 2
+    assert result == {"results": ["Current temperature in Tokyo is 25C, weather sunny", "Tokyo weather today: sunny, 25C"]}
+
+def test_web_search_tool_arguments_schema():
+    """Test that a step may pass one query or a short list of queries, but not both."""
+    from simple_agents.base.validation import validate_tool_arguments
+    schema = WebSearchTool.args_schema
+    validate_tool_arguments("web_search", schema, {"query": "tokyo weather"})
+    validate_tool_arguments("web_search", schema, {"queries": ["tokyo weather", "tokyo forecast"]})
+    for arguments in ({"queries": ["q"] * 5}, {"queries": []}, {"query": "a", "queries": ["b"]}):
+        with pytest.raises(ValueError):
+            validate_tool_arguments("web_search", schema, arguments)
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+import pytest
+from simple_agents.base.base_agent import BaseAgent
+from simple_agents.base.base_tool import BaseTool
+
+class SleepTool(BaseTool):
+    concurrent_safe = True
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def run(self, input_data: dict) -> dict:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(input_data.get("seconds", 0))
+        with self.lock:
+            self.active -= 1
+        return {"slept": input_data.get("seconds", 0)}
+
+class SerialSleepTool(SleepTool):
+    concurrent_safe = False
+
+def make_agent(**kwargs):
+    return BaseAgent("TestAgent", tools={"sleep": SleepTool(), "serial_sleep": SerialSleepTool()}, **kwargs)
+
+def steps(tool_name, *durations):
+    return [{"tool_name": tool_name, "arguments": {"seconds": d}} for d in durations]
+
+def test_execute_steps_keeps_plan_order():
+    """Test that results come back in plan order even if later steps finish first."""
+    agent = make_agent()
+    results = agent.execute_steps(steps("sleep", 0.05, 0.01, 0.0))
+    assert [r["output"]["slept"] for r in results] == [0.05, 0.01, 0.0]
+    assert results[0] == {"tool": "sleep", "input": {"seconds": 0.05}, "output": {"slept": 0.05}}
+
+def test_execute_steps_runs_concurrent_safe_tools_in_parallel():
+    """Test that concurrent-safe steps overlap, bounded by max_workers."""
+    agent = make_agent(max_workers=2)
+    agent.execute_steps(steps("sleep", 0.05, 0.05, 0.05))
+    assert agent.tools["sleep"].max_active == 2
+
+def test_execute_steps_serializes_unsafe_tools():
+    """Test that tools not marked concurrent_safe never overlap with each other."""
+    agent = make_agent(max_workers=4)
+    results = agent.execute_steps(steps("serial_sleep", 0.02, 0.02) + steps("sleep", 0.02, 0.02))
+    assert agent.tools["serial_sleep"].max_active == 1
+    assert len(results) == 4
+
+def test_execute_steps_timeout():
+    """Test that a slow step gets an error output instead of blocking the agent."""
+    agent = make_agent(step_timeout=0.05)
+    start = time.monotonic()
+    results = agent.execute_steps(steps("sleep", 0.5, 0.0))
+    assert time.monotonic() - start < 0.4
+    assert "timed out" in results[0]["output"]["error"]
+    assert results[1]["output"] == {"slept": 0.0}
+
+def test_execute_steps_unknown_tool():
+    """Test that an unknown tool fails before anything runs."""
+    agent = make_agent()
+    with pytest.raises(ValueError, match="Tool 'missing' not found."):
+        agent.execute_steps([{"tool_name": "missing", "arguments": {}}])
+
+def test_aexecute_steps_order_and_timeout():
+    """Test the async step executor keeps order and applies timeouts."""
+    # Leave headroom over the short step so a GC pause under coverage can't time it out
+    agent = make_agent(step_timeout=0.2)
+    results = asyncio.run(agent.aexecute_steps(steps("sleep", 0.02, 0.5) + steps("serial_sleep", 0.0)))
+    assert results[0]["output"] == {"slept": 0.02}
+    assert "timed out" in results[1]["output"]["error"]
+    assert results[2]["output"] == {"slept": 0.0}
+
+class EchoAgent(BaseAgent):
+    """Plans one sleep step from the task and echoes the task back."""
+
+    def plan(self):
+        self.state["steps"] = steps("sleep", self.task["seconds"])
+
+    def execute(self):
+        results = self.execute_steps(self.state["steps"])
+        return {"user_input": self.task["user_input"], "slept": results[0]["output"]["slept"]}
+
+def test_concurrent_runs_keep_separate_state():
+    """Test that overlapping runs of one agent instance do not see each other's task or steps."""
+    agent = EchoAgent("EchoAgent", tools={"sleep": SleepTool()})
+    results = {}
+
+    def run(i):
+        results[i] = agent.run({"user_input": f"request {i}", "seconds": 0.01 * (i % 3)})
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {i: {"user_input": f"request {i}", "slept": 0.01 * (i % 3)} for i in range(8)}
+    assert agent.tools["sleep"].max_active > 1
+    assert agent.task is None  # Runs leave the instance-level context untouched
+
+def test_concurrent_aruns_keep_separate_state():
+    """Test that overlapping async runs of one agent keep separate contexts."""
+    agent = EchoAgent("EchoAgent", tools={"sleep": SleepTool()})
+
+    async def main():
+        return await asyncio.gather(*(agent.arun({"user_input": f"request {i}", "seconds": 0.01}) for i in range(4)))
+
+    assert [r["user_input"] for r in asyncio.run(main())] == [f"request {i}" for i in range(4)]
@@ -0,0 +1,52 @@
+from simple_agents.base.rendering import ResultRenderer, compact_json, shorten
+from simple_agents.utils.tokens import count_tokens
+
+SEARCH = {"tool": "web_search", "input": {"query": "tokyo weather"}, "output": {"results": ["Sunny, 25C " * 40, "Rain later"]}}
+GREET = {"tool": "say_hello", "input": {"name": "Al"}, "output": {"greeting": "Hello, Al!"}}
+
+
+def test_compact_json_is_deterministic():
+    """Test that key order and whitespace don't change the rendering."""
+    assert compact_json({"b": 1, "a": [1, "é"]}) == compact_json({"a": [1, "é"], "b": 1}) == '{"a":[1,"é"],"b":1}'
+    assert shorten({"a": ["abcdef", 3]}, 4) == {"a": ["abc…", 3]}
+
+
+def test_tool_results_keep_a_compact_input():
+    """Test that each tool result is one line with the step's input and output as compact JSON."""
+    text = ResultRenderer().tool_results([GREET, {"tool": "get_time", "input": {}, "output": {"time": "noon"}}])
+    assert text == 'say_hello {"name":"Al"}: {"greeting":"Hello, Al!"}\nget_time: {"time":"noon"}'
+
+
+def test_agent_results_fit_the_stage_budget():
+    """Test that raw output of summarized agents goes first, then long strings are cut, then the text."""
+    agent_results = [
+        {"agent": "WebSearchAgent", "results": [SEARCH], "summary": "It's sunny in Tokyo."},
+        {"agent": "GreeterAgent", "results": [GREET]},
+        {"error": "Error running translate: boom"},
+    ]
+    full = ResultRenderer(budgets={"formatter": None}).agent_results(agent_results)
+    assert full.startswith("## WebSearchAgent\nsummary: It's sunny in Tokyo.\nweb_search {\"query\":\"tokyo weather\"}:")
+    assert "## Agent\nerror: Error running translate: boom" in full
+
+    fitted = ResultRenderer(budgets={"formatter": 40}).agent_results(agent_results)
+    assert count_tokens(fitted) <= 40
+    assert "web_search" not in fitted and 'say_hello {"name":"Al"}: {"greeting":"Hello, Al!"}' in fitted
+
+    search_only = [{"agent": "WebSearchAgent", "results": [SEARCH]}]
+    shortened = ResultRenderer(budgets={"formatter": 60}).agent_results(search_only)
+    assert "…" in shortened and "Rain later" in shortened and count_tokens(shortened) <= 60
+    assert count_tokens(ResultRenderer(budgets={"formatter": 5}).agent_results(search_only)) <= 5
+
+
+def test_formatter_and_summarizer_prompts_use_the_renderer():
+    """Test that the coordinator and agents embed the compact rendering instead of indented JSON or a repr."""
+    from simple_agents.coordinator_assistant import CoordinatorAssistant
+    coordinator = CoordinatorAssistant(renderer=ResultRenderer(budgets={"summarizer": 10}))
+    prompt = coordinator._formatter_messages([{"agent": "GreeterAgent", "results": [GREET]}], "hi")[1]["content"]
+    assert 'say_hello {"name":"Al"}: {"greeting":"Hello, Al!"}' in prompt and '"input"' not in prompt
+    websearch = coordinator.agents["websearch"]
+    websearch.task = {"user_input": "Weather in Tokyo?", "task": "Find today's weather in Tokyo"}
+    summary_prompt = websearch._summary_messages([SEARCH])[1]["content"]
+    assert "Query: Find today's weather in Tokyo" in summary_prompt
+    assert 'web_search {"query":"tokyo weather"}: ' in summary_prompt and "'input'" not in summary_prompt
+    assert coordinator.agents["websearch"].renderer is coordinator.renderer
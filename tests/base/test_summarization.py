@@ -0,0 +1,20 @@
+import pytest
+from simple_agents.base.summarization import SummaryPolicy
+
+def test_summary_policy_rejects_unknown_mode():
+    """Test that a typo in the mode fails early."""
+    with pytest.raises(ValueError, match="agent_summaries must be one of"):
+        SummaryPolicy(agent_summaries="fast")
+
+def test_direct_reply_single_agent():
+    """Test that a single successful agent summary is returned directly when enabled."""
+    policy = SummaryPolicy(direct_single_agent=True)
+    assert policy.direct_reply([{"agent": "GreeterAgent", "summary": "Hello Bob!"}]) == "Hello Bob!"
+
+def test_direct_reply_requires_single_successful_summary():
+    """Test that the formatter is still used for errors, several agents or missing summaries."""
+    policy = SummaryPolicy(direct_single_agent=True)
+    assert policy.direct_reply([{"error": "boom"}]) is None
+    assert policy.direct_reply([{"summary": "a"}, {"summary": "b"}]) is None
+    assert policy.direct_reply([{"agent": "GreeterAgent", "results": []}]) is None
+    assert SummaryPolicy().direct_reply([{"summary": "a"}]) is None
@@ -1,5 +1,9 @@
 import pytest
-from simple_agents.base.validation import validate_tool_plan
+from unittest.mock import patch
+from simple_agents.agents.greet.tools import GreetUserTool, ReverseNameTool
+from simple_agents.base.validation import (
+    plan_schema, routing_schema, validate_against_schema, validate_tool_arguments, validate_tool_plan
+)
 
 def test_validate_tool_plan_valid():
     """Test validation of a valid tool plan."""
@@ -71,4 +75,75 @@ def test_validate_tool_plan_empty_steps():
     """Test validation of a plan with empty steps list."""
     plan = {"steps": []}
     # Should not raise any exception
-    validate_tool_plan(plan) 
\ No newline at end of file
+    validate_tool_plan(plan) 
+
+def test_validate_against_schema():
+    """Test the supported JSON Schema keywords and error paths."""
+    schema = {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "minLength": 1},
+            "limit": {"type": "integer", "minimum": 1},
+            "tags": {"type": "array", "items": {"enum": ["a", "b"]}},
+        },
+        "required": ["query"],
+        "additionalProperties": False,
+    }
+    validate_against_schema({"query": "x", "limit": 2, "tags": ["a"]}, schema)
+    for value, message in [
+        ({}, "missing required field 'query'"),
+        ({"query": ""}, r"\$.query must be at least 1"),
+        ({"query": "x", "limit": True}, r"\$.limit must be of type integer"),
+        ({"query": "x", "tags": ["c"]}, r"\$.tags\[0\] must be one of"),
+        ({"query": "x", "extra": 1}, "unexpected field 'extra'"),
+    ]:
+        with pytest.raises(ValueError, match=message):
+            validate_against_schema(value, schema)
+
+def test_validate_tool_arguments():
+    """Test that tool arguments are checked against the tool's schema."""
+    validate_tool_arguments("name_backwards", ReverseNameTool.args_schema, {"name": "Bob"})
+    validate_tool_arguments("untyped", None, {"anything": 1})
+    with pytest.raises(ValueError, match="Invalid arguments for tool 'name_backwards'"):
+        validate_tool_arguments("name_backwards", ReverseNameTool.args_schema, {"nme": "Bob"})
+
+def test_plan_schema_only_allows_known_tools():
+    """Test that the generated plan schema pins tool names to their own argument schemas."""
+    schema = plan_schema({"say_hello": GreetUserTool(), "name_backwards": ReverseNameTool()})
+    validate_against_schema({"steps": [{"tool_name": "say_hello", "arguments": {}}, {"tool_name": "name_backwards", "arguments": {"name": "Al"}}]}, schema)
+    with pytest.raises(ValueError, match="none of the allowed forms"):
+        validate_against_schema({"steps": [{"tool_name": "web_search", "arguments": {"query": "x"}}]}, schema)
+    with pytest.raises(ValueError, match="none of the allowed forms"):
+        validate_against_schema({"steps": [{"tool_name": "name_backwards", "arguments": {}}]}, schema)
+
+def test_routing_schema_combined_mode(coordinator):
+    """Test that combined-mode routing schemas restrict steps to each agent's own tools."""
+    agent_tools = {name: coordinator.agents[name].tools for name in coordinator.agents}
+    schema = routing_schema(agent_tools, with_steps=True)
+    valid = {"agents": [{"agent": "greet", "task": "t", "steps": [{"tool_name": "say_hello", "arguments": {"name": "A"}}], "depends_on": []}]}
+    validate_against_schema(valid, schema)
+    invalid = {"agents": [{"agent": "greet", "task": "t", "steps": [{"tool_name": "web_search", "arguments": {"query": "x"}}]}]}
+    with pytest.raises(ValueError):
+        validate_against_schema(invalid, schema)
+    assert "steps" not in routing_schema(agent_tools)["properties"]["agents"]["items"]["anyOf"][0]["properties"]
+
+@patch('simple_agents.planner.llm_planner.chat')
+@patch('simple_agents.coordinator_assistant.chat')
+def test_schemas_are_sent_as_format(mock_chat, mock_planner_chat, coordinator):
+    """Test that the router and planners pass their schemas as Ollama's format."""
+    mock_chat.return_value.message.content = '{"agents": []}'
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "web_search", "arguments": {"query": "x"}}]}'
+    coordinator.route("hi")
+    coordinator.agents["websearch"].planner.plan("x")
+    assert mock_chat.call_args.kwargs["format"]["required"] == ["agents"]
+    assert mock_planner_chat.call_args.kwargs["format"]["properties"]["steps"]["items"]["anyOf"][0]["properties"]["tool_name"] == {"type": "string", "enum": ["web_search"]}
+
+def test_execute_rejects_invalid_arguments_before_running(greet_agent):
+    """Test that steps with arguments violating the tool schema fail before any tool runs."""
+    with patch.object(GreetUserTool, "run") as run:
+        with pytest.raises(ValueError, match="Invalid arguments for tool 'name_backwards'"):
+            greet_agent.execute_steps([
+                {"tool_name": "say_hello", "arguments": {"name": "A"}},
+                {"tool_name": "name_backwards", "arguments": {"name": 5}}
+            ])
+    run.assert_not_called()
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.llm.client import LLMClient, chat_with
+from simple_agents.utils.metrics import start_llm_call_count
+
+def test_options_for_merges_global_stage_and_call_options():
+    """Test that per-stage profiles layer over global options and under per-call ones."""
+    llm = LLMClient(options={"num_ctx": 4096, "temperature": 0.7}, stage_options={"router": {"num_predict": 128}})
+    assert llm.options_for("router") == {"num_ctx": 4096, "temperature": 0, "num_predict": 128}
+    assert llm.options_for("formatter", {"num_predict": 50}) == {"num_ctx": 4096, "temperature": 0.7, "num_predict": 50}
+    assert llm.options_for("unknown") == {"num_ctx": 4096, "temperature": 0.7}
+
+def test_chat_sends_keep_alive_and_stage_options():
+    """Test that every call carries keep_alive and the stage's options through the shared client."""
+    llm = LLMClient(host="http://ollama:11434", keep_alive="1h")
+    llm._client = MagicMock()
+
+    llm.chat("planner", "gemma3:4b", [{"role": "user", "content": "hi"}])
+    llm.chat("formatter", "gemma3:4b", [], stream=True)
+
+    first, second = llm._client.chat.call_args_list
+    assert first.args[0] == "gemma3:4b"
+    assert first.kwargs["keep_alive"] == "1h"
+    assert first.kwargs["options"]["num_predict"] == 256
+    assert second.kwargs["stream"] is True
+    assert second.kwargs["options"]["num_predict"] == 1024
+
+def test_achat_reuses_async_client_per_loop():
+    """Test that async calls share one AsyncClient within an event loop."""
+    llm = LLMClient()
+
+    async def call_twice():
+        with patch('simple_agents.llm.client.AsyncClient') as mock_async_client:
+            mock_async_client.return_value.chat = AsyncMock(return_value="ok")
+            await llm.achat("router", "gemma3:4b", [])
+            await llm.achat("router", "gemma3:4b", [])
+            return mock_async_client.call_count
+
+    assert asyncio.run(call_twice()) == 1
+
+def test_chat_with_counts_and_falls_back_to_default_chat():
+    """Test that chat_with records the stage and uses the module chat without a client."""
+    counter = start_llm_call_count()
+    default_chat = MagicMock(return_value="response")
+
+    assert chat_with(None, "router", "gemma3:4b", [], default_chat) == "response"
+    default_chat.assert_called_once_with("gemma3:4b", [])
+    assert counter.as_dict() == {"router": 1, "total": 1}
+
+def test_coordinator_passes_client_to_planners_and_agents():
+    """Test that one injected client is shared by the whole pipeline."""
+    llm = LLMClient()
+    coordinator = CoordinatorAssistant(llm=llm)
+    for agent in coordinator.agents.values():
+        assert agent.llm is llm
+        assert agent.planner.llm is llm
+
+def test_coordinator_routes_through_client():
+    """Test that the router call goes through the injected client with the router stage."""
+    llm = MagicMock()
+    llm.chat.return_value.message.content = '{"agents": [{"agent": "greet", "task": "Greet"}]}'
+    coordinator = CoordinatorAssistant(llm=llm)
+
+    assert coordinator.route("hello")[0]["agent"] == "greet"
+    assert llm.chat.call_args.args[0] == "router"
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from simple_agents.llm.client import LLMClient
+from simple_agents.llm.limiter import FairLimiter
+
+def test_limit_and_fifo_order_across_threads():
+    """Test that at most `limit` threads hold a slot and waiters are served in arrival order."""
+    limiter = FairLimiter(1)
+    order = []
+    limiter.acquire()
+
+    def worker(i):
+        with limiter.slot():
+            order.append(i)
+
+    threads = []
+    for i in range(5):
+        thread = threading.Thread(target=worker, args=(i,))
+        thread.start()
+        threads.append(thread)
+        while limiter.queued < i + 1:  # Make arrival order deterministic
+            time.sleep(0.001)
+    limiter.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == [0, 1, 2, 3, 4]
+    assert limiter.active == 0
+    assert limiter.stats["queued"] == 5 and limiter.stats["max_queue"] == 5
+
+def test_async_waiters_share_the_queue_with_threads():
+    """Test that coroutines and threads wait in one queue under one limit."""
+    limiter = FairLimiter(2)
+    lock = threading.Lock()
+    active, peak = 0, 0
+
+    def enter():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+
+    def leave():
+        nonlocal active
+        with lock:
+            active -= 1
+
+    async def job():
+        async with limiter.aslot():
+            enter()
+            await asyncio.sleep(0.01)
+            leave()
+
+    def thread_job():
+        with limiter.slot():
+            enter()
+            time.sleep(0.01)
+            leave()
+
+    async def main():
+        await asyncio.gather(*(job() for _ in range(4)), *(asyncio.to_thread(thread_job) for _ in range(4)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.active == 0 and limiter.stats["acquired"] == 8
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    """Test that cancelling a queued coroutine leaves the slot count intact."""
+    limiter = FairLimiter(1)
+
+    async def main():
+        await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+    asyncio.run(main())
+    assert limiter.active == 0 and limiter.queued == 0
+
+def test_invalid_limit():
+    """Test that a limit below one is rejected."""
+    with pytest.raises(ValueError, match="limit"):
+        FairLimiter(0)
+
+def test_llm_client_streams_hold_their_slot():
+    """Test that a streamed call keeps its slot until the stream is consumed."""
+    llm = LLMClient(max_concurrency=1)
+    llm._client = MagicMock()
+    llm._client.chat.return_value = iter(["a", "b"])
+
+    stream = llm.chat("formatter", "gemma3:4b", [], stream=True)
+    assert llm.limiter.active == 1
+    assert list(stream) == ["a", "b"]
+    assert llm.limiter.active == 0
+
+    llm.chat("router", "gemma3:4b", [])
+    assert llm.limiter.active == 0
+
+def test_llm_client_streams_release_their_slot_when_abandoned():
+    """Test that a stream which is closed or dropped before being iterated gives its slot back."""
+    llm = LLMClient(max_concurrency=1)
+    llm._client = MagicMock()
+    llm._client.chat.side_effect = lambda *args, **kwargs: iter(["a", "b"])
+
+    llm.chat("formatter", "gemma3:4b", [], stream=True).close()
+    assert llm.limiter.active == 0
+
+    stream = llm.chat("formatter", "gemma3:4b", [], stream=True)
+    assert llm.limiter.active == 1
+    del stream
+    assert llm.limiter.active == 0
+
+    async def chunks():
+        yield "a"
+
+    async def abandon_async_stream():
+        llm._async_client = MagicMock(return_value=MagicMock(chat=MagicMock(side_effect=lambda *a, **k: asyncio.sleep(0, chunks()))))
+        await (await llm.achat("formatter", "gemma3:4b", [], stream=True)).aclose()
+        assert llm.limiter.active == 0
+        assert [c async for c in await llm.achat("formatter", "gemma3:4b", [], stream=True)] == ["a"]
+        assert llm.limiter.active == 0
+
+    asyncio.run(abandon_async_stream())
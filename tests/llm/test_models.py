@@ -0,0 +1,72 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.llm.client import LLMClient, chat_with
+from simple_agents.llm.models import AdaptiveModelPolicy, StageModels, parse_stage_models
+
+
+def test_stage_models_resolve_agent_then_stage_then_default():
+    """Test that agent overrides win over stage models, which win over the default."""
+    models = StageModels("big", parse_stage_models("planner=small, summarizer:websearch=tiny"))
+    assert models.model_for("router") == "big"
+    assert models.model_for("planner", "greet") == "small"
+    assert models.model_for("summarizer", "websearch") == "tiny"
+    assert models.model_for("summarizer", "greet") == "big"
+    assert models.models() == ["big", "small", "tiny"]
+    with pytest.raises(ValueError):
+        StageModels("big", {"planer": "small"})
+    with pytest.raises(ValueError):
+        parse_stage_models("planner")
+
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_coordinator_hands_each_stage_its_model(mock_chat):
+    """Test that the router, planners and summarizers use their stage's model, not a hard-coded one."""
+    mock_chat.return_value.message.content = '{"agents": [{"agent": "greet", "task": "Greet"}]}'
+    coordinator = CoordinatorAssistant(models=StageModels("big", {"router": "small", "planner": "small", "summarizer:websearch": "tiny"}))
+
+    coordinator.route("hello")
+    assert mock_chat.call_args.args[0] == "small"
+    assert coordinator.agents["greet"].planner.model == "small"
+    assert coordinator.agents["greet"].model_name == "big"
+    assert coordinator.agents["websearch"].model_name == "tiny"
+    # A plain model reaches the agents' summarizers too
+    assert CoordinatorAssistant(model="llama3.2:3b").agents["websearch"].model_name == "llama3.2:3b"
+
+
+def test_adaptive_policy_falls_back_while_slow_and_retries_later():
+    """Test that a stage moves down the fallback chain once its average latency passes the threshold."""
+    policy = AdaptiveModelPolicy({"formatter": 1.0}, {"big": "small", "small": "tiny"}, alpha=0.5, min_samples=2, retry_after=60)
+    policy.observe("formatter", "big", 3.0)
+    assert policy.select("formatter", "big") == "big"  # one sample is not enough
+    policy.observe("formatter", "big", 2.0)
+    assert policy.select("formatter", "big") == "small"
+    assert policy.select("router", "big") == "big"  # other stages are unaffected
+    for _ in range(2):
+        policy.observe("formatter", "small", 1.5)
+    assert policy.select("formatter", "big") == "tiny"
+    assert policy.demoted() == {("formatter", "big"): "small", ("formatter", "small"): "tiny"}
+
+    policy.retry_after = 0
+    assert policy.select("formatter", "big") == "big"
+    policy.observe("formatter", "big", 0.2)  # The retry was fast: keep it
+    assert policy.select("formatter", "big") == "big"
+    assert policy.latency("formatter", "big") == 0.2
+
+
+def test_client_policy_swaps_model_and_measures_calls():
+    """Test that chat_with sends the policy's model and reports each call's latency to it."""
+    policy = AdaptiveModelPolicy({"summarizer": 0.01}, {"big": "small"}, min_samples=1)
+    llm = LLMClient(model_policy=policy)
+    llm._client = MagicMock()
+    llm._client.chat.side_effect = lambda *a, **k: time.sleep(0.02)
+
+    chat_with(llm, "summarizer", "big", [], None)
+    chat_with(llm, "summarizer", "big", [], None)
+
+    assert [c.args[0] for c in llm._client.chat.call_args_list] == ["big", "small"]
+    assert policy.latency("summarizer", "big") >= 0.02
+    assert policy.latency("summarizer", "small") >= 0.02
@@ -0,0 +1,90 @@
+import time
+from unittest.mock import MagicMock, patch
+
+from simple_agents.coordinator_assistant import FORMATTER_PROMPT, CoordinatorAssistant
+from simple_agents.llm.client import LLMClient
+from simple_agents.llm.models import AdaptiveModelPolicy
+from simple_agents.llm.warmup import KeepAlive, WarmUpTarget, warm_up
+
+
+def test_warm_up_prefills_each_distinct_prompt_once():
+    """Test that warm-up sends one single-token request per model/prompt pair and reports load times."""
+    default_chat = MagicMock()
+    default_chat.return_value.load_duration = 1_500_000_000
+    default_chat.return_value.prompt_eval_count = 42
+    targets = [WarmUpTarget("router", "m1", "route"), WarmUpTarget("planner", "m1", "route"), WarmUpTarget("formatter", "m2", "format")]
+
+    results = warm_up(targets, default_chat=default_chat)
+
+    assert [(r["stage"], r["model"]) for r in results] == [("router", "m1"), ("formatter", "m2")]
+    assert results[0]["load_s"] == 1.5 and results[0]["prompt_tokens"] == 42
+    first = default_chat.call_args_list[0]
+    assert first.args == ("m1", [{"role": "system", "content": "route"}])
+    assert first.kwargs["options"] == {"num_predict": 1}
+
+
+def test_warm_up_reports_failures_without_raising():
+    """Test that an unreachable model is reported in the results instead of failing startup."""
+    default_chat = MagicMock(side_effect=ConnectionError("refused"))
+    results = warm_up([WarmUpTarget("router", "m1", "p")], default_chat=default_chat)
+    assert results[0]["error"] == "refused"
+
+
+def test_keep_alive_pings_only_when_idle():
+    """Test that keep-alive pings each model while idle and skips while traffic is recent."""
+    default_chat = MagicMock()
+    last = [None]
+    keep_alive = KeepAlive(["m1", "m2", "m1"], interval=60, default_chat=default_chat, last_activity=lambda: last[0])
+    assert keep_alive.idle()
+    keep_alive.ping()
+    assert [c.args for c in default_chat.call_args_list] == [("m1", []), ("m2", [])]
+    last[0] = time.monotonic()
+    assert not keep_alive.idle()
+
+
+def test_keep_alive_thread_uses_client_activity():
+    """Test that the background thread pings through the shared client and stops cleanly."""
+    llm = LLMClient()
+    llm._client = MagicMock()
+    keep_alive = KeepAlive(["m1"], interval=0.01, llm=llm).start()
+    deadline = time.monotonic() + 2
+    while keep_alive.pings < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    keep_alive.stop()
+    assert keep_alive.pings >= 2
+    assert llm._client.chat.call_args.kwargs["keep_alive"] == "30m"
+    assert "background" not in llm._client.chat.call_args.kwargs
+    assert llm.last_request_at is None  # Pings aren't traffic, or they would suppress the next ones
+
+
+def test_background_calls_bypass_the_model_policy():
+    """Test that warm-up and keep-alive calls neither feed nor follow the adaptive model policy."""
+    policy = AdaptiveModelPolicy({"router": 0.01}, {"big": "small"}, min_samples=1)
+    policy.observe("router", "big", 1.0)  # Demoted: real router calls now go to "small"
+    llm = LLMClient(model_policy=policy)
+    llm._client = MagicMock()
+
+    results = warm_up([WarmUpTarget("router", "big", "route")], llm=llm)
+    KeepAlive(["big"], llm=llm).ping()
+
+    assert "error" not in results[0]
+    assert [c.args[0] for c in llm._client.chat.call_args_list] == ["big", "big"]
+    assert policy.latency("router", "big") == 1.0 and policy.latency("keep_alive", "big") is None
+    assert llm.last_request_at is None
+
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_coordinator_warm_up_covers_every_stage(mock_chat):
+    """Test that the coordinator warms the router, formatter, planners and agent summarizers."""
+    coordinator = CoordinatorAssistant(model="gemma3:4b")
+    results = coordinator.warm_up(extra_targets=[WarmUpTarget("history", "gemma3:4b", "history prompt")], keep_alive_interval=3600)
+    try:
+        stages = [r["stage"] for r in results]
+        assert stages == ["router", "formatter", "planner", "summarizer", "planner", "summarizer", "history"]
+        prompts = [c.args[1][0]["content"] for c in mock_chat.call_args_list]
+        assert prompts[0].startswith("\nYou are a smart routing agent.")
+        assert prompts[1] == FORMATTER_PROMPT
+        assert coordinator.keep_alive is not None and coordinator.keep_alive.models == ["gemma3:4b"]
+    finally:
+        coordinator.stop_keep_alive()
+    assert coordinator.keep_alive is None
@@ -0,0 +1,33 @@
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+from simple_agents.planner.llm_planner import LLMPlanner
+
+@patch('simple_agents.planner.llm_planner.chat')
+def test_plan_parses_json(mock_chat):
+    """Test that the planner returns the parsed plan."""
+    mock_chat.return_value.message.content = '```json\n{"steps": []}\n```'
+
+    planner = LLMPlanner(model="gemma3:4b", system_prompt="plan")
+    assert planner.plan("hello") == {"steps": []}
+
+@patch('simple_agents.planner.llm_planner.chat')
+def test_plan_invalid_json(mock_chat):
+    """Test that unparseable planner output raises ValueError."""
+    mock_chat.return_value.message.content = "not json"
+
+    planner = LLMPlanner(model="gemma3:4b", system_prompt="plan")
+    with pytest.raises(ValueError, match="Planner failed to parse JSON"):
+        planner.plan("hello")
+
+@patch('simple_agents.planner.llm_planner.achat', new_callable=AsyncMock)
+def test_aplan_parses_json(mock_achat):
+    """Test that the async planner awaits the LLM and parses the plan."""
+    mock_achat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "Bob"}}]}'
+
+    planner = LLMPlanner(model="gemma3:4b", system_prompt="plan")
+    plan = asyncio.run(planner.aplan("hi I'm Bob"))
+
+    assert plan["steps"][0]["arguments"]["name"] == "Bob"
+    messages = mock_achat.call_args.args[1]
+    assert messages[0] == {"role": "system", "content": "plan"}
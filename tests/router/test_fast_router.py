@@ -0,0 +1,94 @@
+import json
+import pytest
+from simple_agents.router.fast_router import (
+    FastRouter, NGramClassifier, RuleClassifier, build_assignment, latest_user_message
+)
+
+def test_latest_user_message():
+    """Test that only the latest user turn of a joined prompt is classified."""
+    prompt = "User: hi, I'm Bob\nAssistant: Hello Bob!\nUser: what's the weather in Tokyo?"
+    assert latest_user_message(prompt) == "what's the weather in Tokyo?"
+    assert latest_user_message("  plain text ") == "plain text"
+
+def test_rule_classifier_greeting():
+    """Test that a greeting with a name routes to the greet agent."""
+    agents, confidence = RuleClassifier().classify("hi, I'm Bob")
+    assert agents == ["greet"]
+    assert confidence >= 0.9
+
+def test_rule_classifier_search():
+    """Test that an obvious real-time question routes to web search."""
+    agents, confidence = RuleClassifier().classify("what's the weather in Tokyo")
+    assert agents == ["websearch"]
+    assert confidence >= 0.9
+
+def test_rule_classifier_mixed():
+    """Test that mixed traffic routes to both agents."""
+    agents, _ = RuleClassifier().classify("what is the price of bitcoin? btw my name is John, I would like to know my name backwards")
+    assert agents == ["greet", "websearch"]
+
+def test_rule_classifier_unknown():
+    """Test that text matching no rule has zero confidence."""
+    assert RuleClassifier().classify("tell me a story") == ([], 0.0)
+
+def test_build_greet_assignment():
+    """Test that the greet assignment has the LLM router's structure."""
+    assignment = build_assignment("greet", "my name is John, what's my name backwards")
+    assert assignment["agent"] == "greet"
+    assert assignment["context"]["relevant_info"] == "User's name is John"
+    assert assignment["context"]["required_tools"] == ["say_hello", "name_backwards"]
+
+def test_ngram_classifier():
+    """Test that the n-gram model learns from logged routing decisions."""
+    classifier = NGramClassifier().fit([
+        ("tell me a joke about cats", ["greet"]),
+        ("tell me a joke please", ["greet"]),
+        ("bitcoin market cap now", ["websearch"]),
+        ("ethereum market cap today", ["websearch"]),
+    ])
+    agents, confidence = classifier.classify("solana market cap")
+    assert agents == ["websearch"]
+    assert confidence > 0.5
+    assert NGramClassifier().classify("anything") == ([], 0.0)
+
+def test_fast_router_counts_and_fallback():
+    """Test that the router counts fast-path hits and falls back below the threshold."""
+    router = FastRouter()
+    assert router.route("User: hello, my name is Alice")[0]["agent"] == "greet"
+    assert router.route("User: tell me a story") is None
+    assert router.stats == {"requests": 2, "fast_path": 1, "fallback": 1}
+    assert router.fast_path_rate() == 0.5
+
+def test_fast_router_ignores_unknown_agents():
+    """Test that classifiers cannot route to agents the coordinator does not have."""
+    router = FastRouter(known_agents=["websearch"])
+    assert router.route("hi, I'm Bob") is None
+
+def test_fast_router_records_routing_log(tmp_path):
+    """Test that LLM decisions are logged and can train an NGramClassifier."""
+    log = tmp_path / "routing.jsonl"
+    router = FastRouter(routing_log=str(log))
+    router.record("User: stock of tesla", [{"agent": "websearch", "task": "search"}])
+    assert json.loads(log.read_text())["input"] == "stock of tesla"
+    classifier = NGramClassifier.from_routing_log(str(log))
+    assert classifier.classify("stock of apple")[0] == ["websearch"]
+
+def test_rule_classifier_defers_greetings_with_other_requests():
+    """Test that a greeting in front of an unrecognised request is left to the LLM router."""
+    for text in ("hello, tell me about quantum computing", "Hi! Can you search for the latest iPhone reviews"):
+        agents, confidence = RuleClassifier().classify(text)
+        assert confidence < 0.5
+        assert FastRouter().route(text) is None
+    assert RuleClassifier().classify("Hi there, I'm Bob, nice to meet you!") == (["greet"], 0.95)
+    assert RuleClassifier().classify("hi, I'm Bob, what's the weather in Tokyo?")[0] == ["greet", "websearch"]
+
+def test_extract_name_ignores_non_names():
+    """Test that "I'm in Tokyo" or "I am going" are not read as names, but real names still are."""
+    from simple_agents.router.fast_router import extract_name
+    assert extract_name("I'm in Tokyo, what's the weather like?") == ""
+    assert extract_name("I am going to Paris next week, any tips?") == ""
+    assert extract_name("i'm tired") == "" and extract_name("I'm Fine thanks") == ""
+    assert extract_name("hi, I'm Bob") == "Bob"
+    assert extract_name("my name is alice") == "alice"
+    assert RuleClassifier().classify("I'm in Tokyo, what's the weather like?") == (["websearch"], 0.9)
+    assert build_assignment("greet", "I am going to Paris")["task"] == "Greet the user"
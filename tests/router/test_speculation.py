@@ -0,0 +1,170 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from simple_agents.base.summarization import SummaryPolicy
+from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.router.speculation import Speculator
+
+SEARCH_ROUTE = {"agents": [{"agent": "websearch", "task": "Find the weather", "context": {"required_tools": ["web_search"]}}]}
+GREET_ROUTE = {"agents": [{"agent": "greet", "task": "Greet the user", "context": {"required_tools": ["say_hello"]}}]}
+SEARCH_PLAN = {"steps": [{"tool_name": "web_search", "arguments": {"query": "tokyo weather"}}]}
+GREET_PLAN = {"steps": [{"tool_name": "say_hello", "arguments": {"name": "Al"}}]}
+
+
+def reply(content):
+    return MagicMock(message=MagicMock(content=content))
+
+
+def coordinator_chat(route):
+    """Router answers with ``route``, the formatter with plain text."""
+    def chat(model, messages, **kwargs):
+        if "routing agent" in messages[0]["content"]:
+            return reply(json.dumps(route))
+        return reply("Here you go")
+    return chat
+
+
+def planner_chat(model, messages, **kwargs):
+    return reply(json.dumps(SEARCH_PLAN if "web search" in messages[0]["content"] else GREET_PLAN))
+
+
+def make_coordinator(**speculator_kwargs):
+    return CoordinatorAssistant(model="gemma3:4b", summary_policy=SummaryPolicy(agent_summaries="none"),
+                                speculator=Speculator(**speculator_kwargs))
+
+
+def test_predict_from_classifier_then_recent_decisions():
+    """Test that predictions come from the classifiers first, then from routing frequency."""
+    speculator = Speculator(min_share=0.6)
+    assert speculator.predict("What's the weather in Tokyo?") == "websearch"
+    assert speculator.predict("tell me something") is None
+    for _ in range(3):
+        speculator.observe([{"agent": "websearch"}])
+    speculator.observe([{"agent": "greet"}])
+    assert speculator.predict("tell me something") == "websearch"
+    # Several candidate agents: bet on the one routed to most often
+    assert speculator.predict("Hi, I'm Al. What's the weather?") == "websearch"
+    assert Speculator(known_agents=["greet"]).predict("What's the weather in Tokyo?") is None
+
+
+@patch('simple_agents.agents.web_search.tools.DDGS')
+@patch('simple_agents.planner.llm_planner.chat', side_effect=planner_chat)
+@patch('simple_agents.coordinator_assistant.chat', side_effect=coordinator_chat(SEARCH_ROUTE))
+def test_accepted_speculation_is_adopted(mock_chat, mock_planner_chat, mock_ddgs):
+    """Test that a correct bet's plan and first search are reused instead of being redone."""
+    mock_ddgs.return_value.__enter__.return_value.text.return_value = [{"title": "Sunny", "body": "25C", "href": "u"}]
+    coordinator = make_coordinator(run_tools=True)
+
+    assert coordinator.run("What's the weather in Tokyo?") == "Here you go"
+
+    assert mock_planner_chat.call_count == 1
+    assert mock_ddgs.return_value.__enter__.return_value.text.call_count == 1
+    assert coordinator.speculator.stats["accepted"] == 1 and coordinator.speculator.accept_rate() == 1.0
+    assert coordinator.last_trace.root.attributes["speculation"] == "accepted"
+    assert "speculate" in [s.name for s in coordinator.last_trace.spans]
+
+
+@patch('simple_agents.planner.llm_planner.chat', side_effect=planner_chat)
+@patch('simple_agents.coordinator_assistant.chat', side_effect=coordinator_chat(GREET_ROUTE))
+def test_wrong_bet_is_discarded(mock_chat, mock_planner_chat):
+    """Test that a speculative plan for an agent the router didn't pick is dropped and counted as waste."""
+    coordinator = make_coordinator()
+
+    coordinator.run("What's the weather in Tokyo?")
+    coordinator._speculation_pool.shutdown(wait=True)
+
+    prompts = [c.args[1][0]["content"] for c in mock_planner_chat.call_args_list]
+    assert sum("web search" in p for p in prompts) == 1 and len(prompts) == 2
+    assert coordinator.speculator.stats["wasted"] == 1
+    assert coordinator.speculator.waste_rate() == 1.0
+    assert coordinator.last_trace.root.attributes["speculation"] == "wasted"
+
+
+@patch('simple_agents.planner.llm_planner.chat', side_effect=ConnectionError("down"))
+@patch('simple_agents.coordinator_assistant.chat', side_effect=coordinator_chat(GREET_ROUTE))
+def test_no_prediction_skips_speculation(mock_chat, mock_planner_chat):
+    """Test that requests without a confident prediction route normally."""
+    coordinator = make_coordinator()
+    coordinator.agents["greet"].run = MagicMock(return_value={"agent": "GreeterAgent", "results": []})
+    coordinator.run("tell me something")
+    assert coordinator.speculator.stats["skipped"] == 1
+    assert coordinator.speculator.stats["speculated"] == 0
+    mock_planner_chat.assert_not_called()
+
+
+@patch('simple_agents.agents.web_search.tools.DDGS')
+@patch('simple_agents.planner.llm_planner.achat', new_callable=AsyncMock)
+@patch('simple_agents.coordinator_assistant.achat', new_callable=AsyncMock)
+def test_async_speculation_is_adopted(mock_achat, mock_planner_achat, mock_ddgs):
+    """Test that the async pipeline also plans the predicted agent while routing."""
+    mock_ddgs.return_value.__enter__.return_value.text.return_value = []
+    mock_achat.side_effect = lambda model, messages, **kw: coordinator_chat(SEARCH_ROUTE)(model, messages)
+    mock_planner_achat.side_effect = lambda model, messages, **kw: planner_chat(model, messages)
+    coordinator = make_coordinator()
+
+    asyncio.run(coordinator.arun("What's the weather in Tokyo?"))
+
+    assert mock_planner_achat.call_count == 1
+    assert coordinator.speculator.stats == {"speculated": 1, "accepted": 1, "wasted": 0, "failed": 0, "skipped": 0}
+
+
+@patch('simple_agents.planner.llm_planner.chat', side_effect=planner_chat)
+def test_speculative_tool_calls_get_the_prepared_input(mock_planner_chat):
+    """Test that a prefetched search gets the same rank_query preparation as a normal step."""
+    coordinator = make_coordinator(run_tools=True)
+    agent = coordinator.agents["websearch"]
+    agent.tools["web_search"].run = MagicMock(return_value={"results": ["Sunny"]})
+
+    fields = agent.speculate("What's the weather in Tokyo?", run_tools=True)
+
+    agent.tools["web_search"].run.assert_called_once_with({"query": "tokyo weather", "rank_query": "What's the weather in Tokyo?"})
+    assert fields["prefetched"][0]["input"] == {"query": "tokyo weather"}  # Still matches the planned step
+    assert agent.task is None
+
+
+@patch('simple_agents.planner.llm_planner.chat', side_effect=planner_chat)
+@patch('simple_agents.coordinator_assistant.chat', side_effect=coordinator_chat(GREET_ROUTE))
+def test_close_shuts_down_the_speculation_pool(mock_chat, mock_planner_chat):
+    """Test that close() cancels queued speculation and later requests route without it."""
+    coordinator = make_coordinator(min_confidence=0.0)
+    pool = coordinator._speculation_pool
+    coordinator.close()
+    assert pool._shutdown
+
+    coordinator.agents["greet"].run = MagicMock(return_value={"agent": "GreeterAgent", "results": []})
+    coordinator.run("hello there")
+    assert coordinator.speculator.stats["speculated"] == 0
+    mock_planner_chat.assert_not_called()
+
+
+@patch('simple_agents.planner.llm_planner.achat', new_callable=AsyncMock)
+@patch('simple_agents.coordinator_assistant.achat', new_callable=AsyncMock)
+def test_closed_coordinator_stops_async_speculation(mock_achat, mock_planner_achat):
+    """Test that arun() after close() routes without speculating too."""
+    mock_achat.side_effect = lambda model, messages, **kw: coordinator_chat(GREET_ROUTE)(model, messages)
+    coordinator = make_coordinator(min_confidence=0.0)
+    coordinator.close()
+    coordinator.agents["greet"].arun = AsyncMock(return_value={"agent": "GreeterAgent", "results": []})
+
+    asyncio.run(coordinator.arun("hello there"))
+    assert coordinator.speculator.stats["speculated"] == 0
+    mock_planner_achat.assert_not_called()
+
+
+@patch('simple_agents.agents.web_search.tools.DDGS')
+@patch('simple_agents.planner.llm_planner.chat', side_effect=planner_chat)
+@patch('simple_agents.coordinator_assistant.chat')
+def test_speculation_is_wasted_when_the_router_planned_the_steps(mock_chat, mock_planner_chat, mock_ddgs):
+    """Test that in combined mode a speculative plan the router made redundant counts as wasted."""
+    mock_ddgs.return_value.__enter__.return_value.text.return_value = []
+    route = {"agents": [{**SEARCH_ROUTE["agents"][0], "steps": [{"tool_name": "web_search", "arguments": {"query": "tokyo forecast"}}]}]}
+    mock_chat.side_effect = coordinator_chat(route)
+    coordinator = CoordinatorAssistant(model="gemma3:4b", summary_policy=SummaryPolicy(agent_summaries="none"),
+                                       speculator=Speculator(), plan_mode="combined")
+
+    coordinator.run("What's the weather in Tokyo?")
+
+    assert coordinator.speculator.stats["accepted"] == 0 and coordinator.speculator.stats["wasted"] == 1
+    assert coordinator.last_trace.root.attributes["speculation"] == "wasted"
+    assert mock_ddgs.return_value.__enter__.return_value.text.call_args.args[0] == "tokyo forecast"
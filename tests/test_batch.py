@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from simple_agents.batch import completed_lines, main, run_file
+
+
+class FakeRun:
+    """Stands in for CoordinatorAssistant._run: echoes input, fails on 'boom'."""
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, user_input):
+        with self.lock:
+            self.calls.append(user_input)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        if user_input == "boom":
+            raise RuntimeError("router down")
+        return f"reply to {user_input}"
+
+
+def test_run_batch_dedupes_bounds_concurrency_and_records_errors(coordinator):
+    """Test that run_batch returns input-ordered records, runs repeats once and keeps going after errors."""
+    fake = FakeRun()
+    with patch.object(coordinator, "_run", fake):
+        records = coordinator.run_batch(["a", "b", "a", "boom", "c", "d", "a"], concurrency=2)
+
+    assert [r["index"] for r in records] == list(range(7))
+    assert sorted(fake.calls) == ["a", "b", "boom", "c", "d"]
+    assert fake.max_active <= 2
+    assert records[0]["output"] == "reply to a" and records[0]["error"] is None
+    assert records[0]["duration_s"] > 0 and "request_id" in records[0]
+    assert records[2]["duplicate_of"] == 0 and records[6]["output"] == "reply to a"
+    assert records[3]["output"] is None and records[3]["error"] == "RuntimeError: router down"
+
+
+def test_run_file_writes_incrementally_and_resumes(coordinator, tmp_path):
+    """Test that a re-run skips finished lines and drops a partial trailing record."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    lines = [json.dumps({"input": text}) for text in ["a", "b", "c"]] + ["", "not json", json.dumps("d")]
+    input_path.write_text("\n".join(lines) + "\n")
+    output_path.write_text(json.dumps({"line": 1, "output": "reply to b", "error": None}) + '\n{"line": 2, "outp')
+
+    assert completed_lines(str(output_path)) == {1}
+    fake = FakeRun()
+    with patch.object(coordinator, "_run", fake):
+        counts = run_file(coordinator, str(input_path), str(output_path), concurrency=2)
+
+    assert sorted(fake.calls) == ["a", "c", "d"]
+    assert counts == {"skipped": 1, "completed": 3, "errors": 0, "duplicates": 0}
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert sorted(r["line"] for r in records) == [0, 1, 2, 5]
+    assert {r["line"]: r["output"] for r in records}[5] == "reply to d"
+
+
+def test_cli_entry_point(tmp_path, mock_model):
+    """Test that the console entry point runs a file and reports errors in its exit code."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    input_path.write_text("\n".join(json.dumps({"body": text}) for text in ["x", "boom", "x"]) + "\n")
+    fake = FakeRun()
+    with patch("simple_agents.coordinator_assistant.CoordinatorAssistant._run", side_effect=fake), \
+            patch("simple_agents.utils.logging_config.configure_logging"):
+        exit_code = main([str(input_path), str(output_path), "--field", "body", "--no-resume"])
+
+    assert exit_code == 1
+    records = {r["line"]: r for r in map(json.loads, output_path.read_text().splitlines())}
+    assert records[2]["duplicate_of"] == 0
+    assert records[1]["error"] == "RuntimeError: router down"
+
+
+def test_duplicates_copy_request_fields_and_dedupe_state_is_bounded(coordinator):
+    """Test that repeats carry the original's request_id and llm_calls, and only recent inputs are remembered."""
+    fake = FakeRun()
+    with patch.object(coordinator, "_run", fake):
+        records = coordinator.run_batch(["a", "a", "b", "c", "a", "boom", "boom"], concurrency=1, dedupe_window=2)
+
+    assert records[1]["duplicate_of"] == 0
+    assert records[1]["request_id"] == records[0]["request_id"] and records[1]["llm_calls"] == records[0]["llm_calls"]
+    # "a" fell out of the two-input window behind "b" and "c"; failures are never reused
+    assert "duplicate_of" not in records[4] and "duplicate_of" not in records[6]
+    assert fake.calls == ["a", "b", "c", "a", "boom", "boom"]
+
+
+def test_resume_retries_lines_that_errored(coordinator, tmp_path):
+    """Test that a resumed run re-runs failed lines unless retry_errors is off."""
+    input_path, output_path = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    input_path.write_text("\n".join(json.dumps({"input": text}) for text in ["a", "b"]) + "\n")
+    output_path.write_text(
+        json.dumps({"line": 0, "output": "reply to a", "error": None}) + "\n"
+        + json.dumps({"line": 1, "output": None, "error": "RuntimeError: router down"}) + "\n"
+    )
+    assert completed_lines(str(output_path)) == {0, 1}
+    assert completed_lines(str(output_path), retry_errors=True) == {0}
+
+    fake = FakeRun()
+    with patch.object(coordinator, "_run", fake):
+        assert run_file(coordinator, str(input_path), str(output_path), retry_errors=False)["completed"] == 0
+        counts = run_file(coordinator, str(input_path), str(output_path))
+
+    assert fake.calls == ["b"]
+    assert counts == {"skipped": 1, "completed": 1, "errors": 0, "duplicates": 0}
+    assert json.loads(output_path.read_text().splitlines()[-1])["output"] == "reply to b"
+    assert completed_lines(str(output_path), retry_errors=True) == {0, 1}
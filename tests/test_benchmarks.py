@@ -0,0 +1,37 @@
+import pytest
+from ollama import Client
+from benchmarks.fake_ollama import FakeOllamaServer, detect_stage
+from benchmarks.run_benchmarks import compare, merged_duration, run_benchmarks
+
+def test_merged_duration_merges_overlaps():
+    """Test that overlapping external calls are only counted once."""
+    assert merged_duration([(0, 2), (1, 3), (5, 6)]) == 4
+    assert merged_duration([]) == 0
+
+def test_detect_stage():
+    """Test that stages are recognised from their system prompts."""
+    assert detect_stage([{"role": "system", "content": "You are a smart routing agent."}]) == "router"
+    assert detect_stage([{"role": "user", "content": "hi"}]) == "unknown"
+
+def test_fake_server_speaks_ollama_chat():
+    """Test that the real ollama client can talk to the fake server, streaming or not."""
+    with FakeOllamaServer(responder=lambda stage, messages: "Hello there, friend") as server:
+        client = Client(host=server.url)
+        response = client.chat("gemma3:4b", [{"role": "user", "content": "hi"}])
+        assert response.message.content == "Hello there, friend"
+        assert response.eval_count == 5
+
+        streamed = "".join(chunk.message.content for chunk in client.chat("gemma3:4b", [], stream=True))
+        assert streamed == "Hello there, friend"
+        assert [call["stream"] for call in server.calls] == [False, True]
+
+def test_run_benchmarks_smoke():
+    """Test that scenarios run end to end and report timings and LLM call counts."""
+    results = run_benchmarks(iterations=1, latency=0, search_latency=0, scenarios=["multi_agent", "error_search_down"])
+
+    multi_agent = results["scenarios"]["multi_agent"]
+    assert multi_agent["llm_calls"] == {"router": 1, "planner": 2, "summarizer": 2, "formatter": 1, "total": 6}
+    assert multi_agent["stages"]["search"]["calls_per_request"] == 1
+    assert multi_agent["wall_s"]["mean"] >= multi_agent["framework_overhead_s"]["mean"]
+    assert results["scenarios"]["error_search_down"]["llm_calls"]["total"] == 3
+    assert len(compare(results, results)) == 4
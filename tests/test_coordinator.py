@@ -1,5 +1,6 @@
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 def test_coordinator_initialization(coordinator):
     """Test that the coordinator initializes correctly."""
@@ -114,4 +115,208 @@ def test_run_with_multiple_agents(mock_chat, coordinator):
     assert isinstance(response, str)
     assert "Hello" in response and "Alice" in response
     assert "weather" in response and "sunny" in response
-    assert mock_chat.call_count == 2  # Called once for routing and once for formatting 
\ No newline at end of file
+    assert mock_chat.call_count == 2  # Called once for routing and once for formatting 
+
+@patch('simple_agents.coordinator_assistant.achat', new_callable=AsyncMock)
+def test_arun_with_multiple_agents(mock_achat, coordinator):
+    """Test the async run method awaits routing, agents and formatting."""
+    mock_achat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet the user", "context": {}}, {"agent": "websearch", "task": "Search for weather information", "context": {}}]}')),
+        MagicMock(message=MagicMock(content='Hello Alice! The weather is sunny today.'))
+    ]
+    coordinator.agents["greet"].arun = AsyncMock(return_value={"agent": "GreeterAgent", "results": [], "summary": "Hello Alice!"})
+    coordinator.agents["websearch"].arun = AsyncMock(side_effect=RuntimeError("search down"))
+
+    response = asyncio.run(coordinator.arun("Hi, I'm Alice. What's the weather like?"))
+
+    assert response == 'Hello Alice! The weather is sunny today.'
+    assert mock_achat.call_count == 2
+    formatter_prompt = mock_achat.call_args_list[1].args[1][1]["content"]
+    assert "Error running websearch: search down" in formatter_prompt
+
+@patch('simple_agents.coordinator_assistant.achat', new_callable=AsyncMock)
+def test_arun_no_agents(mock_achat, coordinator):
+    """Test the async run method when the router assigns no agents."""
+    mock_achat.return_value.message.content = '{"agents": []}'
+
+    response = asyncio.run(coordinator.arun("???"))
+
+    assert "not sure" in response
+    assert mock_achat.call_count == 1
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_run_passes_only_dependency_results(mock_chat, coordinator):
+    """Test that agents only receive the results of the assignments they depend on."""
+    mock_chat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet the user", "depends_on": []}, {"agent": "websearch", "task": "Search for the user name", "depends_on": [0]}]}')),
+        MagicMock(message=MagicMock(content='done'))
+    ]
+    greet_result = {"agent": "GreeterAgent", "results": [], "summary": "Hello Alice!"}
+    coordinator.agents["greet"].run = MagicMock(return_value=greet_result)
+    coordinator.agents["websearch"].run = MagicMock(side_effect=RuntimeError("search down"))
+
+    assert coordinator.run("Hi, I'm Alice. Search my name") == "done"
+
+    assert coordinator.agents["greet"].run.call_args.args[0]["previous_results"] == []
+    assert coordinator.agents["websearch"].run.call_args.args[0]["previous_results"] == [greet_result]
+    formatter_prompt = mock_chat.call_args_list[1].args[1][1]["content"]
+    assert "Error running websearch: search down" in formatter_prompt
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_route_fast_path_skips_llm(mock_chat, coordinator):
+    """Test that a confident pre-router decision skips the routing LLM call."""
+    from simple_agents.router.fast_router import FastRouter
+    coordinator.pre_router = FastRouter()
+
+    result = coordinator.route("hi, I'm Bob")
+
+    assert result[0]["agent"] == "greet"
+    assert mock_chat.call_count == 0
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_route_fast_path_falls_back_to_llm(mock_chat, coordinator):
+    """Test that an unsure pre-router falls back to the LLM router."""
+    from simple_agents.router.fast_router import FastRouter
+    coordinator.pre_router = FastRouter()
+    mock_chat.return_value.message.content = '{"agents": [{"agent": "websearch", "task": "Tell a story"}]}'
+
+    result = coordinator.route("tell me a story")
+
+    assert result[0]["agent"] == "websearch"
+    assert mock_chat.call_count == 1
+    assert coordinator.pre_router.stats["fallback"] == 1
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_run_stream_yields_formatter_tokens(mock_chat, coordinator):
+    """Test that run_stream yields formatter tokens as they are generated."""
+    mock_chat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet the user"}]}')),
+        iter([MagicMock(message=MagicMock(content=token)) for token in ["Hello", " ", "Alice", "!", ""]])
+    ]
+    coordinator.agents["greet"].run = MagicMock(return_value={"agent": "GreeterAgent", "results": [], "summary": "Hello Alice!"})
+
+    tokens = list(coordinator.run_stream("Hello, my name is Alice"))
+
+    assert tokens == ["Hello", " ", "Alice", "!"]
+    assert mock_chat.call_args_list[1].kwargs["stream"] is True
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_run_stream_no_agents(mock_chat, coordinator):
+    """Test that run_stream yields the fallback reply when nothing is routed."""
+    mock_chat.return_value.message.content = '{"agents": []}'
+    assert "not sure" in "".join(coordinator.run_stream("???"))
+
+@patch('simple_agents.coordinator_assistant.achat', new_callable=AsyncMock)
+def test_arun_stream_yields_formatter_tokens(mock_achat, coordinator):
+    """Test the async streaming variant."""
+    async def stream():
+        for token in ["Hi", " Bob"]:
+            yield MagicMock(message=MagicMock(content=token))
+
+    mock_achat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet the user"}]}')),
+        stream()
+    ]
+    coordinator.agents["greet"].arun = AsyncMock(return_value={"agent": "GreeterAgent", "results": [], "summary": "Hi Bob"})
+
+    async def collect():
+        return [token async for token in coordinator.arun_stream("hi I'm Bob")]
+
+    assert asyncio.run(collect()) == ["Hi", " Bob"]
+
+@patch('simple_agents.agents.greet.agent.chat')
+@patch('simple_agents.planner.llm_planner.chat')
+@patch('simple_agents.coordinator_assistant.chat')
+def test_run_reports_llm_call_counts(mock_chat, mock_planner_chat, mock_summary_chat, coordinator):
+    """Test that per-request LLM call counts are reported per stage."""
+    mock_chat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet the user"}]}')),
+        MagicMock(message=MagicMock(content='Hello Alice!'))
+    ]
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "Alice"}}]}'
+    mock_summary_chat.return_value.message.content = "Hello Alice!"
+
+    coordinator.run("Hello, my name is Alice")
+
+    assert coordinator.last_llm_calls == {"router": 1, "planner": 1, "summarizer": 1, "formatter": 1, "total": 4}
+
+@patch('simple_agents.agents.greet.agent.chat')
+@patch('simple_agents.planner.llm_planner.chat')
+@patch('simple_agents.coordinator_assistant.chat')
+def test_run_template_summary_direct_reply(mock_chat, mock_planner_chat, mock_summary_chat, mock_model):
+    """Test that template summaries plus direct single-agent replies need only two LLM calls."""
+    from simple_agents.base.summarization import SummaryPolicy
+    from simple_agents.coordinator_assistant import CoordinatorAssistant
+    coordinator = CoordinatorAssistant(model=mock_model, summary_policy=SummaryPolicy(agent_summaries="template", direct_single_agent=True))
+    mock_chat.return_value.message.content = '{"agents": [{"agent": "greet", "task": "Greet the user"}]}'
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "Alice"}}]}'
+
+    assert coordinator.run("Hello, my name is Alice") == "Hello Alice!"
+    assert coordinator.last_llm_calls == {"router": 1, "planner": 1, "total": 2}
+    assert mock_summary_chat.call_count == 0
+
+@patch('simple_agents.planner.llm_planner.chat')
+@patch('simple_agents.coordinator_assistant.chat')
+def test_run_combined_plan_mode_skips_planner(mock_chat, mock_planner_chat, mock_model):
+    """Test that combined mode feeds router-planned steps straight into the agent."""
+    from simple_agents.base.summarization import SummaryPolicy
+    from simple_agents.coordinator_assistant import CoordinatorAssistant, COMBINED_PLAN_PROMPT
+    coordinator = CoordinatorAssistant(model=mock_model, plan_mode="combined", summary_policy=SummaryPolicy(agent_summaries="template"))
+    mock_chat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet and reverse", "steps": [{"tool_name": "say_hello", "arguments": {"name": "John"}}, {"tool_name": "name_backwards", "arguments": {"name": "John"}}]}]}')),
+        MagicMock(message=MagicMock(content='Hello John! nhoJ is your name backwards.'))
+    ]
+
+    assert coordinator.run("I'm John, reverse my name") == 'Hello John! nhoJ is your name backwards.'
+
+    assert COMBINED_PLAN_PROMPT in mock_chat.call_args_list[0].args[1][0]["content"]
+    assert mock_planner_chat.call_count == 0
+    assert coordinator.last_llm_calls == {"router": 1, "formatter": 1, "total": 2}
+
+def test_invalid_plan_mode(mock_model):
+    """Test that an unknown plan mode is rejected."""
+    from simple_agents.coordinator_assistant import CoordinatorAssistant
+    with pytest.raises(ValueError, match="plan_mode"):
+        CoordinatorAssistant(model=mock_model, plan_mode="fused")
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_parallel_runs_of_one_agent_keep_their_own_state(mock_chat, coordinator):
+    """Test that two independent assignments for the same agent don't see each other's task or steps."""
+    import threading
+    import time
+    from simple_agents.base.base_agent import BaseAgent
+
+    class EchoAgent(BaseAgent):
+        def plan(self):
+            self.state["steps"] = self.task["task"]
+
+        def execute(self):
+            time.sleep(0.05)  # Both runs are in flight here
+            return {"agent": "Echo", "task": self.task["task"], "steps": self.state["steps"], "results": []}
+
+    mock_chat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "one"}, {"agent": "greet", "task": "two"}]}')),
+        MagicMock(message=MagicMock(content='done'))
+    ]
+    agent = EchoAgent("Echo")
+    coordinator.agents._agents["greet"] = agent
+    results = coordinator._run_agents(coordinator.route("hi"), "hi")
+    assert [(r["task"], r["steps"]) for r in results] == [("one", "one"), ("two", "two")]
+
+    # Agents keeping per-run state on the instance are run one at a time
+    agent.reentrant = False
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run(task):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return {"agent": "Echo", "results": []}
+
+    agent.run = run
+    coordinator._run_agents([{"agent": "greet", "task": "one"}, {"agent": "greet", "task": "two"}], "hi")
+    assert peak[0] == 1
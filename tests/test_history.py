@@ -0,0 +1,117 @@
+from unittest.mock import patch, MagicMock
+
+from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.history import HistoryManager, LLMHistorySummarizer, normalize_history
+from simple_agents.utils.deadline import Deadline, DeadlineExceeded, deadline_scope
+from simple_agents.utils.tokens import count_tokens
+
+
+class RecordingSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, summary, turns):
+        self.calls.append((summary, list(turns)))
+        return (summary + " " if summary else "") + "+".join(u for u, _ in turns)
+
+
+def _history(n):
+    return [(f"q{i}", f"a{i}") for i in range(n)]
+
+
+def test_short_history_is_sent_verbatim():
+    """Test that histories within keep_turns need no summary."""
+    summarizer = RecordingSummarizer()
+    manager = HistoryManager(summarizer, keep_turns=3)
+    assert manager.build_prompt("s", _history(2), "hi") == "User: q0\nAssistant: a0\nUser: q1\nAssistant: a1\nUser: hi"
+    assert manager.build_prompt("s", [], "hi") == "User: hi"
+    assert summarizer.calls == []
+
+
+def test_summary_is_updated_incrementally():
+    """Test that each turn folds only the newly aged-out turn into the cached summary."""
+    summarizer = RecordingSummarizer()
+    manager = HistoryManager(summarizer, keep_turns=2)
+
+    prompt = manager.build_prompt("s", _history(4), "next")
+    assert summarizer.calls == [("", [("q0", "a0"), ("q1", "a1")])]
+    assert prompt == "Summary of earlier conversation: q0+q1\nUser: q2\nAssistant: a2\nUser: q3\nAssistant: a3\nUser: next"
+
+    manager.build_prompt("s", _history(5), "next")
+    assert summarizer.calls[-1] == ("q0+q1", [("q2", "a2")])
+    manager.build_prompt("s", _history(5), "again")
+    assert len(summarizer.calls) == 2
+
+
+def test_edited_history_rebuilds_summary():
+    """Test that a different conversation under the same session does not reuse the summary."""
+    summarizer = RecordingSummarizer()
+    manager = HistoryManager(summarizer, keep_turns=1)
+    manager.build_prompt("s", _history(3), "x")
+    other = [("new", "chat"), ("q1", "a1"), ("q2", "a2")]
+    assert manager.build_prompt("s", other, "x").startswith("Summary of earlier conversation: new+q1\n")
+
+
+def test_budget_folds_more_turns():
+    """Test that long verbatim turns are summarized, in one call, until the prompt fits the budget."""
+    summarizer = RecordingSummarizer()
+    manager = HistoryManager(summarizer, budget_tokens=40, keep_turns=3, summary_tokens=5)
+    history = [(f"q{i}", "a" * 60) for i in range(3)]
+    prompt = manager.build_prompt("s", history, "hi")
+    assert count_tokens(prompt) <= 40
+    assert prompt.startswith("Summary of earlier conversation: q0+q1\n")
+    assert len(summarizer.calls) == 1
+
+    # Many more turns over budget still cost one call
+    history = [(f"q{i}", "a" * 60) for i in range(3, 10)]
+    manager.build_prompt("other", history, "hi")
+    assert len(summarizer.calls) == 2
+
+
+def test_prompt_size_is_constant_for_long_chats():
+    """Test that prompt size stops growing with conversation length."""
+    manager = HistoryManager(lambda summary, turns: "short summary", keep_turns=2)
+    sizes = {len(manager.build_prompt("s", _history(n), "hi")) for n in range(12, 40)}
+    assert len(sizes) == 1
+
+
+def test_normalize_message_dicts():
+    """Test that role/content message histories are paired into turns."""
+    history = [
+        {"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"},
+        {"role": "user", "content": "bye"}
+    ]
+    assert normalize_history(history) == [("hi", "hello"), ("bye", "")]
+
+
+@patch('simple_agents.history.chat')
+def test_llm_summarizer(mock_chat):
+    """Test that the LLM summarizer sends the previous summary and new turns."""
+    mock_chat.return_value = MagicMock(message=MagicMock(content=" Alice asked about Tokyo. "))
+    summary = LLMHistorySummarizer("gemma3:4b")("Alice said hi.", [("weather in Tokyo?", "Sunny")])
+    assert summary == "Alice asked about Tokyo."
+    content = mock_chat.call_args.args[1][1]["content"]
+    assert "Current summary: Alice said hi." in content
+    assert "User: weather in Tokyo?\nAssistant: Sunny" in content
+
+
+def test_out_of_time_summary_sends_only_recent_turns():
+    """Test that a summarizer call that misses the deadline leaves the summary for the next turn."""
+    def out_of_time(summary, turns):
+        raise DeadlineExceeded("LLM call for history did not finish within the request deadline")
+
+    manager = HistoryManager(out_of_time, keep_turns=1)
+    with deadline_scope(Deadline(5)):
+        assert manager.build_prompt("s", _history(3), "hi") == "User: q2\nAssistant: a2\nUser: hi"
+
+
+def test_coordinator_builds_the_history_prompt_inside_the_request():
+    """Test that run(history=...) summarizes older turns under the request's trace."""
+    summarizer = RecordingSummarizer()
+    coordinator = CoordinatorAssistant(history_manager=HistoryManager(summarizer, keep_turns=1))
+    coordinator._run = MagicMock(return_value="done")
+
+    assert coordinator.run("hi", session_id="s", history=_history(3)) == "done"
+    assert coordinator._run.call_args.args[0] == "Summary of earlier conversation: q0+q1\nUser: q2\nAssistant: a2\nUser: hi"
+    history_span = next(s for s in coordinator.last_trace.spans if s.name == "history")
+    assert history_span.attributes["turns"] == 2
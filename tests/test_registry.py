@@ -0,0 +1,83 @@
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from benchmarks.import_time import measure
+from simple_agents.coordinator_assistant import CoordinatorAssistant
+from simple_agents.registry import AgentRegistry, AgentSpec, import_object
+
+
+class PluginAgent:
+    def __init__(self, **options):
+        self.options = options
+        self.tools = {}
+
+
+def plugin_spec():
+    return AgentSpec("translate", PluginAgent, tools={"translate_text": "simple_agents.agents.greet.tools:GreetUserTool"},
+                     description="translates text between languages")
+
+
+def fake_entry_point(name, loaded):
+    ep = MagicMock()
+    ep.name = name
+    ep.load.return_value = loaded
+    return ep
+
+
+def test_import_object():
+    """Test that 'module:attr' paths resolve and other values pass through."""
+    assert import_object("simple_agents.registry:AgentSpec") is AgentSpec
+    assert import_object(PluginAgent) is PluginAgent
+    with pytest.raises(ValueError):
+        import_object("simple_agents.registry")
+
+
+def test_agents_are_built_on_first_access(coordinator):
+    """Test that the coordinator builds no agent until it is first used."""
+    assert coordinator.agents.loaded() == []
+    assert "greet" in coordinator.agents and "missing" not in coordinator.agents
+    assert sorted(coordinator.agents) == ["greet", "websearch"]
+    greet = coordinator.agents["greet"]
+    assert coordinator.agents["greet"] is greet
+    assert coordinator.agents.loaded() == ["greet"]
+    with pytest.raises(KeyError):
+        coordinator.agents["missing"]
+
+
+def test_entry_point_agents_are_discovered():
+    """Test that plugin agents register through entry points and reach the router."""
+    entry_points = [fake_entry_point("translate", plugin_spec()), fake_entry_point("bad", object()),
+                    fake_entry_point("greet", AgentSpec("greet", PluginAgent))]
+    with patch("importlib.metadata.entry_points", return_value=entry_points) as mock_entry_points:
+        registry = AgentRegistry()
+        mock_entry_points.assert_not_called()
+        assert registry.names() == ["greet", "websearch", "translate"]
+    assert registry.get("greet").factory != PluginAgent  # built-ins win over plugins
+
+    coordinator = CoordinatorAssistant(model="gemma3:4b", registry=registry)
+    agent = coordinator.agents["translate"]
+    assert isinstance(agent, PluginAgent) and agent.options["model"] == "gemma3:4b"
+    system_prompt = coordinator._router_messages("hola")[0]["content"]
+    assert "- translate — translates text between languages" in system_prompt
+    assert "Available tools: translate_text" in system_prompt
+    agent_names = [a["properties"]["agent"]["enum"][0] for a in coordinator._router_kwargs()["format"]["properties"]["agents"]["items"]["anyOf"]]
+    assert agent_names == ["greet", "websearch", "translate"]
+
+
+def test_import_does_not_load_backends():
+    """Test that importing the package and building a coordinator leave ollama and duckduckgo_search unloaded."""
+    code = ("import sys, simple_agents; "
+            "simple_agents.CoordinatorAssistant(); "
+            "print(sorted(m for m in ('ollama', 'duckduckgo_search') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
+
+
+def test_import_time_benchmark_reports_targets():
+    """Test that the import-time benchmark measures each target in a fresh interpreter."""
+    results = measure(iterations=1, targets=["package"])
+    assert results["package"]["heavy_modules"] == []
+    assert results["package"]["median_ms"] > 0
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+import pytest
+from simple_agents.scheduler import arun_dependency_graph, resolve_dependencies, run_dependency_graph
+
+def test_resolve_dependencies_by_index_and_name():
+    """Test that dependencies can reference earlier assignments by index or agent name."""
+    assignments = [
+        {"agent": "greet"},
+        {"agent": "websearch", "depends_on": ["greet"]},
+        {"agent": "websearch", "depends_on": [0, 1]},
+    ]
+    assert resolve_dependencies(assignments) == [[], [0], [0, 1]]
+
+def test_resolve_dependencies_drops_invalid_references():
+    """Test that self, forward and unknown references are ignored."""
+    assignments = [
+        {"agent": "greet", "depends_on": [0, 1]},
+        {"agent": "websearch", "depends_on": "missing"},
+    ]
+    assert resolve_dependencies(assignments) == [[], []]
+
+def test_independent_nodes_run_concurrently():
+    """Test that nodes without dependencies overlap in time."""
+    barrier = threading.Barrier(2, timeout=2)
+
+    def run_node(i, deps):
+        barrier.wait()  # Deadlocks (and times out) unless both run at once
+        return i
+
+    assert run_dependency_graph([[], []], run_node) == [0, 1]
+
+def test_dependent_node_receives_only_its_dependencies():
+    """Test that a node waits for and receives only the results it depends on."""
+    seen = {}
+
+    def run_node(i, deps):
+        seen[i] = deps
+        time.sleep(0.01)
+        return f"result-{i}"
+
+    results = run_dependency_graph([[], [], [1]], run_node)
+
+    assert results == ["result-0", "result-1", "result-2"]
+    assert seen[2] == ["result-1"]
+    assert seen[0] == [] and seen[1] == []
+
+def test_async_dependency_graph():
+    """Test the async scheduler keeps order and passes dependency results."""
+    async def arun_node(i, deps):
+        await asyncio.sleep(0.01 * (3 - i))
+        return (i, deps)
+
+    results = asyncio.run(arun_dependency_graph([[], [0], []], arun_node))
+
+    assert results == [(0, []), (1, [(0, [])]), (2, [])]
+
+def test_exclusive_nodes_never_overlap():
+    """Test that nodes sharing an exclusive key run one at a time, in order, while others stay concurrent."""
+    lock = threading.Lock()
+    active = {"a": 0, None: 0}
+    peak = {"a": 0, None: 0}
+    order = []
+    keys = ["a", None, "a", "a"]
+
+    def run_node(i, deps):
+        with lock:
+            active[keys[i]] += 1
+            peak[keys[i]] = max(peak[keys[i]], active[keys[i]])
+            order.append(i)
+        time.sleep(0.02)
+        with lock:
+            active[keys[i]] -= 1
+        return i
+
+    assert run_dependency_graph([[], [], [], []], run_node, exclusive_key=keys.__getitem__) == [0, 1, 2, 3]
+    assert peak["a"] == 1
+    assert [i for i in order if keys[i] == "a"] == [0, 2, 3]
+
+    async def arun_node(i, deps):
+        active[keys[i]] += 1
+        peak[keys[i]] = max(peak[keys[i]], active[keys[i]])
+        await asyncio.sleep(0.01)
+        active[keys[i]] -= 1
+        return i
+
+    peak["a"] = 0
+    assert asyncio.run(arun_dependency_graph([[], [], [], []], arun_node, exclusive_key=keys.__getitem__)) == [0, 1, 2, 3]
+    assert peak["a"] == 1
+
+def test_async_dependency_graph_respects_max_workers():
+    """Test that the async scheduler runs at most max_workers nodes at once, like the thread pool."""
+    active = peak = 0
+
+    async def arun_node(i, deps):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return i
+
+    assert asyncio.run(arun_dependency_graph([[], [], [], [], []], arun_node, max_workers=2)) == [0, 1, 2, 3, 4]
+    assert peak == 2
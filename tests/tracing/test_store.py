@@ -0,0 +1,75 @@
+from simple_agents.tracing.store import TraceStore, render_trace
+from simple_agents.tracing.tracer import Tracer, span
+
+
+def _trace(request_id, session_id=None, padding=""):
+    attributes = {"session_id": session_id} if session_id else {}
+    return {"request_id": request_id, "trace_id": "t", "attributes": attributes, "spans": [], "padding": padding}
+
+
+def test_lookup_by_request_and_session():
+    """Test O(1) lookups by request ID and by each session's latest request."""
+    store = TraceStore()
+    store.add(_trace("r1", "alice"))
+    store.add(_trace("r2", "bob"))
+    store.add(_trace("r3", "alice"))
+
+    assert store.get("r2")["request_id"] == "r2"
+    assert store.get("missing") is None
+    assert store.latest("alice")["request_id"] == "r3"
+    assert store.latest("bob")["request_id"] == "r2"
+    assert store.latest()["request_id"] == "r3"
+
+
+def test_evicts_by_count():
+    """Test that the oldest traces are dropped beyond max_traces."""
+    store = TraceStore(max_traces=2)
+    for i in range(4):
+        store.add(_trace(f"r{i}", "s0" if i == 0 else None))
+    assert len(store) == 2
+    assert store.get("r0") is None and store.get("r1") is None
+    assert store.latest("s0") is None
+    assert store.get("r3") is not None
+
+
+def test_evicts_by_bytes():
+    """Test that the oldest traces are dropped once the byte budget is exceeded."""
+    store = TraceStore(max_bytes=2500)
+    for i in range(3):
+        store.add(_trace(f"r{i}", padding="x" * 1000))
+    assert len(store) == 2
+    assert store.get("r0") is None
+    assert store.total_bytes <= 2500
+
+
+def test_store_as_exporter_and_render():
+    """Test that the store collects traces from a Tracer and renders them as a span tree."""
+    store = TraceStore()
+    tracer = Tracer(exporters=[store])
+    with tracer.start_request(request_id="req", session_id="s1"):
+        with span("route"):
+            with span("llm:router") as llm:
+                llm.set_attributes(prompt_eval_count=120, eval_count=30)
+
+    text = render_trace(store.latest("s1"))
+    lines = text.splitlines()
+    assert lines[0] == "Request req"
+    assert lines[1].startswith("request: ")
+    assert lines[2].startswith("  route: ")
+    assert lines[3].startswith("    llm:router: ") and lines[3].endswith("(tokens in/out 120/30)")
+    assert render_trace(None) == "No trace recorded."
+
+
+def test_render_shows_cold_model_loads():
+    """Test that a noticeable model load time is shown on the LLM span."""
+    store = TraceStore()
+    tracer = Tracer(exporters=[store])
+    with tracer.start_request(request_id="req"):
+        with span("llm:router") as llm:
+            llm.set_attributes(eval_count=3, load_duration=2_500_000_000)
+        with span("llm:formatter") as llm:
+            llm.set_attributes(eval_count=3, load_duration=1_000_000)
+
+    lines = render_trace(store.get("req")).splitlines()
+    assert lines[2].endswith("(tokens in/out ?/3, model load 2.50s)")
+    assert lines[3].endswith("(tokens in/out ?/3)")
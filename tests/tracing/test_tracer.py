@@ -0,0 +1,121 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+
+from simple_agents.tracing.exporters import InMemoryExporter, JSONLExporter, OTLPJSONExporter, to_otlp
+from simple_agents.tracing.tracer import Tracer, current_span, span, start_span, trace_stream
+
+
+def _names(trace):
+    return [s.name for s in trace.spans]
+
+
+def test_span_is_noop_outside_request():
+    """Test that spans outside a traced request record nothing."""
+    with span("orphan") as s:
+        assert s is None
+    assert current_span() is None
+
+
+def test_nested_spans_and_export():
+    """Test that nested spans get parent ids and the trace is exported once finished."""
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporters=[exporter])
+    with tracer.start_request(request_id="req-1") as trace:
+        with span("route") as route:
+            with span("llm:router") as llm:
+                pass
+
+    assert exporter.traces == [trace]
+    assert trace.request_id == "req-1"
+    root = trace.root
+    assert _names(trace) == ["request", "route", "llm:router"]
+    assert route.parent_id == root.span_id
+    assert llm.parent_id == route.span_id
+    assert all(s.end_ns is not None and s.duration_s >= 0 for s in trace.spans)
+    assert current_span() is None
+
+
+def test_span_records_errors():
+    """Test that an exception marks the span and the request as failed."""
+    tracer = Tracer()
+    with pytest.raises(RuntimeError):
+        with tracer.start_request() as trace:
+            with span("tool:boom"):
+                raise RuntimeError("boom")
+    assert [s.status for s in trace.spans] == ["error", "error"]
+    assert trace.spans[1].error == "RuntimeError: boom"
+
+
+def test_exporter_failure_is_logged_not_raised():
+    """Test that a broken exporter does not fail the request."""
+    broken = MagicMock()
+    broken.export.side_effect = OSError("disk full")
+    with Tracer(exporters=[broken]).start_request():
+        pass
+    broken.export.assert_called_once()
+
+
+def test_trace_stream_records_final_chunk_metrics():
+    """Test that a streamed LLM span ends with the final chunk's counters."""
+    with Tracer().start_request() as trace:
+        llm = start_span("llm:formatter")
+        chunks = [MagicMock(done=False), MagicMock(done=True, eval_count=12, prompt_eval_count=40)]
+        assert list(trace_stream(llm, chunks)) == chunks
+    assert llm.end_ns is not None
+    assert llm.attributes["eval_count"] == 12
+    assert llm.attributes["prompt_eval_count"] == 40
+
+
+def test_jsonl_and_otlp_exporters(tmp_path):
+    """Test that both file exporters write one JSON line per trace."""
+    jsonl_path, otlp_path = tmp_path / "traces.jsonl", tmp_path / "traces.otlp.jsonl"
+    tracer = Tracer(exporters=[JSONLExporter(str(jsonl_path)), OTLPJSONExporter(str(otlp_path))])
+    for _ in range(2):
+        with tracer.start_request() as trace:
+            with span("format", stream=True):
+                pass
+
+    lines = jsonl_path.read_text().splitlines()
+    assert len(lines) == 2
+    assert [s["name"] for s in json.loads(lines[-1])["spans"]] == ["request", "format"]
+
+    otlp = json.loads(otlp_path.read_text().splitlines()[-1])
+    spans = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(trace.trace_id) == 32 and all(len(s["spanId"]) == 16 for s in spans)
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert {"key": "stream", "value": {"boolValue": True}} in spans[1]["attributes"]
+    assert otlp == to_otlp(trace)
+
+
+@patch('simple_agents.agents.greet.agent.chat')
+@patch('simple_agents.planner.llm_planner.chat')
+@patch('simple_agents.coordinator_assistant.chat')
+def test_coordinator_run_trace(mock_chat, mock_planner_chat, mock_summary_chat, mock_model):
+    """Test that a full run records route, agent, plan, tool, summarize and format spans with LLM metrics."""
+    from simple_agents.coordinator_assistant import CoordinatorAssistant
+    exporter = InMemoryExporter()
+    coordinator = CoordinatorAssistant(model=mock_model, tracer=Tracer(exporters=[exporter]))
+    mock_chat.side_effect = [
+        MagicMock(message=MagicMock(content='{"agents": [{"agent": "greet", "task": "Greet the user"}]}'), eval_count=30, prompt_eval_count=200, eval_duration=1_000_000),
+        MagicMock(message=MagicMock(content='Hello Alice!'), eval_count=5)
+    ]
+    mock_planner_chat.return_value.message.content = '{"steps": [{"tool_name": "say_hello", "arguments": {"name": "Alice"}}]}'
+    mock_summary_chat.return_value.message.content = "Hello Alice!"
+
+    coordinator.run("Hello, my name is Alice", request_id="abc")
+
+    trace = exporter.traces[0]
+    assert coordinator.last_trace is trace
+    assert trace.request_id == "abc"
+    assert _names(trace) == [
+        "request", "route", "llm:router", "agent:greet", "plan", "llm:planner",
+        "tool:say_hello", "summarize", "llm:summarizer", "format", "llm:formatter"
+    ]
+    by_name = {s.name: s for s in trace.spans}
+    assert by_name["llm:router"].attributes["eval_count"] == 30
+    assert by_name["llm:router"].attributes["prompt_eval_count"] == 200
+    assert by_name["route"].attributes == {"fast_path": False, "agents": ["greet"]}
+    assert by_name["tool:say_hello"].parent_id == by_name["agent:greet"].span_id
+    assert by_name["llm:planner"].parent_id == by_name["plan"].span_id
+    assert trace.root.attributes["llm_calls"] == 4
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from simple_agents.agents.greet.factory import build_greet_agent
+from simple_agents.coordinator_assistant import TIMEOUT_RESPONSE, CoordinatorAssistant
+from simple_agents.llm.client import LLMClient
+from simple_agents.utils.deadline import (
+    Deadline, DeadlineExceeded, LatencyBudget, arun_with_deadline, deadline_chunks, deadline_scope, low_on_time, remaining_time,
+    run_with_deadline,
+)
+from tests.base.test_base_agent import make_agent, steps
+
+GREET_ROUTE = {"agents": [{"agent": "greet", "task": "Greet the user", "context": {"required_tools": ["say_hello"]}}]}
+GREET_RESULT = {"agent": "GreeterAgent", "results": [{"tool": "say_hello", "input": {"name": "Al"}, "output": {"greeting": "Hello, Al!"}}]}
+
+
+def reply(content):
+    return MagicMock(message=MagicMock(content=content))
+
+
+def slow_formatter(model, messages, **kwargs):
+    if "routing agent" in messages[0]["content"]:
+        return reply(json.dumps(GREET_ROUTE))
+    time.sleep(1)
+    return reply("Formatted")
+
+
+def test_scope_sets_and_restores_the_deadline():
+    """Test that the deadline is only visible inside its scope and reserves are compared to the time left."""
+    assert remaining_time() is None and not low_on_time("summary")
+    with deadline_scope(Deadline(5, summary_reserve_s=10, formatter_reserve_s=1)):
+        assert 0 < remaining_time() <= 5
+        assert low_on_time("summary") and not low_on_time("formatter")
+    assert remaining_time() is None
+
+
+def test_calls_give_up_at_the_deadline():
+    """Test that sync and async calls stop waiting once the request's time is up."""
+    assert run_with_deadline("sleep", lambda: "done") == "done"
+    with deadline_scope(Deadline(0.05)):
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            run_with_deadline("sleep", time.sleep, 1)
+        assert time.perf_counter() - start < 0.5
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(arun_with_deadline("sleep", asyncio.sleep(1)))
+        with pytest.raises(DeadlineExceeded):
+            run_with_deadline("sleep", time.sleep, 0)  # Already expired: not even started
+
+
+def test_llm_client_stops_queueing_at_the_deadline():
+    """Test that a request waiting for a busy LLM slot gives up when its time runs out."""
+    client = LLMClient(max_concurrency=1)
+    limiter = client.limiter
+    limiter.acquire()
+    with deadline_scope(Deadline(0.05)), pytest.raises(DeadlineExceeded):
+        client.chat("router", "gemma3:4b", [])
+    limiter.release()
+    assert limiter.acquire(timeout=0)
+
+
+def test_tool_steps_are_capped_by_the_remaining_time():
+    """Test that a slow tool gets a timeout output when the request deadline comes before step_timeout."""
+    agent = make_agent()
+    with deadline_scope(Deadline(0.1)):
+        results = agent.execute_steps(steps("sleep", 1))
+        async_results = asyncio.run(agent.aexecute_steps(steps("sleep", 1)))
+    assert "timed out" in results[0]["output"]["error"]
+    assert "timed out" in async_results[0]["output"]["error"]
+
+
+def test_stalled_streams_give_up_at_the_deadline():
+    """Test that a sync stream waiting for its next chunk stops at the deadline and is closed once it returns."""
+    closed = []
+
+    def stalling():
+        try:
+            yield "a"
+            time.sleep(0.3)
+            yield "b"
+        finally:
+            closed.append(True)
+
+    assert list(deadline_chunks("stream", stalling())) == ["a", "b"]
+    closed.clear()
+    with deadline_scope(Deadline(0.05)):
+        stream = deadline_chunks("stream", stalling())
+        start = time.perf_counter()
+        assert next(stream) == "a"
+        with pytest.raises(DeadlineExceeded):
+            next(stream)
+        assert time.perf_counter() - start < 0.25
+    time.sleep(0.4)
+    assert closed == [True]
+
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_coordinator_times_out_on_a_stalled_router_stream(mock_chat):
+    """Test that a streamed router call that stops sending chunks yields the timeout reply at the deadline."""
+    def stalled_stream(*args, **kwargs):
+        yield reply('{"agents": [')
+        time.sleep(1)
+        yield reply(']}')
+
+    mock_chat.side_effect = stalled_stream
+    coordinator = CoordinatorAssistant(model="gemma3:4b", stream_json=True, latency_budget=LatencyBudget(0.2))
+    start = time.perf_counter()
+    assert coordinator.run("Hi") == TIMEOUT_RESPONSE
+    assert time.perf_counter() - start < 0.8
+
+
+@patch('simple_agents.agents.greet.agent.chat')
+def test_summary_falls_back_to_tool_summaries_when_low_on_time(mock_chat):
+    """Test that agents skip the LLM summary close to the deadline."""
+    agent = build_greet_agent("gemma3:4b")
+    with deadline_scope(Deadline(5, summary_reserve_s=10)):
+        assert agent.summarize(GREET_RESULT["results"]) == "Hello, Al!"
+    mock_chat.assert_not_called()
+
+
+@patch('simple_agents.coordinator_assistant.chat', side_effect=slow_formatter)
+def test_coordinator_returns_agent_output_when_the_formatter_overruns(mock_chat):
+    """Test that the reply is built from the agents' results if the formatter misses the deadline."""
+    coordinator = CoordinatorAssistant(model="gemma3:4b", latency_budget=LatencyBudget(0.3, formatter_reserve_s=0))
+    coordinator.agents["greet"].run = MagicMock(return_value={**GREET_RESULT, "summary": "Hi Al!"})
+
+    start = time.perf_counter()
+    assert coordinator.run("Hi, I'm Al") == "Hi Al!"
+    assert time.perf_counter() - start < 0.9
+    format_span = next(s for s in coordinator.last_trace.spans if s.name == "format")
+    assert "deadline" in format_span.attributes["degraded"]
+
+    # Not enough time left for the formatter: it is not called at all
+    coordinator.latency_budget = LatencyBudget(5, formatter_reserve_s=10)
+    coordinator.agents["greet"].run.return_value = GREET_RESULT
+    assert coordinator.run("Hi, I'm Al") == '[{"greeting":"Hello, Al!"}]'
+    assert mock_chat.call_count == 3
+
+
+@patch('simple_agents.coordinator_assistant.chat', side_effect=lambda *a, **k: time.sleep(1))
+def test_coordinator_times_out_while_routing(mock_chat):
+    """Test that a router call overrunning the budget yields the timeout reply."""
+    coordinator = CoordinatorAssistant(model="gemma3:4b", latency_budget=LatencyBudget(0.1))
+    assert list(coordinator.run_stream("Hi")) == [TIMEOUT_RESPONSE]
+    assert "deadline" in coordinator.last_trace.root.attributes["degraded"]
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+
+from simple_agents.utils.json_utils import (
+    JSONObjectScanner, aextract_json_stream, extract_json, extract_json_stream, find_json_object
+)
+
+
+def test_extract_json_plain_and_fenced():
+    """Test that the existing formats still parse."""
+    assert extract_json('{"a": 1}') == {"a": 1}
+    assert extract_json('<think>{"draft": true}</think>\n```json\n{"a": 1}\n```') == {"a": 1}
+
+
+def test_extract_json_with_surrounding_prose():
+    """Test that prose, mid-text fences and trailing text no longer break parsing."""
+    content = 'Sure! Here is the plan:\n```json\n{"steps": [{"tool_name": "say_hello", "arguments": {"name": "A}"}}]}\n```\nLet me know {if} you need more.'
+    assert extract_json(content) == {"steps": [{"tool_name": "say_hello", "arguments": {"name": "A}"}}]}
+    assert find_json_object('Use {name} then {"ok": "yes \\" }"}') == {"ok": 'yes " }'}
+    with pytest.raises(ValueError):
+        extract_json("no json here")
+
+
+def test_scanner_handles_split_tokens_and_think_blocks():
+    """Test that objects and think tags split across chunks are found once the brace closes."""
+    scanner = JSONObjectScanner()
+    chunks = ["<th", "ink>ignore {\"x\": 1} ", "</thi", "nk>ok ", '{"agents"', ': [{"agent": "gr', 'eet"}]}', " trailing"]
+    found_at = next(i for i, chunk in enumerate(chunks) if scanner.feed(chunk))
+    assert found_at == 6
+    assert scanner.result == {"agents": [{"agent": "greet"}]}
+
+
+def test_extract_json_stream_stops_early():
+    """Test that the stream is closed as soon as the object completes."""
+    consumed = []
+
+    def tokens():
+        for token in ['{"steps"', ': []}', " and then", " lots", " more"]:
+            consumed.append(token)
+            yield token
+
+    stream = tokens()
+    obj, text = extract_json_stream(stream)
+    assert obj == {"steps": []}
+    assert text == '{"steps": []}'
+    assert consumed == ['{"steps"', ': []}']
+    assert stream.gi_frame is None  # Closed
+
+
+def test_extract_json_stream_without_object():
+    """Test that a stream without any object raises ValueError."""
+    with pytest.raises(ValueError, match="No JSON object"):
+        extract_json_stream(iter(["just ", "words"]))
+
+
+def test_aextract_json_stream():
+    """Test the async extractor with an async generator."""
+    async def tokens():
+        for token in ['x {"a":', ' 1} y']:
+            yield token
+
+    assert asyncio.run(aextract_json_stream(tokens()))[0] == {"a": 1}
+
+
+def _chunks(*tokens):
+    return iter([MagicMock(message=MagicMock(content=t)) for t in tokens])
+
+
+@patch('simple_agents.planner.llm_planner.chat')
+def test_planner_stream_json(mock_chat):
+    """Test that a streaming planner requests a stream and parses the first object."""
+    from simple_agents.planner.llm_planner import LLMPlanner
+    mock_chat.return_value = _chunks('Plan: {"steps": [{"tool_name": "say_hello",', ' "arguments": {"name": "Bo"}}]}', " Hope this helps!")
+    planner = LLMPlanner("gemma3:4b", "plan", stream_json=True)
+    assert planner.plan("hi Bo")["steps"][0]["arguments"] == {"name": "Bo"}
+    assert mock_chat.call_args.kwargs["stream"] is True
+
+    mock_chat.return_value = _chunks("I cannot plan this.")
+    with pytest.raises(ValueError, match="Planner failed to parse JSON"):
+        planner.plan("?")
+
+
+@patch('simple_agents.coordinator_assistant.chat')
+def test_route_stream_json(mock_chat, mock_model):
+    """Test that the router can stream and stop at the routing object."""
+    from simple_agents.coordinator_assistant import CoordinatorAssistant
+    coordinator = CoordinatorAssistant(model=mock_model, stream_json=True)
+    mock_chat.return_value = _chunks('<think>greeting</think>{"agents": [{"agent": "greet", "task": "Greet"}]}', "\nExplanation...")
+    assert coordinator.route("hi")[0]["agent"] == "greet"
+    assert mock_chat.call_args.kwargs["stream"] is True
+    assert coordinator.agents["greet"].planner.stream_json is True
@@ -0,0 +1,79 @@
+import json
+import logging
+
+import pytest
+
+from simple_agents.tracing.tracer import Tracer
+from simple_agents.utils.logging_config import LazyJSON, configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    shutdown_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_text_lines_carry_request_id(tmp_path, restore_root_logger):
+    """Test that queued records reach the file with the active request ID."""
+    log_file = tmp_path / "chat.log"
+    configure_logging(str(log_file), console=False)
+    logger = logging.getLogger()
+    with Tracer().start_request(request_id="req-7"):
+        logger.info("Routing decision: %s", ["greet"])
+    logger.info("outside")
+    logger.info("HTTP Request: %s %s", "POST", "http://localhost/api/chat")
+    shutdown_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("- INFO - [req-7] Routing decision: ['greet']")
+    assert lines[1].endswith("- INFO - [-] outside")
+
+
+def test_json_lines(tmp_path, restore_root_logger):
+    """Test that json_lines emits one compact JSON object per record."""
+    log_file = tmp_path / "chat.log"
+    configure_logging(str(log_file), console=False, json_lines=True)
+    logging.getLogger().warning("Agent raw results: %s", LazyJSON([{"agent": "greet", "summary": "Hi"}]))
+    shutdown_logging()
+
+    entry = json.loads(log_file.read_text())
+    assert entry["level"] == "WARNING"
+    assert entry["request_id"] == "-"
+    assert entry["message"] == 'Agent raw results: [{"agent":"greet","summary":"Hi"}]'
+
+
+def test_size_rotation(tmp_path, restore_root_logger):
+    """Test that the log file rotates by size and keeps backup_count backups."""
+    log_file = tmp_path / "chat.log"
+    configure_logging(str(log_file), console=False, max_bytes=200, backup_count=2)
+    for i in range(50):
+        logging.getLogger().info("message number %d", i)
+    shutdown_logging()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["chat.log", "chat.log.1", "chat.log.2"]
+
+
+def test_lazy_json_not_serialized_when_disabled(tmp_path, restore_root_logger):
+    """Test that payloads of filtered-out records are never serialized."""
+    class Payload:
+        serialized = False
+
+        def __repr__(self):
+            Payload.serialized = True
+            return "payload"
+
+    configure_logging(str(tmp_path / "chat.log"), console=False, level=logging.WARNING)
+    logging.getLogger().info("results: %s", LazyJSON(Payload()))
+    shutdown_logging()
+    assert not Payload.serialized
+
+
+def test_invalid_rotation(tmp_path, restore_root_logger):
+    """Test that an unknown rotation mode is rejected."""
+    with pytest.raises(ValueError, match="rotate"):
+        configure_logging(str(tmp_path / "chat.log"), rotate="weekly")